@@ -0,0 +1,88 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional
+
+# Atributos padrão de um LogRecord: o que sobra são os campos estruturados
+# passados em extra={...} (ex.: entity, id, duration_ms)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+def _fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Texto legível com os campos estruturados no fim: '... entity=Team id=... duration_ms=1.2'."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por evento (para o pipeline de logs)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_fields(record),
+        }
+        if record.exc_info:
+            event["exc"] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+FORMATTERS = {"text": KeyValueFormatter, "json": JsonFormatter}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(level: str = "WARNING", fmt: str = "text", stream=None) -> None:
+    """
+    Configura o logging do backend: os loggers só enfileiram os eventos
+    (QueueHandler) e uma thread (QueueListener) formata e escreve no stream,
+    fora do caminho das requisições. Abaixo de 'level' os eventos são
+    descartados logo na chamada, sem formatar a mensagem.
+
+    Pode ser chamada de novo para trocar nível/formato.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(FORMATTERS.get(fmt, KeyValueFormatter)())
+
+    events = queue.SimpleQueue()
+    root = logging.getLogger()
+    for old in [h for h in root.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+        root.removeHandler(old)
+    root.addHandler(logging.handlers.QueueHandler(events))
+    root.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(events, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Esvazia a fila e para a thread de escrita."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,35 @@
+import os
+
+# Configurações do backend (sobrescrevíveis por variáveis de ambiente)
+
+# --- Banco de dados ---
+DATABASE_PATH = os.getenv("DATABASE_PATH", "database.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))          # conexões de leitura
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_CACHE_SIZE = int(os.getenv("DB_CACHE_SIZE", "1024"))      # entidades no cache (0 desativa)
+DB_CACHE_TTL_S = float(os.getenv("DB_CACHE_TTL_S", "30"))
+# Commit em grupo: janela (ms) em que escritas concorrentes são agrupadas
+# em uma única transação (um fsync por lote). 0 desativa.
+DB_GROUP_COMMIT_MS = float(os.getenv("DB_GROUP_COMMIT_MS", "0"))
+# Comandos SQL mais lentos que isso (ms) vão para o log com o plano de execução
+# (GET /stats/queries lista os formatos mais custosos). Negativo desativa a medição.
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+
+# --- Senhas ---
+# Processos dedicados ao scrypt (cada hash usa ~16 MiB e dezenas de ms de CPU)
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hashes/verificações em andamento; acima disso os logins esperam na fila
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", "64"))
+
+# --- Tokens de sessão ---
+# Chave do HMAC. Sem ela, uma chave aleatória é gerada a cada início
+# (os tokens emitidos deixam de valer quando o servidor reinicia).
+TOKEN_SECRET = os.getenv("TOKEN_SECRET", "")
+TOKEN_TTL_S = int(os.getenv("TOKEN_TTL_S", "3600"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))      # tokens já verificados em memória
+
+# --- Logs ---
+# Em produção fica em WARNING: os caminhos quentes (inserções, atualizações)
+# só registram em DEBUG e não custam nada acima desse nível.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")    # "text" (chave=valor) ou "json"
@@ -0,0 +1,59 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .database import Database
+
+
+class AsyncDatabase:
+    """
+    Fachada assíncrona sobre o Database.
+
+    Expõe os mesmos métodos do Database, mas como corrotinas: cada chamada
+    é executada em um executor de threads limitado, liberando o event loop
+    do FastAPI enquanto a consulta SQLite roda.
+
+        db = AsyncDatabase(Database("database.db"))
+        person = await db.getPersonByID(person_id)
+    """
+
+    # Threads reservadas para escritas quando o Database usa commit em grupo
+    GROUP_COMMIT_WRITERS = 16
+
+    def __init__(self, database: Database, max_workers: int = None):
+        self.__database = database
+        # Por padrão, uma thread por conexão de leitura + uma para o escritor.
+        # No commit em grupo, cada escrita ocupa uma thread até o commit do lote:
+        # mais threads de escrita permitem lotes maiores.
+        if max_workers is None:
+            writers = self.GROUP_COMMIT_WRITERS if database.groupCommit else 1
+            max_workers = database.poolSize + writers
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+        self.__wrappers = {}
+
+    @property
+    def database(self) -> Database:
+        """Instância síncrona (para código que já roda fora do event loop)."""
+        return self.__database
+
+    async def run(self, func, *args, **kwargs):
+        """Executa uma função arbitrária no executor do banco."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, functools.partial(func, *args, **kwargs))
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.__database, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        wrapper = self.__wrappers.get(name)
+        if wrapper is None:
+            @functools.wraps(attr)
+            async def wrapper(*args, **kwargs):
+                return await self.run(getattr(self.__database, name), *args, **kwargs)
+            self.__wrappers[name] = wrapper
+        return wrapper
+
+    def close(self):
+        """Encerra o executor (aguardando as consultas em andamento)."""
+        self.__executor.shutdown(wait=True)
@@ -0,0 +1,53 @@
+import sqlite3
+
+# Linha de change_version com o identificador aleatório do arquivo
+INSTANCE_KEY = "*"
+
+
+class ChangeTracker:
+    """
+    Versões de alteração por tabela, lidas do próprio banco (change_version).
+
+    Triggers (migração 7) incrementam a versão de uma tabela a cada linha
+    inserida, alterada ou removida, por qualquer conexão: outros processos,
+    importações pela linha de comando e cascatas de ON DELETE contam. A
+    kpi_reading, a tabela de maior volume, não tem trigger de inserção: o
+    maior id (INTEGER PRIMARY KEY, sempre crescente) entra na versão.
+
+    Servem para gerar ETags baratas: se nenhuma versão das tabelas lidas por
+    um endpoint mudou, a resposta também não mudou. O identificador aleatório
+    do arquivo entra na ETag para que um banco recriado não repita versões.
+    Como as versões estão no arquivo, a ETag é a mesma em todos os processos
+    que servem o mesmo banco e sobrevive a reinícios.
+    """
+
+    def __init__(self, pool):
+        self.__pool = pool
+
+    def version(self, *tables: str) -> tuple[int, ...]:
+        """
+        (identificador do arquivo, versão de cada tabela...); a kpi_reading
+        contribui com dois números (versão, maior id). Tabelas sem versão contam 0.
+        """
+        names = (INSTANCE_KEY,) + tables
+        with self.__pool.reader() as conn:
+            versions = dict(conn.execute(
+                f"SELECT name, version FROM change_version WHERE name IN ({', '.join('?' * len(names))})", names
+            ).fetchall())
+            lastReading = self._lastReadingId(conn) if "kpi_reading" in tables else 0
+
+        result = [versions.get(INSTANCE_KEY, 0)]
+        for table in tables:
+            result.append(versions.get(table, 0))
+            if table == "kpi_reading":
+                result.append(lastReading)
+        return tuple(result)
+
+    @staticmethod
+    def _lastReadingId(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT MAX(id) FROM kpi_reading").fetchone()[0] or 0
+
+    def etag(self, *tables: str) -> str:
+        """ETag forte para uma resposta que depende apenas de 'tables'."""
+        instance, *versions = self.version(*tables)
+        return '"{:x}-{}"'.format(instance, ".".join(map(str, versions)))
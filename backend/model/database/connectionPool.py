@@ -0,0 +1,332 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from .meteredConnection import MeteredConnection
+from .queryLog import QueryLog
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """
+    Pool de conexões SQLite para uso concorrente pelo Database.
+
+    Mantém um número fixo de conexões de leitura (distribuídas por uma fila)
+    e uma única conexão de escrita, protegida por um lock reentrante.
+    Com o journal em modo WAL, leitores não bloqueiam o escritor (e vice-versa).
+    """
+
+    def __init__(self, db_path: str, pool_size: int = 4, busy_timeout: int = 5000,
+                 query_log: Optional[QueryLog] = None):
+        self.__db_path = db_path
+        self.__busy_timeout = busy_timeout
+        self.__queryLog = query_log
+        self.__traceCallback = None
+
+        # Banco em memória não é compartilhado entre conexões: usa apenas o escritor
+        if db_path == ":memory:":
+            pool_size = 0
+
+        self.__writer = self.__connect()
+        if db_path != ":memory:":
+            self.__writer.execute("PRAGMA journal_mode = WAL;")
+            self.__writer.execute("PRAGMA synchronous = NORMAL;")
+        self.__writerLock = threading.RLock()
+        self.__local = threading.local()
+        self.__groupCommit = None
+
+        self.__readers = queue.Queue()
+        self.__allReaders = []
+        for _ in range(pool_size):
+            conn = self.__connect()
+            self.__allReaders.append(conn)
+            self.__readers.put(conn)
+
+    def __connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.__db_path,
+            timeout=self.__busy_timeout / 1000,
+            check_same_thread=False,
+            factory=MeteredConnection,  # contadores de comandos/linhas em /metrics
+        )
+        conn.row_factory = sqlite3.Row
+        conn.queryLog = self.__queryLog  # tempo de cada comando (None desativa)
+        conn.execute("PRAGMA foreign_keys = ON;")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.__busy_timeout)};")
+        conn.set_trace_callback(self.__traceCallback)
+        return conn
+
+    @property
+    def size(self) -> int:
+        """Número de conexões de leitura do pool."""
+        return len(self.__allReaders)
+
+    def __writerDepth(self) -> int:
+        return getattr(self.__local, "depth", 0)
+
+    @contextmanager
+    def writer(self):
+        """
+        Empresta a conexão de escrita.
+        O bloco mais externo faz commit ao terminar (ou rollback em caso de erro);
+        blocos aninhados na mesma thread participam da mesma transação.
+        No modo de commit em grupo (startGroupCommit), o bloco mais externo
+        espera o commit do lote em que entrou antes de retornar.
+        """
+        batch = None
+        with self.__writerLock:
+            depth = self.__writerDepth()
+            self.__local.depth = depth + 1
+            try:
+                if depth > 0:
+                    yield self.__writer
+                    return
+                self.__local.afterCommit = []
+                if self.__groupCommit is None:
+                    try:
+                        yield self.__writer
+                    except BaseException:
+                        self.__writer.rollback()
+                        raise
+                    self.__writer.commit()
+                else:
+                    # Commit em grupo: o bloco roda em um SAVEPOINT da transação
+                    # compartilhada, que fica aberta até o próximo commit do lote
+                    if not self.__writer.in_transaction:
+                        self.__writer.execute("BEGIN")
+                    self.__writer.execute("SAVEPOINT pool_write")
+                    try:
+                        yield self.__writer
+                    except BaseException as e:
+                        self.__abortSavepoint(e)
+                        raise
+                    self.__writer.execute("RELEASE pool_write")
+                    batch = self.__groupCommit.pending()
+                callbacks = self.__local.afterCommit
+            finally:
+                self.__local.depth = depth
+                if depth == 0:
+                    self.__local.afterCommit = []
+
+        # Fora do lock: enquanto esta thread espera o commit em grupo,
+        # outras escritas entram na mesma transação
+        if batch is not None:
+            self.__groupCommit.wait(batch)
+        for callback in callbacks:
+            callback()
+
+    def __abortSavepoint(self, error: BaseException) -> None:
+        """Desfaz apenas o bloco atual; as escritas de outras threads no lote continuam."""
+        if self.__writer.in_transaction:
+            self.__writer.execute("ROLLBACK TO pool_write")
+            self.__writer.execute("RELEASE pool_write")
+        else:
+            # O SQLite abortou a transação inteira: o lote aberto foi perdido
+            self.__groupCommit.fail(error)
+
+    def startGroupCommit(self, window_ms: float) -> None:
+        """
+        Liga o modo de commit em grupo: em vez de um commit (e um fsync) por
+        escrita, uma thread dedicada faz o commit de tudo que chegou nos
+        últimos 'window_ms' milissegundos. Quem escreve continua recebendo uma
+        confirmação durável: writer() só retorna depois do commit do seu lote.
+        Como o fsync passa a ser dividido pelo lote, o banco usa synchronous=FULL.
+        Sem efeito em banco ':memory:' (não há fsync a economizar).
+        """
+        if self.__groupCommit is not None or window_ms <= 0 or self.__db_path == ":memory:":
+            return
+        with self.__writerLock:
+            self.__writer.execute("PRAGMA synchronous = FULL;")
+            self.__groupCommit = _GroupCommitter(self.__writer, self.__writerLock, window_ms / 1000)
+
+    @property
+    def groupCommit(self) -> bool:
+        return self.__groupCommit is not None
+
+    @property
+    def inTransaction(self) -> bool:
+        """True se a thread atual está dentro de um bloco de escrita."""
+        return self.__writerDepth() > 0
+
+    def dataVersion(self) -> Optional[int]:
+        """
+        PRAGMA data_version da conexão de escrita: muda quando outra conexão
+        (outro processo, outro pool no mesmo arquivo) faz commit; os commits
+        deste pool não a alteram. None se o escritor está ocupado: quem chama
+        não espera pelo lock de escrita e tenta de novo depois.
+        """
+        if not self.__writerLock.acquire(blocking=False):
+            return None
+        try:
+            return self.__writer.execute("PRAGMA data_version").fetchone()[0]
+        finally:
+            self.__writerLock.release()
+
+    def afterCommit(self, callback) -> None:
+        """
+        Agenda 'callback' para depois do commit da transação de escrita atual
+        (descartado em caso de rollback). Fora de um bloco de escrita, executa na hora.
+        """
+        if self.__writerDepth() > 0:
+            self.__local.afterCommit.append(callback)
+        else:
+            callback()
+
+    @contextmanager
+    def reader(self):
+        """
+        Empresta uma conexão de leitura do pool.
+        Dentro de um bloco de escrita da mesma thread, devolve a conexão de escrita
+        para que a leitura enxergue as alterações ainda não commitadas.
+        Leituras aninhadas na mesma thread reutilizam a conexão já emprestada,
+        evitando que uma thread segure duas conexões (e esgote o pool).
+        """
+        if self.__writerDepth() > 0 or not self.__allReaders:
+            with self.writer() as conn:
+                yield conn
+            return
+
+        held = getattr(self.__local, "reader", None)
+        if held is not None:
+            yield held
+            return
+
+        conn = self.__readers.get()
+        self.__local.reader = conn
+        try:
+            yield conn
+        finally:
+            self.__local.reader = None
+            self.__readers.put(conn)
+
+    @contextmanager
+    def snapshot(self):
+        """
+        Conexão própria (fora do pool) com uma transação aberta, para leituras
+        longas que precisam de uma visão consistente do banco (ex.: exportações).
+        Como quem consome pode ser lento (um download), ela não sai da fila de
+        leitores: exportações paradas não deixam as leituras normais sem conexão.
+        Não usa o estado por thread: pode ser usada por um gerador consumido
+        em threads diferentes. Em banco ':memory:' usa a conexão de escrita.
+        """
+        if self.__db_path == ":memory:":
+            yield self.__writer
+            return
+
+        conn = self.__connect()
+        try:
+            conn.execute("BEGIN")
+            yield conn
+        finally:
+            conn.rollback()  # somente leitura: apenas encerra a transação
+            conn.close()
+
+    def setTraceCallback(self, callback) -> None:
+        """Instala (ou remove, com None) um trace callback em todas as conexões (e nas de snapshot abertas depois)."""
+        self.__traceCallback = callback
+        for conn in self.__allReaders + [self.__writer]:
+            conn.set_trace_callback(callback)
+
+    def close(self):
+        """Fecha todas as conexões do pool (depois de gravar o lote pendente, se houver)."""
+        if self.__groupCommit is not None:
+            self.__groupCommit.stop()
+            self.__groupCommit = None
+        for conn in self.__allReaders:
+            conn.close()
+        self.__allReaders = []
+        self.__writer.close()
+
+
+class _GroupCommitter:
+    """
+    Thread de commit do modo de commit em grupo.
+
+    As escritas são numeradas por lote: pending() devolve o número do lote
+    aberto (chamado com o lock de escrita, logo depois do RELEASE do savepoint)
+    e acorda a thread, que espera a janela, toma o lock de escrita, faz o commit
+    de tudo que se acumulou e libera quem está em wait() por aquele lote.
+    """
+
+    # Lotes com erro guardados para quem ainda não acordou do wait()
+    KEEP_ERRORS = 1000
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.RLock, window: float):
+        self.__conn = conn
+        self.__lock = lock
+        self.__window = window
+        self.__cond = threading.Condition()
+        self.__open = 0        # lote recebendo escritas
+        self.__done = -1       # último lote encerrado (commit ou erro)
+        self.__pending = False
+        self.__stopped = False
+        self.__errors = {}     # lote -> exceção
+        self.__thread = threading.Thread(target=self.__run, name="db-group-commit", daemon=True)
+        self.__thread.start()
+
+    def pending(self) -> int:
+        with self.__cond:
+            self.__pending = True
+            self.__cond.notify_all()
+            return self.__open
+
+    def fail(self, error: BaseException) -> None:
+        """Marca o lote aberto como perdido (a transação foi abortada pelo SQLite)."""
+        with self.__cond:
+            self.__errors.setdefault(self.__open, error)
+            self.__pending = True
+            self.__cond.notify_all()
+
+    def wait(self, batch: int) -> None:
+        """Bloqueia até o commit do lote 'batch'; propaga o erro se o commit falhou."""
+        with self.__cond:
+            while self.__done < batch:
+                self.__cond.wait()
+            error = self.__errors.get(batch)
+        if error is not None:
+            raise sqlite3.OperationalError(f"Commit em grupo falhou: {error}") from error
+
+    def __run(self):
+        while True:
+            with self.__cond:
+                while not self.__pending and not self.__stopped:
+                    self.__cond.wait()
+                if not self.__pending:
+                    return
+            time.sleep(self.__window)
+            self.__commit()
+
+    def __commit(self):
+        with self.__lock:
+            with self.__cond:
+                batch = self.__open
+                self.__open += 1
+                self.__pending = False
+                error = self.__errors.get(batch)
+            try:
+                if error is None:
+                    self.__conn.commit()
+                else:
+                    self.__conn.rollback()
+            except sqlite3.Error as e:
+                logger.error("Commit em grupo do lote %s falhou: %s", batch, e)
+                self.__conn.rollback()
+                error = e
+        with self.__cond:
+            if error is not None:
+                self.__errors[batch] = error
+            for old in [b for b in self.__errors if b <= batch - self.KEEP_ERRORS]:
+                del self.__errors[old]
+            self.__done = batch
+            self.__cond.notify_all()
+
+    def stop(self):
+        with self.__cond:
+            self.__stopped = True
+            self.__cond.notify_all()
+        self.__thread.join()
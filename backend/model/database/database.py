@@ -1,6 +1,7 @@
+import logging
 import sqlite3
-import json
-from typing import TYPE_CHECKING,Optional,Union
+import time
+from typing import TYPE_CHECKING,Iterator,Optional,Union
 
 if TYPE_CHECKING:
     from ..entities.data import Data
@@ -16,144 +17,136 @@ from ..entities.rpe import RPE
 from ..entities.objective import Objective
 from ..entities.kpi import KPI
 from ..entities.kr import KR
+from .connectionPool import ConnectionPool
+from .entityCache import EntityCache
+from .changeTracker import ChangeTracker
+from .orgIndex import OrgIndex, OrgIndexRefresher
+from .queryLog import QueryLog
+from .rowMapper import columnsOf, mapRows, rowMapper
+from .rollups import NODE_TYPES, RollupEngine, RollupRefresher
+from ..repositories.migrations import migrate
+from ..security.passwords import hashPassword, isHashed
+from ..monitoring.metrics import REGISTRY, instrumentMethods
 
+logger = logging.getLogger(__name__)
 
-class Database:
 
-    def __init__(self, db_path: str = 'backend/model/database/database.db'):
-        
-        self.__db = sqlite3.connect(db_path)
+def _elapsedMs(started: float) -> float:
+    """Milissegundos desde 'started' (time.perf_counter()), para os campos dos logs."""
+    return round((time.perf_counter() - started) * 1000, 3)
 
-        self.__db.row_factory = sqlite3.Row
-        
-        self.__db.execute("PRAGMA foreign_keys = ON;")
 
-        self.__db.executescript('''
-        
-            CREATE TABLE IF NOT EXISTS company (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                cnpj TEXT UNIQUE
-            );
-
-            CREATE TABLE IF NOT EXISTS department (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                companyID TEXT, 
-                directorID TEXT,
-                FOREIGN KEY(companyID) REFERENCES company(id) ON DELETE CASCADE,
-                FOREIGN KEY(directorID) REFERENCES person(id) ON DELETE SET NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS team (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                departmentID TEXT,
-                managerID TEXT,
-                FOREIGN KEY(departmentID) REFERENCES department(id) ON DELETE CASCADE,
-                FOREIGN KEY(managerID) REFERENCES person(id) ON DELETE SET NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS person (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                cpf TEXT UNIQUE,
-                companyID TEXT,
-                departmentID TEXT NULL,
-                teamID TEXT NULL,
-                role TEXT,
-                email TEXT,
-                password TEXT,
-                FOREIGN KEY(companyID) REFERENCES company(id) ON DELETE SET NULL,
-                FOREIGN KEY(departmentID) REFERENCES department(id) ON DELETE SET NULL,
-                FOREIGN KEY(teamID) REFERENCES team(id) ON DELETE SET NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS rpe (
-                id TEXT PRIMARY KEY,
-                description TEXT,
-                responsibleID TEXT,
-                date TEXT,
-                FOREIGN KEY(responsibleID) REFERENCES person(id) ON DELETE SET NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS objective (
-                id TEXT PRIMARY KEY,
-                description TEXT,
-                responsibleID TEXT,
-                rpeID TEXT,
-                date TEXT,
-                FOREIGN KEY(rpeID) REFERENCES rpe(id) ON DELETE CASCADE,
-                FOREIGN KEY(responsibleID) REFERENCES person(id) ON DELETE SET NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS kpi (
-                id TEXT PRIMARY KEY,
-                description TEXT,
-                responsibleID TEXT,
-                objectiveID TEXT,
-                date TEXT,
-                data TEXT,
-                goal FLOAT,
-                FOREIGN KEY(objectiveID) REFERENCES objective(id) ON DELETE CASCADE,
-                FOREIGN KEY(responsibleID) REFERENCES person(id) ON DELETE SET NULL
-            );
-
-            --- TABELAS DE JUNÇÃO (Muitos-para-Muitos) ---
-
-            CREATE TABLE IF NOT EXISTS person_responsibles (
-                personID TEXT NOT NULL,
-                responsibleID TEXT NOT NULL,
-                PRIMARY KEY (personID, responsibleID),
-                FOREIGN KEY(personID) REFERENCES person(id) ON DELETE CASCADE,
-                FOREIGN KEY(responsibleID) REFERENCES person(id) ON DELETE CASCADE
-            );
-            
-            CREATE TABLE IF NOT EXISTS company_directors (
-                companyID TEXT NOT NULL,
-                personID TEXT NOT NULL,
-                PRIMARY KEY (companyID, personID),
-                FOREIGN KEY(companyID) REFERENCES company(id) ON DELETE CASCADE,
-                FOREIGN KEY(personID) REFERENCES person(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS company_rpes (
-                companyID TEXT NOT NULL,
-                rpeID TEXT NOT NULL,
-                PRIMARY KEY (companyID, rpeID),
-                FOREIGN KEY(companyID) REFERENCES company(id) ON DELETE CASCADE,
-                FOREIGN KEY(rpeID) REFERENCES rpe(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS department_rpes (
-                departmentID TEXT NOT NULL,
-                rpeID TEXT NOT NULL,
-                PRIMARY KEY (departmentID, rpeID),
-                FOREIGN KEY(departmentID) REFERENCES department(id) ON DELETE CASCADE,
-                FOREIGN KEY(rpeID) REFERENCES rpe(id) ON DELETE CASCADE
-            );
-            
-            CREATE TABLE IF NOT EXISTS team_rpes (
-                teamID TEXT NOT NULL,
-                rpeID TEXT NOT NULL,
-                PRIMARY KEY (teamID, rpeID),
-                FOREIGN KEY(teamID) REFERENCES team(id) ON DELETE CASCADE,
-                FOREIGN KEY(rpeID) REFERENCES rpe(id) ON DELETE CASCADE
-            );
-            
-            ''')
-        self.__saveData()
-        print("LOG: Banco de dados inicializado com schema relacional.")
+def _storedPassword(password: Optional[str]) -> Optional[str]:
+    """
+    Valor gravado na coluna password pela inserção em lote: quem chama deve
+    mandar o hash (ex.: bulkImport, pelo pool de processos); senhas em texto
+    puro que escaparem recebem o hash aqui, na própria thread.
+    """
+    if not password or isHashed(password):
+        return password
+    return hashPassword(password)
 
-    def __saveData(self):
-        """Salva (commita) as alterações pendentes."""
-        self.__db.commit()
+
+class Database:
+
+    def __init__(self, db_path: str = 'backend/model/database/database.db', pool_size: int = 4, busy_timeout: int = 5000,
+                 cache_size: int = 1024, cache_ttl: float = 30.0, group_commit_ms: float = 0,
+                 slow_query_ms: Optional[float] = None):
+        """
+        db_path: caminho do arquivo SQLite.
+        pool_size: número de conexões de leitura mantidas no pool.
+        busy_timeout: tempo (ms) que uma conexão espera por um lock antes de falhar.
+        cache_size / cache_ttl: capacidade e validade (s) do cache de entidades (0 desativa).
+        group_commit_ms: janela (ms) do commit em grupo; 0 faz um commit por escrita.
+        slow_query_ms: mede cada comando SQL e registra no log os que passarem
+            desse tempo (ms), com o EXPLAIN QUERY PLAN; None não mede.
+        """
+        self.__queryLog = QueryLog(slow_query_ms) if slow_query_ms is not None else None
+        self.__pool = ConnectionPool(db_path, pool_size, busy_timeout, self.__queryLog)
+        self.__cache = EntityCache(cache_size, cache_ttl)
+        self.__changes = ChangeTracker(self.__pool)
+        self.__rollups = RollupEngine()
+        self.__org = OrgIndex()
+
+        with self.__pool.writer() as conn:
+            migrate(conn)
+            self.__org.load(conn)
+            rollupsDirty = self.__rollups.isDirty(conn) or self.__rollups.hasPending(conn)
+        # Só depois das migrações, que controlam as próprias transações
+        self.__pool.startGroupCommit(group_commit_ms)
+        self.__rollupRefresher = RollupRefresher(self.__pool, self.__rollups)
+        if rollupsDirty:
+            self.__rollupRefresher.schedule()
+        self.__orgRefresher = OrgIndexRefresher(self.__pool, self.__org, self.__cache.clear)
+        logger.info("Banco de dados inicializado com schema relacional.")
+
+    @property
+    def poolSize(self) -> int:
+        """Número de conexões de leitura do pool."""
+        return self.__pool.size
+
+    @property
+    def groupCommit(self) -> bool:
+        """True se as escritas são confirmadas em lotes (commit em grupo)."""
+        return self.__pool.groupCommit
+
+    @property
+    def org(self) -> OrgIndex:
+        """Hierarquia company → department → team → person em memória."""
+        return self.__org
+
+    @property
+    def changes(self) -> ChangeTracker:
+        """Versões de alteração por tabela, mantidas pelo banco (usadas para gerar ETags)."""
+        return self.__changes
+
+    def getCacheStats(self) -> dict:
+        """Contadores do cache de entidades (acertos, falhas, tamanho...)."""
+        return self.__cache.stats()
+
+    def getQueryStats(self, limit: int = 20, order: str = "total") -> list[dict]:
+        """
+        Formatos de comando SQL mais custosos ('total', 'max', 'mean' ou 'calls'),
+        com o plano capturado na primeira execução lenta. Vazio se slow_query_ms=None.
+        """
+        if self.__queryLog is None:
+            return []
+        return self.__queryLog.top(limit, order)
+
+    def traceStatements(self, callback) -> None:
+        """
+        Registra um callback chamado com o SQL de cada comando executado
+        em qualquer conexão do pool (None desativa). Usado em diagnósticos.
+        """
+        self.__pool.setTraceCallback(callback)
+
+    def close(self) -> None:
+        """
+        Fecha as conexões com o banco (depois de gravar o lote pendente do
+        commit em grupo). Pode ser chamado mais de uma vez.
+        """
+        pool = getattr(self, "_Database__pool", None)
+        if pool is None:
+            return
+        self.__pool = None
+        self.__orgRefresher.stop()
+        self.__rollupRefresher.stop()
+        pool.close()
+        logger.info("Conexões com o banco de dados fechadas.")
 
     def __del__(self):
-        """ Garante que a conexão com o banco seja fechada. """
-        if self.__db:
-            self.__db.close()
-            print("LOG: Conexão com o banco de dados fechada.")
+        """
+        Rede de segurança para quem não chamou close(). Não registra nada no
+        log: no encerramento do interpretador o logging já pode ter sido desmontado.
+        """
+        pool = getattr(self, "_Database__pool", None)
+        if pool is not None:
+            self.__pool = None
+            for name in ("_Database__orgRefresher", "_Database__rollupRefresher"):
+                refresher = getattr(self, name, None)
+                if refresher is not None:
+                    refresher.stop()
+            pool.close()
 
     #Fazer deleteItemByID
     def deleteItemByObject(self, item: Entity) -> Optional[int]:
@@ -162,7 +155,7 @@ class Database:
         O banco de dados cuidará automaticamente da limpeza de referências
         (graças a 'ON DELETE CASCADE' e 'ON DELETE SET NULL').
         """
-        
+        started = time.perf_counter()
         tableName = None
         if isinstance(item, Person): tableName = "person"
         elif isinstance(item, Company): tableName = "company"
@@ -172,29 +165,35 @@ class Database:
         elif isinstance(item, Objective): tableName = "objective"
         elif isinstance(item, KPI): tableName = "kpi"
         else:
-            print(f"[ERRO] Não é possível deletar tipo desconhecido: {type(item)}")
+            logger.error("Não é possível deletar tipo desconhecido: %s", type(item))
             return None # Retorna None em caso de falha
 
         if not hasattr(item, 'id') or not item.id:
-             print(f"[ERRO] Item {type(item)} não possui um ID válido para deleção.")
+             logger.error("Item %s não possui um ID válido para deleção.", type(item))
              return None
 
         try:
-            with self.__db:
-                cursor = self.__db.cursor()
+            with self.__pool.writer() as conn:
+                cursor = conn.cursor()
                 query = f"DELETE FROM {tableName} WHERE id = ?"
                 cursor.execute(query, (item.id,))
                 
                 if cursor.rowcount == 0:
-                    print(f"[AVISO] Nenhum registro encontrado em '{tableName}' com o ID {item.id}.")
+                    logger.warning("Nenhum registro encontrado em '%s' com o ID %s.", tableName, item.id)
                     return 1 # Retorna 1 se nada foi deletado
                 else:
-                    print(f"Item de '{tableName}' com ID {item.id} removido com sucesso.")
-                    print("   [Limpeza] O banco de dados limpou as referências automaticamente.")
+                    # As cascatas podem alterar qualquer entidade cacheada
+                    if tableName in self._CACHED_TABLES or tableName == "rpe":
+                        self.__pool.afterCommit(self.__cache.clear)
+                    self.__pool.afterCommit(self.__rollupRefresher.schedule)
+                    self.__pool.afterCommit(lambda: self.__org.removeRow(tableName, item.id))
+            # As referências foram limpas pelo próprio banco (cascatas)
+            logger.debug("Item removido", extra={"entity": type(item).__name__, "id": item.id,
+                                                 "duration_ms": _elapsedMs(started)})
             return 0 # Retorna 0 para sucesso
 
         except sqlite3.Error as e:
-            print(f"Erro ao deletar item de '{tableName}' (ROLLBACK executado): {e}")
+            logger.error("Erro ao deletar item de '%s' (ROLLBACK executado): %s", tableName, e)
             return None
     
 
@@ -214,7 +213,7 @@ class Database:
             self.__db.commit()
             
         except sqlite3.Error as e:
-            print(f"[ERRO] Falha ao limpar relações do {data_type} (ID: {data_id}): {e}")
+            logger.error("Falha ao limpar relações do %s (ID: %s): %s", data_type, data_id, e)
             self.__db.rollback() 
             raise
 
@@ -226,13 +225,14 @@ class Database:
         após a inserção principal (e.g., usando métodos 'add...').
         """
         
+        started = time.perf_counter()
         query = ""
         params = ()
         entity_name = type(item).__name__
 
-        # Usa o 'with self.__db:' para garantir que o commit ou rollback ocorra
+        # Usa o 'with self.__pool.writer()' para garantir que o commit ou rollback ocorra
         try:
-            with self.__db: 
+            with self.__pool.writer() as conn: 
                 # --- Bloco Person ---
                 if isinstance(item, Person):
                     # Se já existe pessoa, não insere novamente
@@ -243,9 +243,8 @@ class Database:
                         params = (item.id, item.name, item.cpf, 
                                 item.companyID, item.departmentID, item.teamID,
                                 getattr(item, 'role', None), item.email, item.password)
-                        print(f"Person {item.id} inserida com sucesso.")
                         # EXECUTA A QUERY PRINCIPAL AQUI
-                        self.__db.execute(query, params)
+                        conn.execute(query, params)
                         
                         # LÓGICA DE RELACIONAMENTO BASE PARA PERSON
                         # 1. Atribui a Pessoa aos grupos
@@ -253,7 +252,7 @@ class Database:
                         self.assignPersonToDepartment(item.id, item.departmentID)
                         self.assignPersonToTeam(item.id, item.teamID)
                     else:
-                        print(f"[AVISO] Person {item.id} já existe, ignorando inserção.")
+                        logger.warning("Person %s já existe, ignorando inserção.", item.id)
 
                 # --- Bloco Company ---
                 elif isinstance(item, Company):
@@ -262,7 +261,7 @@ class Database:
                                ) VALUES (?, ?, ?)"""
                     params = (item.id, item.name, item.cnpj)
                     # EXECUTA A QUERY PRINCIPAL AQUI
-                    self.__db.execute(query, params)
+                    conn.execute(query, params)
                     
                     # LÓGICA DE RELACIONAMENTO BASE PARA COMPANY
                     # Adiciona os diretores à tabela de junção
@@ -275,14 +274,8 @@ class Database:
                             id, name, companyID, directorID
                             ) VALUES (?, ?, ?, ?)"""
                     params = (item.id, item.name, item.companyID, item.directorID)
-                    print(f"[DEBUG] Tentando inserir Department: {params}")
-                    try:
-                        self.__db.execute(query, params)
-                        print(f"[DEBUG] Inserção executada. Total changes: {self.__db.total_changes}")
-                        self.__db.commit()
-                        print(f"[DEBUG] Commit feito. Total changes agora: {self.__db.total_changes}")
-                    except Exception as e:
-                        print(f"[ERRO] Falha ao inserir Department: {e}")
+                    # O commit fica com o bloco de escrita (que pode estar em um lote)
+                    conn.execute(query, params)
 
 
                 # --- Bloco Team ---
@@ -292,7 +285,7 @@ class Database:
                                ) VALUES (?, ?, ?, ?)"""
                     params = (item.id, item.name, item.departmentID, item.managerID)
                     # EXECUTA A QUERY PRINCIPAL AQUI
-                    self.__db.execute(query, params)
+                    conn.execute(query, params)
 
                     # LÓGICA DE RELACIONAMENTO BASE PARA TEAM
                     # 1. Adiciona o time à lista de times do departamento
@@ -304,7 +297,7 @@ class Database:
                                id, description, responsibleID, date
                                ) VALUES (?, ?, ?, ?)"""
                     params = (item.id, item.description, item.responsibleID, item.date)
-                    self.__db.execute(query, params)
+                    conn.execute(query, params)
                     self.assignResponsibleToRPE(item.responsibleID, item.id)
 
                 # --- Bloco Objective ---
@@ -313,60 +306,165 @@ class Database:
                                id, description, responsibleID, rpeID, date
                                ) VALUES (?, ?, ?, ?, ?)"""
                     params = (item.id, item.description, item.responsibleID, item.rpeID, item.date)
-                    self.__db.execute(query, params)
+                    conn.execute(query, params)
                     self.assignResponsibleToObjective(item.responsibleID, item.id)
                     self.assignObjectiveToRPE(item.rpeID, item.id)
 
                 # --- Bloco KPI (usado para KPI e KR, com 'goal' e 'data' opcionais) ---
                 elif isinstance(item, KPI):
-                    # O campo 'data' (vetor de floats) ainda precisa ser serializado
-                    dataText = json.dumps(getattr(item, 'data', [])) 
                     # O campo 'goal' e 'current_value' são tratados. 
                     # Se não existirem no objeto KPI, use NULL (None em Python) ou 0.0
                     goal = getattr(item, 'goal', None)
                     
                     query = """INSERT INTO kpi (
-                               id, description, responsibleID, objectiveID, date, data, goal
-                               ) VALUES (?, ?, ?, ?, ?, ?, ?)"""
+                               id, description, responsibleID, objectiveID, date, goal
+                               ) VALUES (?, ?, ?, ?, ?, ?)"""
                     params = (item.id, item.description, item.responsibleID, item.objectiveID, item.date, 
-                              dataText, goal)
-                    self.__db.execute(query, params)
+                              goal)
+                    conn.execute(query, params)
                     self.assignResponsibleToKPI(item.responsibleID, item.id)
                     self.assignKPIToObjective(item.objectiveID, item.id)
 
+                    # As leituras iniciais (vetor de floats) vão para a tabela kpi_reading
+                    item.popPendingData()
+                    self._insertReadings(conn, [(item.id, value) for value in item.data])
+                    if item.data:
+                        self.__pool.afterCommit(lambda: item.reloadData(self))
+                    # KR novo (kr_pending): somado agora aos nós que o contêm
+                    self.__rollups.refresh(conn, [item.id])
+
                 else:
-                    print(f"[ERRO] Tipo de item desconhecido para inserção: {entity_name}")
+                    logger.error("Tipo de item desconhecido para inserção: %s", entity_name)
                     return 1
 
                 # Executa a inserção                
-                print(f"{entity_name} {item.id} inserido com sucesso.")
+                self._invalidateEntity(item)
+                self._indexEntity(item)
+                self._changed(self._tableOf(item))
 
             # Retorno de sucesso
+            logger.debug("Item inserido", extra={"entity": entity_name, "id": item.id,
+                                                 "duration_ms": _elapsedMs(started)})
             return 0 
 
         except sqlite3.IntegrityError as e:
             # Captura erros de UNIQUE (como CNPJ ou CPF duplicado)
-            print(f"[ERRO] Falha de Integridade ao adicionar {entity_name} (ID: {item.id}): {e}")
+            logger.error("Falha de Integridade ao adicionar %s (ID: %s): %s", entity_name, item.id, e)
             return 1
         except sqlite3.Error as e:
-            print(f"[ERRO] Erro SQL ao adicionar {entity_name} (ID: {item.id}): {e}")
+            logger.error("Erro SQL ao adicionar %s (ID: %s): %s", entity_name, item.id, e)
             return 1
         
+    # --- INVALIDAÇÃO DO CACHE DE ENTIDADES ---
+
+    # Tabelas cujas linhas são cacheadas (tabela → tipo no cache)
+    # Tabelas cujas mudanças podem marcar os rollups como sujos (triggers da migração 4)
+    _ROLLUP_TABLES = frozenset(("kpi", "objective", "rpe", "team", "department",
+                                "company_rpes", "department_rpes", "team_rpes"))
+
+    _CACHED_TABLES = {"person": "Person", "company": "Company", "department": "Department", "team": "Team"}
+
+    # FKs que aparecem como lista de ids no pai: (tabela, coluna) → (tipo do pai, atributo)
+    _CACHED_CHILD_LISTS = {
+        ("person", "teamID"): ("Team", "employeeIDs"),
+        ("department", "companyID"): ("Company", "departmentIds"),
+        ("team", "departmentID"): ("Department", "teamIds"),
+    }
+
+    # Tabelas de junção hidratadas em entidades cacheadas: tabela → (tipo, coluna do dono)
+    _CACHED_JUNCTIONS = {
+        "person_responsibles": ("Person", "personID"),
+        "company_directors": ("Company", "companyID"),
+        "company_rpes": ("Company", "companyID"),
+        "department_rpes": ("Department", "departmentID"),
+        "team_rpes": ("Team", "teamID"),
+    }
+
+    def _invalidateRow(self, table: str, row_id: str, columns: dict) -> None:
+        """
+        Invalida (após o commit) a entidade da linha e, para cada FK em 'columns'
+        ({coluna: novo valor}), o pai antigo e o novo que a listam.
+        """
+        kind = self._CACHED_TABLES.get(table)
+        if kind is None:
+            return
+
+        def invalidate():
+            self.__cache.invalidate(kind, row_id)
+            for (child_table, column), (parent_kind, attribute) in self._CACHED_CHILD_LISTS.items():
+                if child_table == table and column in columns:
+                    self.__cache.invalidateReferencing(parent_kind, attribute, row_id)
+                    if columns[column]:
+                        self.__cache.invalidate(parent_kind, columns[column])
+
+        self.__pool.afterCommit(invalidate)
+
+    # Tabela de cada tipo de entidade (subclasses usam a tabela do pai)
+    _ENTITY_TABLES = (
+        (Person, "person"), (Company, "company"), (Department, "department"), (Team, "team"),
+        (RPE, "rpe"), (Objective, "objective"), (KPI, "kpi"),
+    )
+
+    def _tableOf(self, item: Entity) -> Optional[str]:
+        for cls, table in self._ENTITY_TABLES:
+            if isinstance(item, cls):
+                return table
+        return None
+
+    def _invalidateEntity(self, item: Entity) -> None:
+        """Invalida uma entidade escrita por addItem/updateItem (e seus pais)."""
+        table = self._tableOf(item)
+        if table in self._CACHED_TABLES:
+            columns = {
+                column: getattr(item, column, None)
+                for (child_table, column) in self._CACHED_CHILD_LISTS if child_table == table
+            }
+            self._invalidateRow(table, item.id, columns)
+
+    def _indexRow(self, table: str, row_id: str, columns: dict) -> None:
+        """Aplica (após o commit) as colunas escritas em uma linha ao índice da hierarquia."""
+        if table in OrgIndex.COLUMNS:
+            self.__pool.afterCommit(lambda: self.__org.setRow(table, row_id, columns))
+
+    def _indexEntity(self, item: Entity) -> None:
+        """Atualiza o índice da hierarquia com uma entidade escrita por addItem/updateItem."""
+        table = self._tableOf(item)
+        if table in OrgIndex.COLUMNS:
+            self._indexRow(table, item.id, {column: getattr(item, column) for column in OrgIndex.COLUMNS[table]})
+
+    def _changed(self, *tables: str) -> None:
+        """
+        Registra uma escrita nas tabelas: se alguma delas define a estrutura dos
+        rollups, agenda (após o commit) a reconstrução. As versões usadas nas
+        ETags são incrementadas pelos triggers do próprio banco.
+        """
+        if not self._ROLLUP_TABLES.isdisjoint(tables):
+            self.__pool.afterCommit(self.__rollupRefresher.schedule)
+
+    def _invalidateJunction(self, table: str, values: dict) -> None:
+        """Invalida (após o commit) a entidade dona de uma linha de tabela de junção."""
+        if table in self._CACHED_JUNCTIONS:
+            kind, column = self._CACHED_JUNCTIONS[table]
+            self.__pool.afterCommit(lambda: self.__cache.invalidate(kind, values[column]))
+
     # --- MÉTODOS DE RELAÇÃO UM-PARA-MUITOS (Assign/Unassign) ---
     
     def _assign_foreign_key(self, table: str, fk_column: str, fk_id: str, primary_id: str) -> bool:
         """Função auxiliar genérica para definir um FK (relação 1-N)."""
         try:
-            with self.__db:
+            with self.__pool.writer() as conn:
                 query = f"UPDATE {table} SET {fk_column} = ? WHERE id = ?"
-                cursor = self.__db.execute(query, (fk_id, primary_id))
+                cursor = conn.execute(query, (fk_id, primary_id))
                 if cursor.rowcount == 0:
-                    print(f"Aviso: Nenhum registro encontrado em '{table}' com ID {primary_id}.")
+                    logger.warning("Nenhum registro encontrado em '%s' com ID %s.", table, primary_id)
                     return False
-            print(f"'{table}.{fk_column}' atualizado para {fk_id} onde id = {primary_id}.")
+                self._invalidateRow(table, primary_id, {fk_column: fk_id})
+                self._indexRow(table, primary_id, {fk_column: fk_id})
+                self._changed(table)
+            logger.debug("'%s.%s' atualizado para %s onde id = %s.", table, fk_column, fk_id, primary_id)
             return True
         except sqlite3.Error as e:
-            print(f"Erro ao atribuir FK em '{table}': {e}")
+            logger.error("Erro ao atribuir FK em '%s': %s", table, e)
             return False
 
     def _unassign_foreign_key(self, table: str, fk_column: str, primary_id: str) -> bool:
@@ -378,31 +476,35 @@ class Database:
     def _add_junction(self, table: str, col1_name: str, col1_id: str, col2_name: str, col2_id: str) -> bool:
         """Função auxiliar genérica para inserir em tabela de junção (N-N)."""
         try:
-            with self.__db:
+            with self.__pool.writer() as conn:
                 query = f"INSERT INTO {table} ({col1_name}, {col2_name}) VALUES (?, ?)"
-                self.__db.execute(query, (col1_id, col2_id))
-            print(f"Relação adicionada em '{table}' ({col1_id}, {col2_id}).")
+                conn.execute(query, (col1_id, col2_id))
+                self._invalidateJunction(table, {col1_name: col1_id, col2_name: col2_id})
+                self._changed(table)
+            logger.debug("Relação adicionada em '%s' (%s, %s).", table, col1_id, col2_id)
             return True
         except sqlite3.IntegrityError:
-            print(f"Erro de Integridade: Relação ({col1_id}, {col2_id}) já existe em '{table}' ou IDs não existem.")
+            logger.error("Erro de Integridade: Relação (%s, %s) já existe em '%s' ou IDs não existem.", col1_id, col2_id, table)
             return False
         except sqlite3.Error as e:
-            print(f"Erro de DB ao adicionar em '{table}': {e}")
+            logger.error("Erro de DB ao adicionar em '%s': %s", table, e)
             return False
 
     def _delete_junction(self, table: str, col1_name: str, col1_id: str, col2_name: str, col2_id: str) -> bool:
         """Função auxiliar genérica para deletar de tabela de junção (N-N)."""
         try:
-            with self.__db:
+            with self.__pool.writer() as conn:
                 query = f"DELETE FROM {table} WHERE {col1_name} = ? AND {col2_name} = ?"
-                cursor = self.__db.execute(query, (col1_id, col2_id))
+                cursor = conn.execute(query, (col1_id, col2_id))
                 if cursor.rowcount == 0:
-                    print(f"Aviso: Relação ({col1_id}, {col2_id}) não encontrada em '{table}'.")
+                    logger.warning("Relação (%s, %s) não encontrada em '%s'.", col1_id, col2_id, table)
                 else:
-                    print(f"Relação removida de '{table}' ({col1_id}, {col2_id}).")
+                    self._invalidateJunction(table, {col1_name: col1_id, col2_name: col2_id})
+                    self._changed(table)
+                    logger.debug("Relação removida de '%s' (%s, %s).", table, col1_id, col2_id)
             return True
         except sqlite3.Error as e:
-            print(f"Erro de DB ao deletar de '{table}': {e}")
+            logger.error("Erro de DB ao deletar de '%s': %s", table, e)
             return False
 
     # Relações de Department UM-PARA-MUITOS
@@ -508,7 +610,7 @@ class Database:
         Atualiza os campos diretos de um item no banco de dados.
         Agora também atualiza as relações rpeIds para Team, Department e Company.
         """
-        
+        started = time.perf_counter()
         query = ""
         params = ()
 
@@ -559,33 +661,32 @@ class Database:
                 params = (item.description, item.responsibleID, item.rpeID, item.date, item.id)
 
             # --- Bloco KR ---
+            # (as leituras não são reescritas: só as pendentes são gravadas em kpi_reading)
             elif isinstance(item, KR):
-                dataText = json.dumps(item.data) 
                 query = """UPDATE kpi
-                        SET description = ?, responsibleID = ?, objectiveID = ?, date = ?, data = ?, goal = ?
+                        SET description = ?, responsibleID = ?, objectiveID = ?, date = ?, goal = ?
                         WHERE id = ?"""
-                params = (item.description, item.responsibleID, item.objectiveID, item.date, dataText, item.goal,
+                params = (item.description, item.responsibleID, item.objectiveID, item.date, item.goal,
                         item.id)
 
             # --- Bloco KPI ---
             elif isinstance(item, KPI):
-                dataText = json.dumps(item.data) 
                 query = """UPDATE kpi
-                        SET description = ?, responsibleID = ?, objectiveID = ?, date = ?, data = ?, goal = ?
+                        SET description = ?, responsibleID = ?, objectiveID = ?, date = ?, goal = ?
                         WHERE id = ?"""
-                params = (item.description, item.responsibleID, item.objectiveID, item.date, dataText, None,
+                params = (item.description, item.responsibleID, item.objectiveID, item.date, None,
                         item.id)
             
             # --- Bloco Else ---
             else:
-                print(f"[ERRO] Tipo de item desconhecido para atualização: {type(item)}")
+                logger.error("Tipo de item desconhecido para atualização: %s", type(item))
                 return 1
 
             # Executa a query dentro de uma transação
-            with self.__db:
-                cursor = self.__db.execute(query, params)
+            with self.__pool.writer() as conn:
+                cursor = conn.execute(query, params)
                 if cursor.rowcount == 0:
-                    print(f"[AVISO] Nenhum {type(item).__name__} atualizado (ID: {item.id}). ID não encontrado.")
+                    logger.warning("Nenhum %s atualizado (ID: %s). ID não encontrado.", type(item).__name__, item.id)
                     return 1
                 
                 # --- ATUALIZAÇÃO DOS rpeIds PARA TEAM, DEPARTMENT E COMPANY ---
@@ -593,44 +694,65 @@ class Database:
                 # Team RPEs
                 if isinstance(item, Team) and hasattr(item, 'rpeIds'):
                     # Primeiro remove todos os RPEs existentes
-                    self.__db.execute("DELETE FROM team_rpes WHERE teamID = ?", (item.id,))
+                    conn.execute("DELETE FROM team_rpes WHERE teamID = ?", (item.id,))
                     # Depois insere os novos RPEs
                     for rpe_id in item.rpeIds:
-                        self.__db.execute(
+                        conn.execute(
                             "INSERT INTO team_rpes (teamID, rpeID) VALUES (?, ?)",
                             (item.id, rpe_id)
                         )
-                    print(f"rpeIds do Team {item.id} atualizados: {item.rpeIds}")
+                    logger.debug("rpeIds do Team %s atualizados: %s", item.id, item.rpeIds)
                 
                 # Department RPEs
                 elif isinstance(item, Department) and hasattr(item, 'rpeIds'):
                     # Remove todos os RPEs existentes
-                    self.__db.execute("DELETE FROM department_rpes WHERE departmentID = ?", (item.id,))
+                    conn.execute("DELETE FROM department_rpes WHERE departmentID = ?", (item.id,))
                     # Insere os novos RPEs
                     for rpe_id in item.rpeIds:
-                        self.__db.execute(
+                        conn.execute(
                             "INSERT INTO department_rpes (departmentID, rpeID) VALUES (?, ?)",
                             (item.id, rpe_id)
                         )
-                    print(f"rpeIds do Department {item.id} atualizados: {item.rpeIds}")
+                    logger.debug("rpeIds do Department %s atualizados: %s", item.id, item.rpeIds)
                 
                 # Company RPEs
                 elif isinstance(item, Company) and hasattr(item, 'rpeIds'):
                     # Remove todos os RPEs existentes
-                    self.__db.execute("DELETE FROM company_rpes WHERE companyID = ?", (item.id,))
+                    conn.execute("DELETE FROM company_rpes WHERE companyID = ?", (item.id,))
                     # Insere os novos RPEs
                     for rpe_id in item.rpeIds:
-                        self.__db.execute(
+                        conn.execute(
                             "INSERT INTO company_rpes (companyID, rpeID) VALUES (?, ?)",
                             (item.id, rpe_id)
                         )
-                    print(f"rpeIds da Company {item.id} atualizados: {item.rpeIds}")
+                    logger.debug("rpeIds da Company %s atualizados: %s", item.id, item.rpeIds)
+
+                # Leituras adicionadas/removidas em KPI/KR desde que foi carregado
+                elif isinstance(item, KPI):
+                    added, removed = item.popPendingData()
+                    self._insertReadings(conn, [(item.id, value) for value in added])
+                    if removed:
+                        # Pelo id: remove exatamente as leituras tiradas de item.data
+                        self._changed("kpi_reading")
+                        conn.executemany("DELETE FROM kpi_reading WHERE id = ? AND kpiID = ?",
+                                         [(reading_id, item.id) for reading_id in removed])
+                    if added:
+                        # As leituras novas ganham id no banco: recarregadas no próximo acesso
+                        self.__pool.afterCommit(lambda: item.reloadData(self))
+                    # Novas leituras ou nova meta mudam o atingimento do KR
+                    self.__rollups.refresh(conn, [item.id])
+
+                self._invalidateEntity(item)
+                self._indexEntity(item)
+                relation = self._RPE_RELATIONS.get(type(item).__name__)
+                self._changed(self._tableOf(item), *(relation[:1] if relation else ()))
                 
-            print(f"{type(item).__name__} (ID: {item.id}) atualizado com sucesso.")
+            logger.debug("Item atualizado", extra={"entity": type(item).__name__, "id": item.id,
+                                                   "duration_ms": _elapsedMs(started)})
             return 0 # Sucesso
 
         except sqlite3.Error as e:
-            print(f"Erro ao atualizar {type(item).__name__} (ID: {item.id}): {e}")
+            logger.error("Erro ao atualizar %s (ID: %s): %s", type(item).__name__, item.id, e)
             return 1 # Falha
         
  # --- NOVO MÉTODO AUXILIAR PARA PESSOAS ---
@@ -670,43 +792,40 @@ class Database:
                 obj = Person(**params)
             return obj
         except TypeError as e:
-            print(f"[ERRO] Falha ao construir objeto Person/Manager/Director. Verifique os construtores.")
-            print(f"   Erro: {e}")
-            print(f"   Parâmetros: {params}")
+            # Só os nomes das colunas: os valores incluem o hash da senha
+            logger.error("Falha ao construir objeto Person/Manager/Director (colunas: %s): %s",
+                         sorted(params), e, extra={"entity": "person", "id": personID})
             return None
 
 # --- MÉTODOS DE BUSCA "GET" ---
 
     def _get_single(self, table: str, field: str, value: str, cls):
         try:
-            cursor = self.__db.cursor()
+            with self.__pool.reader() as conn:
+                cursor = conn.cursor()
 
-            query = f"SELECT * FROM {table} WHERE {field} = ? LIMIT 1;"
-            cursor.execute(query, (value,))
-            row = cursor.fetchone()
+                query = f"SELECT * FROM {table} WHERE {field} = ? LIMIT 1;"
+                cursor.execute(query, (value,))
+                row = cursor.fetchone()
 
             if not row:
                 return None
 
-            # Caso row_factory não esteja setado, converte manualmente
-            if not isinstance(row, sqlite3.Row):
-                columns = [desc[0] for desc in cursor.description]
-                row = {columns[i]: row[i] for i in range(len(columns))}
-
-            # Cria o objeto dinamicamente
-            return cls(**row)
+            # Cria o objeto com o mapper compilado para este formato de consulta
+            return rowMapper(cls, columnsOf(cursor))(row)
 
         except sqlite3.Error as e:
-            print(f"[ERRO] Falha no get genérico para {table}: {e}")
+            logger.error("Falha no get genérico para %s: %s", table, e)
             return None
         
     def _get_single_raw(self, table: str, field: str, value: str):
         try:
-            cursor = self.__db.cursor()
+            with self.__pool.reader() as conn:
+                cursor = conn.cursor()
 
-            query = f"SELECT * FROM {table} WHERE {field} = ? LIMIT 1;"
-            cursor.execute(query, (value,))
-            row = cursor.fetchone()
+                query = f"SELECT * FROM {table} WHERE {field} = ? LIMIT 1;"
+                cursor.execute(query, (value,))
+                row = cursor.fetchone()
 
             if not row:
                 return None
@@ -715,27 +834,21 @@ class Database:
             return {columns[i]: row[i] for i in range(len(columns))}
 
         except sqlite3.Error as e:
-            print(f"[ERRO] Falha no get genérico para {table}: {e}")
+            logger.error("Falha no get genérico para %s: %s", table, e)
             return None
 
     def _get_many(self, table: str, field: str, value: str, cls):
         try:
-            cursor = self.__db.cursor()
-            query = f"SELECT * FROM {table} WHERE {field} = ?;"
-            cursor.execute(query, (value,))
-            rows = cursor.fetchall()
+            with self.__pool.reader() as conn:
+                cursor = conn.cursor()
+                query = f"SELECT * FROM {table} WHERE {field} = ?;"
+                cursor.execute(query, (value,))
+                rows = cursor.fetchall()
 
-            results = []
-            for row in rows:
-                if not isinstance(row, sqlite3.Row):
-                    columns = [desc[0] for desc in cursor.description]
-                    row = {columns[i]: row[i] for i in range(len(columns))}
-                results.append(cls(**row))
-
-            return results
+            return mapRows(cls, rows)
 
         except sqlite3.Error as e:
-            print(f"[ERRO] Falha no get many para {table}: {e}")
+            logger.error("Falha no get many para %s: %s", table, e)
             return []
     
     def _hydrateOneToMany(self, parent_id: str, join_table: str, parent_fk: str, child_fk: str) -> list[str]:
@@ -743,10 +856,11 @@ class Database:
         Busca IDs relacionados em uma tabela de junção.
         """
         try:
-            cursor = self.__db.cursor()
-            query = f"SELECT {child_fk} FROM {join_table} WHERE {parent_fk} = ?;"
-            cursor.execute(query, (parent_id,))
-            return [row[0] for row in cursor.fetchall()]
+            with self.__pool.reader() as conn:
+                cursor = conn.cursor()
+                query = f"SELECT {child_fk} FROM {join_table} WHERE {parent_fk} = ?;"
+                cursor.execute(query, (parent_id,))
+                return [row[0] for row in cursor.fetchall()]
         except:
             return []
 
@@ -765,9 +879,10 @@ class Database:
 
     def _hydrateTeam(self, team: Team):
         tid = team.id
-        cursor = self.__db.cursor()
-        cursor.execute("SELECT id FROM person WHERE teamID = ?", (tid,))
-        team.employeeIDs = [row[0] for row in cursor.fetchall()]  # Nome correto
+        with self.__pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM person WHERE teamID = ?", (tid,))
+            team.employeeIDs = [row[0] for row in cursor.fetchall()]  # Nome correto
         
         team.rpeIds = self._hydrateOneToMany(tid, "team_rpes", "teamID", "rpeID")
         return team
@@ -776,48 +891,82 @@ class Database:
         if not value:
             return []
         try:
-            cursor = self.__db.cursor()
-            query = f"SELECT rpeID FROM {relation_table} WHERE {column} = ?"
-            cursor.execute(query, (value,))
+            with self.__pool.reader() as conn:
+                cursor = conn.cursor()
+                query = f"SELECT rpeID FROM {relation_table} WHERE {column} = ?"
+                cursor.execute(query, (value,))
 
-            rpe_ids = [row["rpeID"] for row in cursor.fetchall()]
+                rpe_ids = [row["rpeID"] for row in cursor.fetchall()]
             return [rpe for rpe in (self.getRPEByID(rid) for rid in rpe_ids) if rpe]
 
         except sqlite3.Error as e:
-            print(f"[ERRO] Falha ao buscar RPEs na relação {relation_table}.{column}={value}: {e}")
+            logger.error("Falha ao buscar RPEs na relação %s.%s=%s: %s", relation_table, column, value, e)
             return []
         
     def getResponsibleIDs(self, personID: str) -> list[str]:
-        cursor = self.__db.cursor()
-        cursor.execute("""
-            SELECT responsibleID FROM person_responsibles WHERE personID = ?
-        """, (personID,))
-        return [row[0] for row in cursor.fetchall()]
+        with self.__pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT responsibleID FROM person_responsibles WHERE personID = ?
+            """, (personID,))
+            return [row[0] for row in cursor.fetchall()]
 
     def getMeasureByID(self, measureID: str) -> Optional[Union[KPI, KR]]:
         try:
-            cursor = self.__db.cursor()
-            cursor.execute("SELECT * FROM kpi WHERE id = ?", (measureID,))
-            row = cursor.fetchone()
+            with self.__pool.reader() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT * FROM kpi WHERE id = ?", (measureID,))
+                row = cursor.fetchone()
             if not row:
                 return None
 
-            params = dict(zip([c[0] for c in cursor.description], row))
-            params["data"] = json.loads(params["data"]) if params.get("data") else []
-
-            # Se goal é None → KPI
-            if params.get("goal") is None:
-                params.pop("goal", None)
-                return KPI(**params)
-
-            # Se goal tem valor → KR
-            return KR(**params)
+            return self._buildMeasure(row)
 
         except Exception as e:
-            print(f"[ERRO] Falha ao buscar Measure (ID: {measureID}): {e}")
+            logger.error("Falha ao buscar Measure (ID: %s): %s", measureID, e)
             return None
 
+    def _buildMeasure(self, row: sqlite3.Row, readings: list[tuple[int, float]] = None) -> Union[KPI, KR]:
+        """
+        Constrói um KPI ou KR a partir de uma linha da tabela 'kpi'.
+        'readings' são pares (id, valor) de kpi_reading; sem eles, as leituras
+        são carregadas sob demanda.
+        """
+        columns = tuple(row.keys())
+        data = readingIds = None
+        if readings is not None:
+            readingIds = [reading_id for reading_id, _ in readings]
+            data = [value for _, value in readings]
+
+        # Se goal é None → KPI
+        if row["goal"] is None:
+            return rowMapper(KPI, columns, ("data", "goal"))(row, data=data, source=self, readingIds=readingIds)
+
+        # Se goal tem valor → KR
+        return rowMapper(KR, columns, ("data",))(row, data=data, source=self, readingIds=readingIds)
+
+    def _cached(self, kind: str, entity_id: str, load):
+        """
+        Leitura com cache: devolve uma cópia da entidade cacheada ou carrega com
+        load(entity_id). Dentro de uma transação de escrita o cache é ignorado
+        (a conexão de escrita enxerga dados ainda não commitados).
+        """
+        if not entity_id or self.__pool.inTransaction:
+            return load(entity_id)
+
+        entity = self.__cache.get(kind, entity_id)
+        if entity is not None:
+            return entity
+
+        version = self.__cache.version
+        entity = load(entity_id)
+        self.__cache.put(kind, entity_id, entity, version)
+        return entity
+
     def getPersonByID(self, personID: str):
+        return self._cached("Person", personID, self._loadPersonByID)
+
+    def _loadPersonByID(self, personID: str):
         data = self._get_single_raw("person", "id", personID)
         if data is None:
             return None
@@ -855,6 +1004,9 @@ class Database:
         return Person(**data)
 
     def getCompanyByID(self, companyID: str) -> Optional[Company]:
+        return self._cached("Company", companyID, self._loadCompanyByID)
+
+    def _loadCompanyByID(self, companyID: str) -> Optional[Company]:
         company = self._get_single("company", "id", companyID, Company)
         return self._hydrateCompany(company) if company else None
 
@@ -867,6 +1019,9 @@ class Database:
         return self._hydrateCompany(company) if company else None  
 
     def getDepartmentByID(self, departmentID: str) -> Optional[Department]:
+        return self._cached("Department", departmentID, self._loadDepartmentByID)
+
+    def _loadDepartmentByID(self, departmentID: str) -> Optional[Department]:
         department = self._get_single("department", "id", departmentID, Department)
         return self._hydrateDepartment(department) if department else None
 
@@ -875,6 +1030,9 @@ class Database:
         return self._hydrateDepartment(department) if department else None  
 
     def getTeamByID(self, teamID: str) -> Optional[Team]:
+        return self._cached("Team", teamID, self._loadTeamByID)
+
+    def _loadTeamByID(self, teamID: str) -> Optional[Team]:
         team = self._get_single("team", "id", teamID, Team)
         return self._hydrateTeam(team) if team else None
 
@@ -898,129 +1056,274 @@ class Database:
         return self._get_single("objective", "id", objectiveID, Objective)
     
     def getObjectivesByRPE(self, rpeID: str) -> list[str]:
-        cursor = self.__db.cursor()
-        cursor.execute("SELECT id FROM objective WHERE rpeID = ?", (rpeID,))
-        return [row[0] for row in cursor.fetchall()]
+        with self.__pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM objective WHERE rpeID = ?", (rpeID,))
+            return [row[0] for row in cursor.fetchall()]
 
     def getKPIByID(self, kpiID: str) -> Optional[KPI]:
         result = self.getMeasureByID(kpiID)
         return result if isinstance(result, KPI) else None
 
     def getKPIsByObjective(self, objectiveID: str) -> list[str]:
-        cursor = self.__db.cursor()
-        cursor.execute("SELECT id FROM kpi WHERE objectiveID = ? AND goal IS NULL", (objectiveID,))
-        return [row[0] for row in cursor.fetchall()]
+        with self.__pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM kpi WHERE objectiveID = ? AND goal IS NULL", (objectiveID,))
+            return [row[0] for row in cursor.fetchall()]
 
     def getKRByID(self, krID: str) -> Optional[KR]:
         result = self.getMeasureByID(krID)
         return result if isinstance(result, KR) else None
 
     def getKRsByObjective(self, objectiveID: str) -> list[str]:
-        cursor = self.__db.cursor()
-        cursor.execute("SELECT id FROM kpi WHERE objectiveID = ? AND goal IS NOT NULL", (objectiveID,))
-        return [row[0] for row in cursor.fetchall()]
-    
+        with self.__pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM kpi WHERE objectiveID = ? AND goal IS NOT NULL", (objectiveID,))
+            return [row[0] for row in cursor.fetchall()]
+
+    # --- LEITURAS DE KPI/KR (tabela kpi_reading, só de inserção) ---
+
+    def _insertReadings(self, conn: sqlite3.Connection, readings: list[tuple[str, float]], timestamp: float = None):
+        if not readings:
+            return
+        self._changed("kpi_reading")
+        timestamp = time.time() if timestamp is None else timestamp
+        conn.executemany(
+            "INSERT INTO kpi_reading (kpiID, timestamp, value) VALUES (?, ?, ?)",
+            [(kpi_id, timestamp, value) for kpi_id, value in readings]
+        )
+
+    def getReadings(self, kpi_id: str) -> list[float]:
+        """Valores registrados para um KPI/KR, em ordem cronológica."""
+        with self.__pool.reader() as conn:
+            rows = conn.execute(
+                "SELECT value FROM kpi_reading WHERE kpiID = ? ORDER BY timestamp, id", (kpi_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def getReadingRows(self, kpi_id: str) -> list[tuple[int, float]]:
+        """Pares (id, valor) das leituras de um KPI/KR, em ordem cronológica."""
+        with self.__pool.reader() as conn:
+            rows = conn.execute(
+                "SELECT id, value FROM kpi_reading WHERE kpiID = ? ORDER BY timestamp, id", (kpi_id,)
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def getLastReading(self, kpi_id: str) -> Optional[float]:
+        """Último valor registrado para um KPI/KR (None se não houver leituras)."""
+        with self.__pool.reader() as conn:
+            row = conn.execute(
+                "SELECT value FROM kpi_reading WHERE kpiID = ? ORDER BY timestamp DESC, id DESC LIMIT 1", (kpi_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def addReading(self, kpi_id: str, value: float, timestamp: float = None) -> int:
+        """
+        Registra uma nova leitura para um KPI/KR com um único INSERT
+        (sem reescrever o histórico, e sem perder leituras concorrentes).
+        """
+        try:
+            with self.__pool.writer() as conn:
+                self._insertReadings(conn, [(kpi_id, value)], timestamp)
+                self.__rollups.refresh(conn, [kpi_id])
+            return 0
+        except sqlite3.Error as e:
+            logger.error("Falha ao registrar leitura do KPI/KR (ID: %s): %s", kpi_id, e)
+            return 1
+
+    def addReadings(self, readings: list[tuple[str, float, Optional[float]]]) -> list[Optional[str]]:
+        """
+        Registra várias leituras (measure_id, valor, timestamp ou None = agora),
+        de vários KPIs/KRs, em uma única transação.
+        Retorna, para cada leitura, None (registrada) ou a mensagem de erro.
+        """
+        errors = [None] * len(readings)
+        now = time.time()
+        try:
+            with self.__pool.writer() as conn:
+                ids = self._uniqueIds(measure_id for measure_id, _, _ in readings)
+                existing = {row[0] for row in self._fetchIn(conn, "SELECT id FROM kpi WHERE id IN ({})", ids)}
+
+                rows = []
+                for index, (measure_id, value, timestamp) in enumerate(readings):
+                    if measure_id not in existing:
+                        errors[index] = "KPI/KR não encontrado"
+                        continue
+                    rows.append((measure_id, now if timestamp is None else timestamp, value))
+
+                if rows:
+                    conn.executemany("INSERT INTO kpi_reading (kpiID, timestamp, value) VALUES (?, ?, ?)", rows)
+                    self._changed("kpi_reading")
+                    touched = self._uniqueIds(row[0] for row in rows)
+                    for start in range(0, len(touched), self._BATCH_SIZE):
+                        self.__rollups.refresh(conn, touched[start:start + self._BATCH_SIZE])
+            return errors
+
+        except sqlite3.Error as e:
+            logger.error("Falha ao registrar lote de %s leituras: %s", len(readings), e)
+            return [str(e)] * len(readings)
+
+    # --- ROLLUPS DE ATINGIMENTO DOS KRs ---
+
+    def getRollup(self, node_type: str, node_id: str) -> dict:
+        """
+        Atingimento médio dos KRs abaixo de um nó da hierarquia
+        ('Objective', 'RPE', 'Team', 'Department' ou 'Company').
+        Só lê: com os rollups sujos (mudança de estrutura ainda não aplicada),
+        devolve os últimos valores calculados com "stale": True e agenda a
+        reconstrução em segundo plano.
+        """
+        if node_type not in NODE_TYPES:
+            raise ValueError(f"Tipo de nó desconhecido: {node_type}")
+
+        with self.__pool.reader() as conn:
+            rollup = self.__rollups.get(conn, node_type, node_id)
+            stale = self.__rollups.isDirty(conn)
+        if stale:
+            # Ex.: escrita feita por outro processo, que não agendou a reconstrução aqui
+            self.__rollupRefresher.schedule()
+        rollup["stale"] = stale
+        return rollup
+
+    def rebuildRollups(self) -> None:
+        """Recalcula todos os rollups do zero."""
+        with self.__pool.writer() as conn:
+            self.__rollups.rebuild(conn)
+
+    # Agregações suportadas por getReadingSeries ('last' é tratado à parte)
+    _SERIES_AGGREGATES = {"avg": "AVG(value)", "min": "MIN(value)", "max": "MAX(value)", "count": "COUNT(*)"}
+
+    def getReadingSeries(self, kpi_id: str, start: float = None, end: float = None,
+                         bucket: float = 3600, agg: str = "avg") -> list[dict]:
+        """
+        Série de leituras de um KPI/KR agregada em intervalos de 'bucket' segundos,
+        calculada pelo próprio SQLite (só os pontos agregados saem do banco).
+        start/end: timestamps (epoch, em segundos) do intervalo [start, end).
+        agg: 'avg' | 'min' | 'max' | 'last' | 'count'.
+        Retorna [{"timestamp": início do intervalo, "value": valor agregado}, ...].
+        """
+        if bucket <= 0:
+            raise ValueError("bucket deve ser maior que zero")
+        if agg == "last":
+            # Coluna "solta" com MAX(): o SQLite devolve o 'value' da linha de maior timestamp
+            select = "value, MAX(timestamp)"
+        elif agg in self._SERIES_AGGREGATES:
+            select = self._SERIES_AGGREGATES[agg]
+        else:
+            raise ValueError(f"Agregação desconhecida: {agg}")
+
+        filters, params = ["kpiID = ?"], [kpi_id]
+        if start is not None:
+            filters.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            filters.append("timestamp < ?")
+            params.append(end)
+
+        query = f"""
+            SELECT CAST(timestamp / ? AS INTEGER) AS bucket, {select}
+            FROM kpi_reading
+            WHERE {' AND '.join(filters)}
+            GROUP BY bucket
+            ORDER BY bucket
+        """
+        with self.__pool.reader() as conn:
+            rows = conn.execute(query, [bucket] + params).fetchall()
+        return [{"timestamp": row[0] * bucket, "value": row[1]} for row in rows]
+
+    # Tabela de junção (e coluna do grupo) que liga cada tipo de grupo aos seus RPEs
+    _RPE_RELATIONS = {
+        "Company": ("company_rpes", "companyID"),
+        "Department": ("department_rpes", "departmentID"),
+        "Team": ("team_rpes", "teamID"),
+    }
+
     def getDataByEntity(self, group_type: str, group_id: str, data_type: str):
         """
         Retorna dados (RPE / Objective / KPI / KR) associados a Company, Department ou Team.
+        Toda a cadeia Grupo → RPE → Objective → KPI/KR é resolvida com um único JOIN
+        por chamada, e os objetos são construídos em uma só passada.
         """
+        relation = self._RPE_RELATIONS.get(group_type)
+        if relation is None:
+            return []
+        table, column = relation
 
         # --- 1) RPE ---
         if data_type == "RPE":
-            match group_type:
-                case "Company":
-                    return self.getRPEsByCompanyID(group_id)
-                case "Department":
-                    return self.getRPEsByDepartmentID(group_id)
-                case "Team":
-                    return self.getRPEsByTeamID(group_id)
-            return []
+            query = f"""
+                SELECT r.* FROM {table} AS j
+                JOIN rpe AS r ON r.id = j.rpeID
+                WHERE j.{column} = ?
+                ORDER BY j.rpeID
+            """
+            cls = RPE
 
         # --- 2) Objective ---
-        if data_type == "Objective":
-            rpes = self.getDataByEntity(group_type, group_id, "RPE")
-            objectives = []
-            for rpe in rpes:
-                objectives.extend(self.getObjectivesByRPE(rpe.id))
-            return [self.getObjectiveByID(oid) for oid in objectives]
-
-        # --- 3) KPI ---
-        if data_type == "KPI":
-            objectives = self.getDataByEntity(group_type, group_id, "Objective")
-            kpis = []
-
-            for obj in objectives:
-                if not obj: 
-                    continue
-                for kpiID in self.getKPIsByObjective(obj.id):
-                    kpi = self.getKPIByID(kpiID)
-                    if kpi:  
-                        kpis.append(kpi)
-            return kpis
-        # --- 4) KR ---
-        if data_type == "KR":
-            objectives = self.getDataByEntity(group_type, group_id, "Objective")
-            krs = []
-
-            for obj in objectives:
-                if not obj:  
-                    continue
-                for krID in self.getKRsByObjective(obj.id):
-                    kr = self.getKRByID(krID)
-                    if kr:   
-                        krs.append(kr)
-            return krs
+        elif data_type == "Objective":
+            query = f"""
+                SELECT o.* FROM {table} AS j
+                JOIN objective AS o ON o.rpeID = j.rpeID
+                WHERE j.{column} = ?
+                ORDER BY j.rpeID, o.rowid
+            """
+            cls = Objective
+
+        # --- 3) KPI / 4) KR (mesma tabela, diferenciados pelo 'goal') ---
+        elif data_type in ("KPI", "KR"):
+            goalFilter = "k.goal IS NULL" if data_type == "KPI" else "k.goal IS NOT NULL"
+            query = f"""
+                SELECT k.* FROM {table} AS j
+                JOIN objective AS o ON o.rpeID = j.rpeID
+                JOIN kpi AS k ON k.objectiveID = o.id
+                WHERE j.{column} = ? AND {goalFilter}
+                ORDER BY j.rpeID, o.rowid, k.rowid
+            """
+            cls = None
 
-        return []
-    
+        else:
+            return []
 
-    def getTeams(self) -> list[Team]:
-        cursor = self.__db.cursor()
-        cursor.execute("SELECT * FROM team ")
-        rows = cursor.fetchall()
+        try:
+            with self.__pool.reader() as conn:
+                rows = conn.execute(query, (group_id,)).fetchall()
+                if cls is None:
+                    # Leituras de todos os KPIs/KRs carregadas em lote
+                    readings = {}
+                    for kpi_id, reading_id, value in self._fetchIn(
+                        conn, "SELECT kpiID, id, value FROM kpi_reading WHERE kpiID IN ({}) ORDER BY kpiID, timestamp, id",
+                        [row["id"] for row in rows]
+                    ):
+                        readings.setdefault(kpi_id, []).append((reading_id, value))
+                    return [self._buildMeasure(row, readings.get(row["id"], [])) for row in rows]
+            return mapRows(cls, rows)
 
-        teams = []
-        for row in rows:
-            if not isinstance(row, sqlite3.Row):
-                columns = [desc[0] for desc in cursor.description]
-                row = {columns[i]: row[i] for i in range(len(columns))}
-                team = Team(**row)
-            else:
-                team = Team(**row)
+        except sqlite3.Error as e:
+            logger.error("Falha ao buscar %s de %s %s: %s", data_type, group_type, group_id, e)
+            return []
 
-            # Hidratar (employeeIDs, rpeIds)
-            teams.append(self._hydrateTeam(team))
-        
-        return teams
+    def getTeams(self) -> list[Team]:
+        with self.__pool.reader() as conn:
+            rows = conn.execute("SELECT * FROM team ").fetchall()
+            teams = mapRows(Team, rows)
+
+            # Hidratar (employeeIDs, rpeIds) em lote
+            return self._hydrateTeams(conn, teams)
 
     def getDepartmentsByCompanyID(self, companyID: str ) -> list[Department]:
         """
         Retorna todos os departamentos pertencentes a uma empresa.
         """
-
-        print(companyID)
         try:
-            cursor = self.__db.cursor()
-            cursor.execute("SELECT * FROM department WHERE companyID = ?", (companyID,))
-            rows = cursor.fetchall()
-            print(rows)
-            departments = []
-            for row in rows:
-                # Convert Row → dict caso necessário
-                if not isinstance(row, sqlite3.Row):
-                    columns = [desc[0] for desc in cursor.description]
-                    row = {columns[i]: row[i] for i in range(len(columns))}
-                    dept = Department(**row)
-                else:
-                    dept = Department(**row)
+            with self.__pool.reader() as conn:
+                rows = conn.execute("SELECT * FROM department WHERE companyID = ?", (companyID,)).fetchall()
+                departments = mapRows(Department, rows)
 
-                # Hidratar relações (teamIds, rpeIds)
-                departments.append(self._hydrateDepartment(dept))
-            
-            return departments
+                # Hidratar relações (teamIds, rpeIds) em lote
+                return self._hydrateDepartments(conn, departments)
 
         except sqlite3.Error as e:
-            print(f"[ERRO] Falha ao buscar departamentos da empresa {companyID}: {e}")
+            logger.error("Falha ao buscar departamentos da empresa %s: %s", companyID, e)
             return []
 
     def getTeamsByDepartmentID(self, departmentID: str) -> list[Team]:
@@ -1028,26 +1331,15 @@ class Database:
         Retorna todos os times pertencentes a um departamento.
         """
         try:
-            cursor = self.__db.cursor()
-            cursor.execute("SELECT * FROM team WHERE departmentID = ?", (departmentID,))
-            rows = cursor.fetchall()
-
-            teams = []
-            for row in rows:
-                if not isinstance(row, sqlite3.Row):
-                    columns = [desc[0] for desc in cursor.description]
-                    row = {columns[i]: row[i] for i in range(len(columns))}
-                    team = Team(**row)
-                else:
-                    team = Team(**row)
+            with self.__pool.reader() as conn:
+                rows = conn.execute("SELECT * FROM team WHERE departmentID = ?", (departmentID,)).fetchall()
+                teams = mapRows(Team, rows)
 
-                # Hidratar (employeeIDs, rpeIds)
-                teams.append(self._hydrateTeam(team))
-            
-            return teams
+                # Hidratar (employeeIDs, rpeIds) em lote
+                return self._hydrateTeams(conn, teams)
 
         except sqlite3.Error as e:
-            print(f"[ERRO] Falha ao buscar times do departamento {departmentID}: {e}")
+            logger.error("Falha ao buscar times do departamento %s: %s", departmentID, e)
             return []
 
     def getPersonsByTeamID(self, teamID: str) -> list[Person]:
@@ -1055,21 +1347,12 @@ class Database:
         Retorna todos os usuários que pertencem a um time.
         """
         try:
-            cursor = self.__db.cursor()
-            cursor.execute("SELECT id FROM person WHERE teamID = ?", (teamID,))
-            rows = cursor.fetchall()
-
-            persons = []
-            for row in rows:
-                # row[0] contém o id da pessoa
-                person = self.getPersonByID(row[0])
-                if person:
-                    persons.append(person)
-
-            return persons
+            with self.__pool.reader() as conn:
+                rows = conn.execute("SELECT * FROM person WHERE teamID = ?", (teamID,)).fetchall()
+                return self._buildPersons(conn, rows)
 
         except sqlite3.Error as e:
-            print(f"[ERRO] Falha ao buscar pessoas do time {teamID}: {e}")
+            logger.error("Falha ao buscar pessoas do time %s: %s", teamID, e)
             return []
         
     def getPersonsByDepartmentID(self, departmentID: str) -> list[Person]:
@@ -1078,23 +1361,15 @@ class Database:
         (independente de terem time atribuído ou não).
         """
         try:
-            cursor = self.__db.cursor()
-            cursor.execute("""
-                SELECT id FROM person 
-                WHERE departmentID = ?
-            """, (departmentID,))
-            rows = cursor.fetchall()
-
-            persons = []
-            for row in rows:
-                person = self.getPersonByID(row[0])  # Hidrata Manager/Director corretamente
-                if person:
-                    persons.append(person)
-
-            return persons
+            with self.__pool.reader() as conn:
+                rows = conn.execute("""
+                    SELECT * FROM person 
+                    WHERE departmentID = ?
+                """, (departmentID,)).fetchall()
+                return self._buildPersons(conn, rows)  # Hidrata Manager/Director corretamente
 
         except Exception as e:
-            print(f"[ERRO] Falha ao buscar pessoas do departamento {departmentID}: {e}")
+            logger.error("Falha ao buscar pessoas do departamento %s: %s", departmentID, e)
             return []
 
     def getPersonsByCompanyID(self, companyID: str) -> list[Person]:
@@ -1103,27 +1378,499 @@ class Database:
         independente de departamento ou time.
         """
         try:
-            cursor = self.__db.cursor()
-            cursor.execute("""
-                SELECT id FROM person 
-                WHERE companyID = ?
-            """, (companyID,))
-            rows = cursor.fetchall()
+            with self.__pool.reader() as conn:
+                rows = conn.execute("""
+                    SELECT * FROM person 
+                    WHERE companyID = ?
+                """, (companyID,)).fetchall()
+                return self._buildPersons(conn, rows)  # Hidrata Manager/Director corretamente
 
-            persons = []
-            for row in rows:
-                person = self.getPersonByID(row[0])  # Hidrata Manager/Director corretamente
-                if person:
-                    persons.append(person)
+        except Exception as e:
+            logger.error("Falha ao buscar pessoas da empresa %s: %s", companyID, e)
+            return []
 
-            return persons
+# --- MÉTODOS DE BUSCA EM LOTE ---
 
-        except Exception as e:
-            print(f"[ERRO] Falha ao buscar pessoas da empresa {companyID}: {e}")
+    # Máximo de parâmetros por consulta 'IN (...)'
+    _BATCH_SIZE = 500
+
+    def _fetchIn(self, conn: sqlite3.Connection, query: str, ids: list[str]) -> list[sqlite3.Row]:
+        """
+        Executa uma consulta 'IN ({})' para uma lista de ids, em lotes de _BATCH_SIZE.
+        A query deve conter um único '{}' no lugar dos placeholders.
+        """
+        rows = []
+        for start in range(0, len(ids), self._BATCH_SIZE):
+            chunk = ids[start:start + self._BATCH_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            rows.extend(conn.execute(query.format(placeholders), chunk).fetchall())
+        return rows
+
+    def _groupIn(self, conn: sqlite3.Connection, query: str, ids: list[str]) -> dict[str, list[str]]:
+        """
+        Executa uma consulta 'IN' que retorna pares (chave, valor) e os agrupa por chave.
+        """
+        grouped = {}
+        for key, value in self._fetchIn(conn, query, ids):
+            grouped.setdefault(key, []).append(value)
+        return grouped
+
+    @staticmethod
+    def _uniqueIds(ids) -> list[str]:
+        """Remove ids vazios e repetidos, mantendo a ordem."""
+        return list(dict.fromkeys(i for i in ids if i))
+
+    def _buildPersons(self, conn: sqlite3.Connection, rows) -> list[Person]:
+        """
+        Constrói Person/Manager/Director a partir de várias linhas de 'person',
+        buscando os responsibleIds de todos os líderes em uma única consulta.
+        """
+        if not rows:
+            return []
+        columns = tuple(rows[0].keys())
+        idIndex, roleIndex = columns.index("id"), columns.index("role")
+        leaderIds = [row[idIndex] for row in rows if row[roleIndex] in self._LEADER_CLASSES]
+        responsibles = self._groupIn(
+            conn, "SELECT personID, responsibleID FROM person_responsibles WHERE personID IN ({})", leaderIds
+        )
+        return self._mapPersons(rows, columns, lambda row: responsibles.get(row[idIndex], []))
+
+    # Cargos construídos com subclasses de Person (recebem os responsibleIds)
+    _LEADER_CLASSES = {"Manager": Manager, "Director": Director}
+
+    def _mapPersons(self, rows, columns: tuple[str, ...], responsibleIds, skip: tuple[str, ...] = ()) -> list[Person]:
+        """
+        Constrói Person/Manager/Director com os mappers compilados para 'columns'.
+        responsibleIds(row) devolve os responsibleIds de uma linha de líder.
+        """
+        roleIndex = columns.index("role")
+        buildPerson = rowMapper(Person, columns, skip)
+        buildLeader = {role: rowMapper(cls, columns, skip) for role, cls in self._LEADER_CLASSES.items()}
+
+        persons = []
+        for row in rows:
+            build = buildLeader.get(row[roleIndex])
+            if build is None:
+                persons.append(buildPerson(row))
+            else:
+                persons.append(build(row, responsibleIds=responsibleIds(row)))
+        return persons
+
+    def _hydrateTeams(self, conn: sqlite3.Connection, teams: list[Team]) -> list[Team]:
+        """Versão em lote de _hydrateTeam: duas consultas para qualquer número de times."""
+        ids = [team.id for team in teams]
+        employees = self._groupIn(conn, "SELECT teamID, id FROM person WHERE teamID IN ({})", ids)
+        rpes = self._groupIn(conn, "SELECT teamID, rpeID FROM team_rpes WHERE teamID IN ({})", ids)
+        for team in teams:
+            team.employeeIDs = employees.get(team.id, [])
+            team.rpeIds = rpes.get(team.id, [])
+        return teams
+
+    def _hydrateDepartments(self, conn: sqlite3.Connection, departments: list[Department]) -> list[Department]:
+        """Versão em lote de _hydrateDepartment: duas consultas para qualquer número de departamentos."""
+        ids = [department.id for department in departments]
+        teams = self._groupIn(conn, "SELECT departmentID, id FROM team WHERE departmentID IN ({})", ids)
+        rpes = self._groupIn(conn, "SELECT departmentID, rpeID FROM department_rpes WHERE departmentID IN ({})", ids)
+        for department in departments:
+            department.teamIds = teams.get(department.id, [])
+            department.rpeIds = rpes.get(department.id, [])
+        return departments
+
+    @staticmethod
+    def _inOrder(items: list[Entity], ids: list[str]) -> list[Entity]:
+        """Reordena os itens conforme a lista de ids pedida (ids inexistentes são ignorados)."""
+        byId = {item.id: item for item in items}
+        return [byId[i] for i in ids if i in byId]
+
+    def getPersonsByIDs(self, ids: list[str]) -> list[Person]:
+        """
+        Busca várias pessoas de uma vez, com número constante de consultas.
+        Mantém a ordem dos ids recebidos; ids repetidos ou inexistentes são ignorados.
+        """
+        ids = self._uniqueIds(ids)
+        if not ids:
+            return []
+        try:
+            with self.__pool.reader() as conn:
+                rows = self._fetchIn(conn, "SELECT * FROM person WHERE id IN ({})", ids)
+                return self._inOrder(self._buildPersons(conn, rows), ids)
+        except sqlite3.Error as e:
+            logger.error("Falha ao buscar pessoas em lote: %s", e)
+            return []
+
+    def getTeamsByIDs(self, ids: list[str]) -> list[Team]:
+        """
+        Busca vários times de uma vez (já hidratados), com número constante de consultas.
+        """
+        ids = self._uniqueIds(ids)
+        if not ids:
+            return []
+        try:
+            with self.__pool.reader() as conn:
+                rows = self._fetchIn(conn, "SELECT * FROM team WHERE id IN ({})", ids)
+                teams = self._hydrateTeams(conn, mapRows(Team, rows))
+                return self._inOrder(teams, ids)
+        except sqlite3.Error as e:
+            logger.error("Falha ao buscar times em lote: %s", e)
             return []
 
+    def getDepartmentsByIDs(self, ids: list[str]) -> list[Department]:
+        """
+        Busca vários departamentos de uma vez (já hidratados), com número constante de consultas.
+        """
+        ids = self._uniqueIds(ids)
+        if not ids:
+            return []
+        try:
+            with self.__pool.reader() as conn:
+                rows = self._fetchIn(conn, "SELECT * FROM department WHERE id IN ({})", ids)
+                departments = self._hydrateDepartments(conn, mapRows(Department, rows))
+                return self._inOrder(departments, ids)
+        except sqlite3.Error as e:
+            logger.error("Falha ao buscar departamentos em lote: %s", e)
+            return []
+
+# --- MÉTODOS PAGINADOS (keyset: "id > after ORDER BY id") ---
+
+    # Separador usado em group_concat (ids são UUIDs, nunca contêm vírgula)
+    _LIST_SEPARATOR = ","
+
+    @classmethod
+    def _splitList(cls, value: Optional[str]) -> list[str]:
+        return value.split(cls._LIST_SEPARATOR) if value else []
+
+    @staticmethod
+    def _page(rows: list, limit: Optional[int]) -> tuple[list, Optional[str]]:
+        """Separa a linha extra (limit + 1) usada para saber se há próxima página."""
+        if limit is None or len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, rows[-1]["id"]
+
+    def getPersonsPage(self, company_id: str, after: str = None, limit: int = None, role: str = None,
+                       department_id: str = None, team_id: str = None) -> tuple[list[Person], Optional[str]]:
+        """
+        Uma página de pessoas da empresa, em ordem de id, com filtros opcionais.
+        Tudo (inclusive os responsibleIds de gerentes/diretores) vem de uma única consulta.
+        Retorna (pessoas, cursor da próxima página ou None). limit=None traz todas.
+        """
+        filters, params = ["p.companyID = ?"], [company_id]
+        for column, value in (("p.role", role), ("p.departmentID", department_id), ("p.teamID", team_id)):
+            if value is not None:
+                filters.append(f"{column} = ?")
+                params.append(value)
+        if after:
+            filters.append("p.id > ?")
+            params.append(after)
+
+        query = f"""
+            SELECT p.*, (
+                SELECT group_concat(r.responsibleID, '{self._LIST_SEPARATOR}')
+                FROM person_responsibles r WHERE r.personID = p.id
+            ) AS responsibleIds
+            FROM person p
+            WHERE {' AND '.join(filters)}
+            ORDER BY p.id
+        """
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit + 1)
+
+        try:
+            with self.__pool.reader() as conn:
+                rows = conn.execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error("Falha ao paginar pessoas da empresa %s: %s", company_id, e)
+            return [], None
+
+        rows, next_cursor = self._page(rows, limit)
+        if not rows:
+            return [], next_cursor
+        columns = tuple(rows[0].keys())
+        listIndex = columns.index("responsibleIds")
+        persons = self._mapPersons(
+            rows, columns, lambda row: self._splitList(row[listIndex]), skip=("responsibleIds",)
+        )
+        return persons, next_cursor
+
+    def getTeamsPage(self, company_id: str = None, after: str = None, limit: int = None,
+                     department_id: str = None) -> tuple[list[Team], Optional[str]]:
+        """
+        Uma página de times (opcionalmente de uma empresa/departamento), em ordem de id.
+        employeeIDs e rpeIds vêm na mesma consulta. Retorna (times, próximo cursor ou None).
+        """
+        filters, params = [], []
+        if company_id is not None:
+            filters.append("t.departmentID IN (SELECT id FROM department WHERE companyID = ?)")
+            params.append(company_id)
+        if department_id is not None:
+            filters.append("t.departmentID = ?")
+            params.append(department_id)
+        if after:
+            filters.append("t.id > ?")
+            params.append(after)
+
+        sep = self._LIST_SEPARATOR
+        query = f"""
+            SELECT t.*,
+                (SELECT group_concat(p.id, '{sep}') FROM person p WHERE p.teamID = t.id) AS employeeIDs,
+                (SELECT group_concat(j.rpeID, '{sep}') FROM team_rpes j WHERE j.teamID = t.id) AS rpeIds
+            FROM team t
+            {'WHERE ' + ' AND '.join(filters) if filters else ''}
+            ORDER BY t.id
+        """
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit + 1)
+
+        try:
+            with self.__pool.reader() as conn:
+                rows = conn.execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error("Falha ao paginar times: %s", e)
+            return [], None
+
+        rows, next_cursor = self._page(rows, limit)
+        if not rows:
+            return [], next_cursor
+        columns = tuple(rows[0].keys())
+        employeesIndex, rpesIndex = columns.index("employeeIDs"), columns.index("rpeIds")
+        build = rowMapper(Team, columns, ("employeeIDs", "rpeIds"))
+        split = self._splitList
+        teams = []
+        for row in rows:
+            team = build(row, rpeIds=split(row[rpesIndex]))
+            team.employeeIDs = split(row[employeesIndex])  # mesmo atributo preenchido por _hydrateTeam
+            teams.append(team)
+        return teams, next_cursor
+
+# --- INSERÇÃO EM LOTE ---
+
+    # Tipo → (tabela, INSERT, função que monta a linha) das entidades de organização
+    _BULK_INSERTS = (
+        (Person, "person", """INSERT INTO person (
+            id, name, cpf, companyID, departmentID, teamID, role, email, password
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            lambda p: (p.id, p.name, p.cpf, p.companyID, p.departmentID, p.teamID,
+                       getattr(p, 'role', None), p.email, _storedPassword(p.password))),
+        (Company, "company", "INSERT INTO company (id, name, cnpj) VALUES (?, ?, ?)",
+            lambda c: (c.id, c.name, c.cnpj)),
+        (Department, "department", "INSERT INTO department (id, name, companyID, directorID) VALUES (?, ?, ?, ?)",
+            lambda d: (d.id, d.name, d.companyID, d.directorID)),
+        (Team, "team", "INSERT INTO team (id, name, departmentID, managerID) VALUES (?, ?, ?, ?)",
+            lambda t: (t.id, t.name, t.departmentID, t.managerID)),
+    )
+
+    def addItems(self, items: list[Entity]) -> list[Optional[str]]:
+        """
+        Insere muitas entidades de organização (Company, Department, Team, Person)
+        em uma única transação, com executemany para cada sequência do mesmo tipo.
+        Se um lote falhar (ex.: FK ou UNIQUE), ele é refeito linha a linha para
+        identificar as linhas com erro; as demais são inseridas normalmente.
+        Retorna, para cada item, None (inserido) ou a mensagem de erro.
+        """
+        errors = [None] * len(items)
+        runs = []  # [(tabela, sql, [(índice, linha), ...])]
+        for index, item in enumerate(items):
+            spec = next((spec for spec in self._BULK_INSERTS if isinstance(item, spec[0])), None)
+            if spec is None:
+                errors[index] = f"Tipo não suportado na inserção em lote: {type(item).__name__}"
+                continue
+            _, table, sql, toRow = spec
+            if not runs or runs[-1][0] != table:
+                runs.append((table, sql, []))
+            runs[-1][2].append((index, toRow(item)))
+
+        with self.__pool.writer() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            for table, sql, rows in runs:
+                try:
+                    conn.execute("SAVEPOINT bulk_insert")
+                    conn.executemany(sql, [row for _, row in rows])
+                    conn.execute("RELEASE bulk_insert")
+                except sqlite3.Error:
+                    conn.execute("ROLLBACK TO bulk_insert")
+                    conn.execute("RELEASE bulk_insert")
+                    for index, row in rows:
+                        try:
+                            conn.execute("SAVEPOINT bulk_row")
+                            conn.execute(sql, row)
+                            conn.execute("RELEASE bulk_row")
+                        except sqlite3.Error as e:
+                            conn.execute("ROLLBACK TO bulk_row")
+                            conn.execute("RELEASE bulk_row")
+                            errors[index] = str(e)
+                self._changed(table)
+
+            # Novas linhas entram em listas hidratadas (employeeIDs, teamIds...) de vários pais
+            self.__pool.afterCommit(self.__cache.clear)
+
+            # Índice da hierarquia: só as linhas efetivamente inseridas
+            inserted = []
+            for item, error in zip(items, errors):
+                if error is None:
+                    table = self._tableOf(item)
+                    inserted.append((table, item.id, {c: getattr(item, c) for c in OrgIndex.COLUMNS[table]}))
+            self.__pool.afterCommit(lambda: self.__org.setRows(inserted))
+
+        return errors
+
+    # Referências gravadas depois das entidades: tipo → (tabela, SQL)
+    _BULK_REFERENCES = {
+        "director": ("department", "UPDATE department SET directorID = ? WHERE id = ?"),
+        "manager": ("team", "UPDATE team SET managerID = ? WHERE id = ?"),
+        "responsible": ("person_responsibles",
+                        "INSERT OR IGNORE INTO person_responsibles (responsibleID, personID) VALUES (?, ?)"),
+    }
+
+    def addReferences(self, references: list[tuple[str, str, str]]) -> list[Optional[str]]:
+        """
+        Grava, em uma única transação, referências entre entidades já inseridas
+        por addItems que não podiam ir junto com a linha (a pessoa referenciada
+        vem depois no arquivo importado):
+            ("director", departmentID, personID)     → department.directorID
+            ("manager", teamID, personID)            → team.managerID
+            ("responsible", personID, responsibleID) → linha em person_responsibles
+        Retorna, para cada referência, None (gravada) ou a mensagem de erro.
+        """
+        errors = [None] * len(references)
+        with self.__pool.writer() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            tables = set()
+            for index, (kind, row_id, target_id) in enumerate(references):
+                if kind not in self._BULK_REFERENCES:
+                    errors[index] = f"Referência desconhecida: {kind}"
+                    continue
+                table, sql = self._BULK_REFERENCES[kind]
+                try:
+                    conn.execute("SAVEPOINT bulk_reference")
+                    cursor = conn.execute(sql, (target_id, row_id))
+                    conn.execute("RELEASE bulk_reference")
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO bulk_reference")
+                    conn.execute("RELEASE bulk_reference")
+                    errors[index] = str(e)
+                    continue
+                if table in OrgIndex.COLUMNS:
+                    if cursor.rowcount == 0:
+                        errors[index] = f"{table} {row_id} não encontrado"
+                        continue
+                    column = "directorID" if kind == "director" else "managerID"
+                    self._indexRow(table, row_id, {column: target_id})
+                tables.add(table)
+
+            if tables:
+                self._changed(*tables)
+                self.__pool.afterCommit(self.__cache.clear)
+        return errors
+
+# --- EXPORTAÇÃO (geradores) ---
+
+    # RPEs ligados à empresa, a um de seus departamentos ou a um de seus times
+    _EXPORT_RPE_IDS = """
+        SELECT rpeID FROM company_rpes WHERE companyID = :company
+        UNION
+        SELECT j.rpeID FROM department_rpes j
+        JOIN department d ON d.id = j.departmentID WHERE d.companyID = :company
+        UNION
+        SELECT j.rpeID FROM team_rpes j
+        JOIN team t ON t.id = j.teamID
+        JOIN department d ON d.id = t.departmentID WHERE d.companyID = :company
+    """
+    _EXPORT_OBJECTIVE_IDS = f"SELECT id FROM objective WHERE rpeID IN ({_EXPORT_RPE_IDS})"
+    _EXPORT_KPI_IDS = f"SELECT id FROM kpi WHERE objectiveID IN ({_EXPORT_OBJECTIVE_IDS})"
+
+    # (tipo, consulta) na ordem em que as entidades são exportadas (pais antes dos filhos)
+    _EXPORT_QUERIES = (
+        ("company", "SELECT * FROM company WHERE id = :company"),
+        ("department", "SELECT * FROM department WHERE companyID = :company ORDER BY id"),
+        ("team", """
+            SELECT t.* FROM team t JOIN department d ON d.id = t.departmentID
+            WHERE d.companyID = :company ORDER BY t.id
+        """),
+        # Senhas não são exportadas
+        ("person", f"""
+            SELECT id, name, cpf, companyID, departmentID, teamID, role, email, (
+                SELECT group_concat(r.responsibleID, '{_LIST_SEPARATOR}') FROM person_responsibles r WHERE r.personID = p.id
+            ) AS responsibleIds
+            FROM person p WHERE companyID = :company ORDER BY id
+        """),
+        ("rpe", f"""
+            SELECT r.*,
+                (SELECT group_concat(companyID, '{_LIST_SEPARATOR}') FROM company_rpes WHERE rpeID = r.id) AS companyIds,
+                (SELECT group_concat(departmentID, '{_LIST_SEPARATOR}') FROM department_rpes WHERE rpeID = r.id) AS departmentIds,
+                (SELECT group_concat(teamID, '{_LIST_SEPARATOR}') FROM team_rpes WHERE rpeID = r.id) AS teamIds
+            FROM rpe r WHERE r.id IN ({_EXPORT_RPE_IDS}) ORDER BY r.id
+        """),
+        ("objective", f"SELECT * FROM objective WHERE id IN ({_EXPORT_OBJECTIVE_IDS}) ORDER BY id"),
+        ("kpi", f"""
+            SELECT id, description, responsibleID, objectiveID, date FROM kpi
+            WHERE id IN ({_EXPORT_KPI_IDS}) AND goal IS NULL ORDER BY id
+        """),
+        ("kr", f"""
+            SELECT id, description, responsibleID, objectiveID, date, goal FROM kpi
+            WHERE id IN ({_EXPORT_KPI_IDS}) AND goal IS NOT NULL ORDER BY id
+        """),
+    )
+    _EXPORT_READINGS = ("reading", f"""
+        SELECT kpiID, timestamp, value FROM kpi_reading
+        WHERE kpiID IN ({_EXPORT_KPI_IDS}) ORDER BY kpiID, timestamp, id
+    """)
+
+    # Colunas com listas de ids (group_concat) convertidas para listas no export
+    _EXPORT_LIST_COLUMNS = ("responsibleIds", "companyIds", "departmentIds", "teamIds")
+
+    def exportCompany(self, company_id: str, readings: bool = False,
+                      batch_size: int = 500) -> Iterator[tuple[str, dict]]:
+        """
+        Gera (tipo, dados) para cada entidade da empresa: company, department,
+        team, person, rpe, objective, kpi, kr (e reading, se 'readings').
+        Os cursores são percorridos com fetchmany(batch_size), então a memória
+        usada não depende do tamanho da empresa. Tudo é lido de um único
+        snapshot do banco, em uma conexão aberta só para este gerador (e
+        fechada quando ele termina ou é fechado), fora do pool de leitores.
+        """
+        queries = self._EXPORT_QUERIES + ((self._EXPORT_READINGS,) if readings else ())
+        params = {"company": company_id}
+
+        with self.__pool.snapshot() as conn:
+            for entity_type, query in queries:
+                cursor = conn.execute(query, params)
+                columns = [description[0] for description in cursor.description]
+                listColumns = [column for column in columns if column in self._EXPORT_LIST_COLUMNS]
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        data = dict(zip(columns, row))
+                        for column in listColumns:
+                            data[column] = self._splitList(data[column])
+                        yield entity_type, data
+
 # --- MÉTODOS DE MUDANÇA DE ESTADO ---
 
+    def setPassword(self, personID: str, password: str):
+        """
+        Grava a senha (já em hash, ver model.security.passwords) de uma pessoa,
+        sem reescrever as demais colunas. Usado na migração de hashes no login.
+        """
+        try:
+            with self.__pool.writer() as conn:
+                cursor = conn.execute("UPDATE person SET password = ? WHERE id = ?", (password, personID))
+                if cursor.rowcount == 0:
+                    logger.warning("Nenhuma pessoa encontrada com o ID %s. Senha não alterada.", personID)
+                    return 1
+                self._invalidateRow("person", personID, {})
+                self._changed("person")
+            return 0
+
+        except sqlite3.Error as e:
+            logger.error("Falha ao gravar a senha da pessoa (ID: %s): %s", personID, e)
+            return 1
+
     def changeTeamManager(self, teamID: str, personID: str):
         """
         Muda o managerID de um time (team) para um novo personID.
@@ -1135,8 +1882,8 @@ class Database:
             personID_to_set = personID
 
         try:
-            with self.__db: # Inicia uma transação
-                cursor = self.__db.execute(
+            with self.__pool.writer() as conn: # Inicia uma transação
+                cursor = conn.execute(
                     """UPDATE team 
                        SET managerID = ? 
                        WHERE id = ?""", 
@@ -1144,14 +1891,17 @@ class Database:
                 )
                 
                 if cursor.rowcount == 0:
-                    print(f"[AVISO] Nenhum time encontrado com o ID {teamID}. Gerente não alterado.")
+                    logger.warning("Nenhum time encontrado com o ID %s. Gerente não alterado.", teamID)
                     return 1 # Código de falha
+                self._invalidateRow("team", teamID, {})
+                self._indexRow("team", teamID, {"managerID": personID_to_set})
+                self._changed("team")
                     
-            print(f"Gerente do Time (ID: {teamID}) alterado para PersonID: {personID_to_set}.")
+            logger.debug("Gerente do Time (ID: %s) alterado para PersonID: %s.", teamID, personID_to_set)
             return 0 # Código de sucesso
             
         except sqlite3.Error as e:
-            print(f"[ERRO] Falha ao mudar Gerente do Time (ID: {teamID}): {e}")
+            logger.error("Falha ao mudar Gerente do Time (ID: %s): %s", teamID, e)
             return 1 # Código de falha
 
     def changeDepartmentDirector(self, departmentID: str, personID: str):
@@ -1165,8 +1915,8 @@ class Database:
             personID_to_set = personID
 
         try:
-            with self.__db: # Inicia uma transação
-                cursor = self.__db.execute(
+            with self.__pool.writer() as conn: # Inicia uma transação
+                cursor = conn.execute(
                     """UPDATE department 
                        SET directorID = ? 
                        WHERE id = ?""", 
@@ -1174,14 +1924,17 @@ class Database:
                 )
                 
                 if cursor.rowcount == 0:
-                    print(f"[AVISO] Nenhum departamento encontrado com o ID {departmentID}. Diretor não alterado.")
+                    logger.warning("Nenhum departamento encontrado com o ID %s. Diretor não alterado.", departmentID)
                     return 1 # Código de falha
+                self._invalidateRow("department", departmentID, {})
+                self._indexRow("department", departmentID, {"directorID": personID_to_set})
+                self._changed("department")
                     
-            print(f"Diretor do Departamento (ID: {departmentID}) alterado para PersonID: {personID_to_set}.")
+            logger.debug("Diretor do Departamento (ID: %s) alterado para PersonID: %s.", departmentID, personID_to_set)
             return 0 # Código de sucesso
 
         except sqlite3.Error as e:
-            print(f"[ERRO] Falha ao mudar Diretor do Departamento (ID: {departmentID}): {e}")
+            logger.error("Falha ao mudar Diretor do Departamento (ID: %s): %s", departmentID, e)
             return 1 # Código de falha
 
 # --- MÉTODOS BOOLEAN ---    
@@ -1192,11 +1945,12 @@ class Database:
         verificando se o seu RPE associado está ligado a um Team ou Department.
         """
         try:
-            cursor = self.__db.cursor()
+            with self.__pool.reader() as conn:
+                cursor = conn.cursor()
 
-            # 1) Descobre o rpeID do Objective
-            cursor.execute("SELECT rpeID FROM objective WHERE id = ?", (objectiveID,))
-            row = cursor.fetchone()
+                # 1) Descobre o rpeID do Objective
+                cursor.execute("SELECT rpeID FROM objective WHERE id = ?", (objectiveID,))
+                row = cursor.fetchone()
 
             if not row:
                 # Se não existir RPE associado, não é Team/Department
@@ -1208,7 +1962,7 @@ class Database:
             return self.isRPETeamOrDepartmentLevel(rpeID)
 
         except sqlite3.Error as e:
-            print(f"[ERRO] Falha ao verificar nível do Objective {objectiveID}: {e}")
+            logger.error("Falha ao verificar nível do Objective %s: %s", objectiveID, e)
             return False
 
     def isRPETeamOrDepartmentLevel(self, rpeID: str) -> bool:
@@ -1219,8 +1973,6 @@ class Database:
         Retorna True se houver associação com Team ou Department, False caso contrário.
         """
         try:
-            cursor = self.__db.cursor()
-            
             # Consulta SQL Otimizada:
             # Verifica se o rpeID existe em team_rpes OU em department_rpes.
             query = """
@@ -1235,14 +1987,25 @@ class Database:
                 LIMIT 1;
             """
             
-            # Passamos o rpeID duas vezes para a consulta (uma para cada WHERE)
-            cursor.execute(query, (rpeID, rpeID))
-            
-            # Se fetchone() retornar uma linha, significa que o RPE está associado a pelo
-            # menos um Team OU a um Department.
-            return cursor.fetchone() is not None
+            with self.__pool.reader() as conn:
+                cursor = conn.cursor()
+                # Passamos o rpeID duas vezes para a consulta (uma para cada WHERE)
+                cursor.execute(query, (rpeID, rpeID))
+                
+                # Se fetchone() retornar uma linha, significa que o RPE está associado a pelo
+                # menos um Team OU a um Department.
+                return cursor.fetchone() is not None
 
         except sqlite3.Error as e:
-            print(f"[ERRO] Falha ao verificar nível do RPE {rpeID}: {e}")
+            logger.error("Falha ao verificar nível do RPE %s: %s", rpeID, e)
             # Em caso de erro, assume que a verificação falhou.
-            return False
\ No newline at end of file
+            return False
+
+
+# Latência (histograma, cujo _count é o número de chamadas) e exceções de cada
+# método público do Database, expostas em /metrics
+instrumentMethods(
+    Database,
+    REGISTRY.histogram("db_method_duration_seconds", "Duração das chamadas aos métodos do Database", ("method",)),
+    REGISTRY.counter("db_method_errors_total", "Exceções propagadas pelos métodos do Database", ("method",)),
+)
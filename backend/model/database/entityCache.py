@@ -0,0 +1,99 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from ..entities.entity import Entity
+
+
+class EntityCache:
+    """
+    Cache LRU com expiração (TTL) para entidades já hidratadas,
+    indexado por (tipo da entidade, id).
+
+    As entidades são copiadas na entrada e na saída: quem recebe um objeto
+    do cache pode alterá-lo (e depois chamar updateItem) sem afetar os demais.
+
+    Para evitar que uma leitura iniciada antes de uma escrita grave no cache
+    um valor já desatualizado, put() recebe a 'version' lida antes da consulta
+    e é ignorado se houve qualquer invalidação nesse meio tempo.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.__maxsize = maxsize
+        self.__ttl = ttl
+        self.__entries = OrderedDict()  # (kind, id) -> (expira_em, entidade)
+        self.__lock = threading.Lock()
+        self.__version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def version(self) -> int:
+        return self.__version
+
+    def get(self, kind: str, entity_id: str) -> Optional[Entity]:
+        if self.__maxsize <= 0:
+            return None
+        key = (kind, entity_id)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.__entries[key]
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            entity = entry[1]
+        return copy.deepcopy(entity)
+
+    def put(self, kind: str, entity_id: str, entity: Entity, version: int) -> None:
+        if self.__maxsize <= 0 or entity is None:
+            return
+        entity = copy.deepcopy(entity)
+        key = (kind, entity_id)
+        with self.__lock:
+            if version != self.__version:
+                return
+            self.__entries[key] = (time.monotonic() + self.__ttl, entity)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__maxsize:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, kind: str, entity_id: str) -> None:
+        with self.__lock:
+            self.__version += 1
+            self.__entries.pop((kind, entity_id), None)
+
+    def invalidateReferencing(self, kind: str, attribute: str, child_id: str) -> None:
+        """Remove as entidades de 'kind' cuja lista 'attribute' contém child_id."""
+        with self.__lock:
+            self.__version += 1
+            stale = [
+                key for key, (_, entity) in self.__entries.items()
+                if key[0] == kind and child_id in (getattr(entity, attribute, None) or ())
+            ]
+            for key in stale:
+                del self.__entries[key]
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__version += 1
+            self.__entries.clear()
+
+    def stats(self) -> dict:
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.__entries),
+                "maxsize": self.__maxsize,
+                "ttl": self.__ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
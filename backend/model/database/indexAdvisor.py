@@ -0,0 +1,196 @@
+"""
+Diagnóstico de índices do banco.
+
+Executa as consultas de leitura do Database contra um arquivo SQLite, captura
+cada comando SQL emitido e roda EXPLAIN QUERY PLAN em cada formato distinto,
+apontando os que ainda fazem varredura de tabela (SCAN). Também lista chaves
+estrangeiras sem índice (que tornam ON DELETE CASCADE / SET NULL uma varredura).
+
+O arquivo analisado não é alterado: é aberto somente leitura (mode=ro) para os
+EXPLAIN, e o workload roda sobre uma cópia temporária — abrir um Database
+aplicaria migrações, índices e o modo WAL no arquivo diagnosticado.
+
+Uso (a partir de backend/):
+    python -m model.database.indexAdvisor database.db
+"""
+import argparse
+import os
+import pathlib
+import sqlite3
+import sys
+import tempfile
+
+from .database import Database
+from .queryLog import normalizeSql
+
+# Id usado quando a tabela não possui linhas (o plano não depende dos dados)
+_PLACEHOLDER_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def _sampleId(conn: sqlite3.Connection, query: str) -> str:
+    row = conn.execute(query).fetchone()
+    return row[0] if row and row[0] is not None else _PLACEHOLDER_ID
+
+
+def _workload(db: Database, conn: sqlite3.Connection) -> list:
+    """Chamadas que exercitam todas as consultas de leitura do Database."""
+    person = _sampleId(conn, "SELECT id FROM person ORDER BY role IN ('Manager', 'Director') DESC LIMIT 1")
+    email = _sampleId(conn, "SELECT email FROM person LIMIT 1")
+    company = _sampleId(conn, "SELECT id FROM company LIMIT 1")
+    cnpj = _sampleId(conn, "SELECT cnpj FROM company LIMIT 1")
+    department = _sampleId(conn, "SELECT id FROM department LIMIT 1")
+    team = _sampleId(conn, "SELECT id FROM team LIMIT 1")
+    rpe = _sampleId(conn, "SELECT id FROM rpe LIMIT 1")
+    objective = _sampleId(conn, "SELECT id FROM objective LIMIT 1")
+    kpi = _sampleId(conn, "SELECT id FROM kpi LIMIT 1")
+
+    calls = [
+        lambda: db.getPersonByID(person),
+        lambda: db.getPersonByEmail(email),
+        lambda: db.getResponsibleIDs(person),
+        lambda: db.getCompanyByID(company),
+        lambda: db.getCompanyByCnpj(cnpj),
+        lambda: db.getCompanyByName(company),
+        lambda: db.getDepartmentByID(department),
+        lambda: db.getDepartmentByName(department),
+        lambda: db.getTeamByID(team),
+        lambda: db.getTeamByName(team),
+        lambda: db.getTeams(),
+        lambda: db.getRPEByID(rpe),
+        lambda: db.getRPEsByCompanyID(company),
+        lambda: db.getRPEsByDepartmentID(department),
+        lambda: db.getRPEsByTeamID(team),
+        lambda: db.getObjectiveByID(objective),
+        lambda: db.getObjectivesByRPE(rpe),
+        lambda: db.getMeasureByID(kpi),
+        lambda: db.getKPIsByObjective(objective),
+        lambda: db.getKRsByObjective(objective),
+        lambda: db.getReadings(kpi),
+        lambda: db.getLastReading(kpi),
+        lambda: db.getReadingSeries(kpi, 0, 1e12, 3600, "avg"),
+        lambda: db.getDepartmentsByCompanyID(company),
+        lambda: db.getTeamsByDepartmentID(department),
+        lambda: db.getPersonsByTeamID(team),
+        lambda: db.getPersonsByDepartmentID(department),
+        lambda: db.getPersonsByCompanyID(company),
+        lambda: db.getPersonsByIDs([person]),
+        lambda: db.getTeamsByIDs([team]),
+        lambda: db.getDepartmentsByIDs([department]),
+        lambda: db.getPersonsPage(company, person, 100),
+        lambda: db.getTeamsPage(company, team, 100),
+        lambda: db.isObjectiveTeamOrDepartmentLevel(objective),
+        lambda: db.isRPETeamOrDepartmentLevel(rpe),
+    ]
+    for group_type, group_id in (("Company", company), ("Department", department), ("Team", team)):
+        for data_type in ("RPE", "Objective", "KPI", "KR"):
+            calls.append(lambda g=group_type, i=group_id, d=data_type: db.getDataByEntity(g, i, d))
+    return calls
+
+
+def captureStatements(db: Database, conn: sqlite3.Connection) -> dict[str, str]:
+    """Executa o workload e devolve {formato normalizado: exemplo de SQL}."""
+    statements = {}
+
+    def trace(sql: str):
+        head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+        if head in ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT"):
+            statements.setdefault(normalizeSql(sql), sql)
+
+    db.traceStatements(trace)
+    try:
+        for call in _workload(db, conn):
+            call()
+    finally:
+        db.traceStatements(None)
+    return statements
+
+
+def explain(conn: sqlite3.Connection, sql: str) -> list[str]:
+    """Linhas de EXPLAIN QUERY PLAN de um comando (com os parâmetros já expandidos)."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def scans(plan: list[str]) -> list[str]:
+    """Passos do plano que percorrem uma tabela (ou índice) inteira."""
+    return [step for step in plan if step.startswith("SCAN ") and "CONSTANT ROW" not in step]
+
+
+def unindexedForeignKeys(conn: sqlite3.Connection) -> list[tuple[str, str, str]]:
+    """
+    Chaves estrangeiras cuja coluna não é a primeira de nenhum índice:
+    (tabela, coluna, tabela referenciada).
+    """
+    missing = []
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )]
+    for table in tables:
+        leading = set()
+        for index in conn.execute(f"PRAGMA index_list({table})"):
+            columns = conn.execute(f"PRAGMA index_info({index[1]})").fetchall()
+            if columns:
+                leading.add(columns[0][2])
+        for fk in conn.execute(f"PRAGMA foreign_key_list({table})"):
+            if fk[3] not in leading:
+                missing.append((table, fk[3], fk[2]))
+    return missing
+
+
+def openReadOnly(path: str) -> sqlite3.Connection:
+    """Conexão somente leitura: não cria o arquivo, não migra e não muda o journal."""
+    return sqlite3.connect(f"{pathlib.Path(path).resolve().as_uri()}?mode=ro", uri=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Aponta consultas do Database que ainda fazem SCAN.")
+    parser.add_argument("db_path", nargs="?", default="database.db", help="arquivo SQLite a analisar")
+    args = parser.parse_args(argv)
+    if not os.path.isfile(args.db_path):
+        parser.error(f"{args.db_path} não existe")
+
+    conn = openReadOnly(args.db_path)
+    try:
+        # O workload passa pelo Database (para capturar o SQL que ele emite),
+        # que migra o arquivo que abre: roda sobre uma cópia descartável
+        with tempfile.TemporaryDirectory() as directory:
+            copy = sqlite3.connect(os.path.join(directory, "advisor.db"))
+            conn.backup(copy)
+            copy.close()
+            db = Database(os.path.join(directory, "advisor.db"), pool_size=1)
+            try:
+                statements = captureStatements(db, conn)
+            finally:
+                db.close()
+
+        flagged = 0
+        print(f"\n{len(statements)} formatos de consulta capturados.\n")
+        for shape, sql in sorted(statements.items()):
+            try:
+                plan = explain(conn, sql)
+            except sqlite3.Error as e:
+                # Ex.: tabela criada por uma migração que o arquivo ainda não recebeu
+                print(f"[ERRO] {shape}\n         -> {e}")
+                flagged += 1
+                continue
+            found = scans(plan)
+            status = "SCAN" if found else "OK  "
+            flagged += bool(found)
+            print(f"[{status}] {shape}")
+            for step in found:
+                print(f"         -> {step}")
+
+        missing = unindexedForeignKeys(conn)
+    finally:
+        conn.close()
+
+    if missing:
+        print("\nChaves estrangeiras sem índice (cascatas varrem a tabela):")
+        for table, column, parent in missing:
+            print(f"   {table}.{column} -> {parent}")
+
+    print(f"\nResumo: {flagged} consulta(s) com SCAN, {len(missing)} FK(s) sem índice.")
+    return 1 if flagged or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+import sqlite3
+
+# Prefixo dos índices gerenciados pelo Database (índices com outro nome não são tocados)
+MANAGED_PREFIX = "idx_"
+
+# Índices secundários gerenciados: nome → (tabela, colunas)
+MANAGED_INDEXES = {
+    # Buscas por atributo (login, getXByName)
+    "idx_person_email": ("person", ("email",)),
+    "idx_company_name": ("company", ("name",)),
+    "idx_department_name": ("department", ("name",)),
+    "idx_team_name": ("team", ("name",)),
+
+    # Chaves estrangeiras (hidratação e ON DELETE CASCADE / SET NULL)
+    "idx_person_company_id": ("person", ("companyID", "id")),  # também serve à paginação por empresa
+    "idx_person_department": ("person", ("departmentID",)),
+    "idx_person_team": ("person", ("teamID",)),
+    "idx_department_company": ("department", ("companyID",)),
+    "idx_department_director": ("department", ("directorID",)),
+    "idx_team_department": ("team", ("departmentID",)),
+    "idx_team_manager": ("team", ("managerID",)),
+    "idx_rpe_responsible": ("rpe", ("responsibleID",)),
+    "idx_objective_rpe": ("objective", ("rpeID",)),
+    "idx_objective_responsible": ("objective", ("responsibleID",)),
+    "idx_kpi_objective": ("kpi", ("objectiveID", "goal")),
+    "idx_kpi_responsible": ("kpi", ("responsibleID",)),
+    "idx_kpi_reading_kpi": ("kpi_reading", ("kpiID", "timestamp")),
+
+    # Lado "reverso" das tabelas de junção (a PRIMARY KEY já cobre a primeira coluna)
+    "idx_person_responsibles_responsible": ("person_responsibles", ("responsibleID",)),
+    "idx_company_directors_person": ("company_directors", ("personID",)),
+    "idx_company_rpes_rpe": ("company_rpes", ("rpeID",)),
+    "idx_department_rpes_rpe": ("department_rpes", ("rpeID",)),
+    "idx_team_rpes_rpe": ("team_rpes", ("rpeID",)),
+
+    # Rollups: nós afetados por uma nova leitura de um KR
+    "idx_kr_node_kr": ("kr_node", ("krID",)),
+}
+
+
+def ensureIndexes(conn: sqlite3.Connection, indexes: dict = MANAGED_INDEXES) -> None:
+    """
+    Cria os índices gerenciados que ainda não existem e remove os índices
+    gerenciados (prefixo 'idx_') que saíram da lista.
+    Índices de tabelas que ainda não existem são ignorados (a migração que
+    cria a tabela chama ensureIndexes novamente).
+    """
+    existing = {
+        row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE ?", (MANAGED_PREFIX + "%",)
+        )
+    }
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    for name in existing - indexes.keys():
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    for name, (table, columns) in indexes.items():
+        if name not in existing and table in tables:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
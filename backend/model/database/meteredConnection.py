@@ -0,0 +1,164 @@
+import functools
+import sqlite3
+import time
+
+from ..monitoring.metrics import REGISTRY
+
+_STATEMENTS = REGISTRY.counter(
+    "sqlite_statements_total", "Comandos SQL executados, por tipo", ("statement",))
+_ROWS_READ = REGISTRY.counter(
+    "sqlite_rows_read_total", "Linhas entregues por fetchone/fetchmany/fetchall")
+_ROWS_WRITTEN = REGISTRY.counter(
+    "sqlite_rows_written_total", "Linhas inseridas, atualizadas ou removidas")
+_ERRORS = REGISTRY.counter(
+    "sqlite_errors_total", "Comandos que falharam (sqlite3.Error)")
+
+_KINDS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+# Séries já resolvidas: o caminho quente não passa por labels()
+_STATEMENT_SERIES = {kind: _STATEMENTS.labels(kind) for kind in _KINDS + ("OTHER",)}
+_ROWS_READ_SERIES = _ROWS_READ.labels()
+_ROWS_WRITTEN_SERIES = _ROWS_WRITTEN.labels()
+_ERROR_SERIES = _ERRORS.labels()
+
+
+@functools.lru_cache(maxsize=1024)
+def _statementKind(sql: str) -> str:
+    """Tipo do comando pela primeira palavra (WITH ... SELECT conta como SELECT)."""
+    word = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    if word == "WITH":
+        return "SELECT"
+    return word if word in _KINDS else "OTHER"
+
+
+def _record(sql: str, rowcount: int) -> str:
+    kind = _statementKind(sql)
+    _STATEMENT_SERIES[kind].inc()
+    if kind != "SELECT" and kind != "OTHER" and rowcount > 0:
+        _ROWS_WRITTEN_SERIES.inc(rowcount)
+    return kind
+
+
+class MeteredCursor(sqlite3.Cursor):
+    """
+    Cursor que conta comandos, linhas lidas/escritas e erros nas métricas do
+    processo. Linhas percorridas iterando o cursor diretamente (for row in
+    cursor) não são contadas, para não pagar uma chamada Python por linha.
+
+    Se a conexão tem um QueryLog, também mede cada comando. Um SELECT fica
+    pendente até a leitura das linhas (fetchall, fetchmany até esgotar ou o
+    primeiro fetchone), para que o tempo inclua os passos feitos na leitura;
+    se o cursor for iterado, conta só o tempo do execute.
+    """
+
+    _pending = None  # [sql, parâmetros, segundos, linhas] do SELECT em leitura
+
+    def execute(self, sql, parameters=()):
+        self._flush()
+        started = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        except sqlite3.Error:
+            _ERROR_SERIES.inc()
+            raise
+        elapsed = time.perf_counter() - started
+        kind = _record(sql, self.rowcount)
+        log = self.connection.queryLog
+        if log is not None:
+            if kind == "SELECT":
+                self._pending = [sql, parameters, elapsed, 0]
+            else:
+                log.record(self.connection, sql, parameters, elapsed, self.rowcount)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._flush()
+        started = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        except sqlite3.Error:
+            _ERROR_SERIES.inc()
+            raise
+        elapsed = time.perf_counter() - started
+        _record(sql, self.rowcount)
+        log = self.connection.queryLog
+        if log is not None:
+            # Os parâmetros podem vir de um gerador (já consumido): não são guardados
+            log.record(self.connection, sql, None, elapsed, self.rowcount)
+        return self
+
+    def executescript(self, sql_script):
+        self._flush()
+        try:
+            super().executescript(sql_script)
+        except sqlite3.Error:
+            _ERROR_SERIES.inc()
+            raise
+        _STATEMENT_SERIES["OTHER"].inc()
+        return self
+
+    def _flush(self, elapsed: float = 0.0, rows: int = 0, done: bool = True) -> None:
+        """Soma uma leitura ao SELECT pendente e, se terminou, registra no QueryLog."""
+        pending = self._pending
+        if pending is None:
+            return
+        pending[2] += elapsed
+        pending[3] += rows
+        if done:
+            self._pending = None
+            self.connection.queryLog.record(self.connection, *pending)
+
+    def __iter__(self):
+        self._flush()
+        return self
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        if row is not None:
+            _ROWS_READ_SERIES.inc()
+        if self._pending is not None:
+            self._flush(time.perf_counter() - started, row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        _ROWS_READ_SERIES.inc(len(rows))
+        if self._pending is not None:
+            self._flush(time.perf_counter() - started, len(rows), done=len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        _ROWS_READ_SERIES.inc(len(rows))
+        if self._pending is not None:
+            self._flush(time.perf_counter() - started, len(rows))
+        return rows
+
+    def close(self):
+        self._flush()
+        super().close()
+
+
+class MeteredConnection(sqlite3.Connection):
+    """
+    Conexão cujos cursores (inclusive os criados por conn.execute) são
+    MeteredCursor. Usada como 'factory' de sqlite3.connect pelo ConnectionPool,
+    que também define o QueryLog (ou None) de cada conexão.
+    """
+
+    queryLog = None
+
+    def cursor(self, factory=MeteredCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
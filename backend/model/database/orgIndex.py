@@ -0,0 +1,300 @@
+import logging
+import sqlite3
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class OrgIndex:
+    """
+    Índice em memória da hierarquia company → department → team → person
+    (mais o cargo de cada pessoa, o diretor de cada departamento e o gerente
+    de cada time).
+
+    Carregado uma vez por load() e mantido pelo Database depois de cada commit
+    que altera as tabelas de organização: setRow() aplica as colunas escritas
+    e removeRow() reproduz as ações das FKs do schema (ON DELETE CASCADE /
+    SET NULL). Assim, perguntas como "todas as pessoas sob o departamento D"
+    ou "a que empresa pertence este time" são respondidas sem SQL.
+
+    As consultas nunca vão ao banco. Escritas feitas por outros processos (ou
+    outro Database no mesmo arquivo) não passam por setRow(): o OrgIndexRefresher
+    as detecta em segundo plano e recarrega o índice com load(). Até lá (no
+    máximo ~INTERVAL segundos), uma linha escrita por fora não é encontrada.
+    """
+
+    # Colunas indexadas de cada tabela
+    COLUMNS = {
+        "company": (),
+        "department": ("companyID", "directorID"),
+        "team": ("departmentID", "managerID"),
+        "person": ("companyID", "departmentID", "teamID", "role"),
+    }
+
+    # FKs entre as tabelas indexadas: (tabela filha, coluna) → tabela pai.
+    # Para cada uma, o índice reverso pai → {filhos} é mantido.
+    PARENTS = {
+        ("department", "companyID"): "company",
+        ("team", "departmentID"): "department",
+        ("person", "companyID"): "company",
+        ("person", "departmentID"): "department",
+        ("person", "teamID"): "team",
+    }
+
+    # Ações ON DELETE do schema: tabela pai → [(tabela filha, coluna, cascade?)]
+    ON_DELETE = {
+        "company": [("department", "companyID", True), ("person", "companyID", False)],
+        "department": [("team", "departmentID", True), ("person", "departmentID", False)],
+        "team": [("person", "teamID", False)],
+        "person": [("department", "directorID", False), ("team", "managerID", False)],
+    }
+
+    def __init__(self):
+        self.__rows = {table: {} for table in self.COLUMNS}         # tabela → id → {coluna: valor}
+        self.__children = {key: {} for key in self.PARENTS}          # (tabela, coluna) → pai → {ids}
+        self.__lock = threading.RLock()
+        self.__loaded = False
+
+    # --- CARGA E MANUTENÇÃO ---
+
+    def load(self, conn: sqlite3.Connection) -> None:
+        """
+        (Re)carrega o índice inteiro a partir do banco. A carga é feita em um
+        índice novo, trocado no final: consultas concorrentes nunca veem um
+        índice pela metade.
+        """
+        fresh = OrgIndex()
+        for table, columns in self.COLUMNS.items():
+            select = ", ".join(("id",) + columns)
+            for row in conn.execute(f"SELECT {select} FROM {table}"):
+                fresh.__set(table, row[0], dict(zip(columns, tuple(row)[1:])))
+        with self.__lock:
+            self.__rows, self.__children = fresh.__rows, fresh.__children
+            self.__loaded = True
+
+    @property
+    def loaded(self) -> bool:
+        return self.__loaded
+
+    def setRow(self, table: str, row_id: str, columns: dict) -> None:
+        """Insere a linha ou atualiza as colunas informadas (as demais são mantidas)."""
+        if table not in self.COLUMNS:
+            return
+        indexed = {column: value for column, value in columns.items() if column in self.COLUMNS[table]}
+        with self.__lock:
+            self.__set(table, row_id, indexed)
+
+    def setRows(self, rows) -> None:
+        """setRow() para várias linhas [(tabela, id, colunas), ...] (ex.: inserção em lote)."""
+        with self.__lock:
+            for table, row_id, columns in rows:
+                self.setRow(table, row_id, columns)
+
+    def removeRow(self, table: str, row_id: str) -> None:
+        """Remove a linha, aplicando em cascata as mesmas ações ON DELETE do schema."""
+        if table not in self.COLUMNS:
+            return
+        with self.__lock:
+            self.__remove(table, row_id)
+
+    def __set(self, table: str, row_id: str, columns: dict) -> None:
+        row = self.__rows[table].setdefault(row_id, dict.fromkeys(self.COLUMNS[table]))
+        for column, value in columns.items():
+            key = (table, column)
+            if key in self.__children:
+                self.__unlink(key, row[column], row_id)
+                if value:
+                    self.__children[key].setdefault(value, set()).add(row_id)
+            row[column] = value
+
+    def __unlink(self, key: tuple, parent_id: Optional[str], child_id: str) -> None:
+        children = self.__children[key].get(parent_id)
+        if children is not None:
+            children.discard(child_id)
+            if not children:
+                del self.__children[key][parent_id]
+
+    def __remove(self, table: str, row_id: str) -> None:
+        row = self.__rows[table].pop(row_id, None)
+        if row is None:
+            return
+        for column, value in row.items():
+            if (table, column) in self.__children:
+                self.__unlink((table, column), value, row_id)
+
+        for child_table, column, cascade in self.ON_DELETE[table]:
+            if (child_table, column) in self.__children:
+                child_ids = self.__children[(child_table, column)].pop(row_id, set())
+            else:
+                # directorID / managerID não têm índice reverso: varre a tabela (pequena)
+                child_ids = {i for i, r in self.__rows[child_table].items() if r[column] == row_id}
+            for child_id in child_ids:
+                if cascade:
+                    self.__remove(child_table, child_id)
+                elif child_id in self.__rows[child_table]:
+                    self.__rows[child_table][child_id][column] = None
+
+    # --- CONSULTAS ---
+
+    def exists(self, table: str, row_id: str) -> bool:
+        with self.__lock:
+            return row_id in self.__rows.get(table, {})
+
+    def get(self, table: str, row_id: str, column: str):
+        """Valor de uma coluna indexada (ex.: get("team", id, "managerID"))."""
+        with self.__lock:
+            row = self.__rows.get(table, {}).get(row_id)
+            return row[column] if row is not None else None
+
+    def roleOf(self, person_id: str) -> Optional[str]:
+        return self.get("person", person_id, "role")
+
+    def __childIds(self, table: str, column: str, parent_id: str) -> set:
+        return self.__children[(table, column)].get(parent_id, set())
+
+    def departmentsOf(self, company_id: str) -> list[str]:
+        with self.__lock:
+            return sorted(self.__childIds("department", "companyID", company_id))
+
+    def teamsOf(self, group_type: str, group_id: str) -> list[str]:
+        """Times de uma empresa (via departamentos) ou de um departamento."""
+        with self.__lock:
+            if group_type == "Company":
+                departments = self.__childIds("department", "companyID", group_id)
+            elif group_type == "Department":
+                departments = (group_id,)
+            else:
+                raise ValueError(f"Tipo de grupo inválido: {group_type}")
+            teams = set()
+            for department_id in departments:
+                teams |= self.__childIds("team", "departmentID", department_id)
+            return sorted(teams)
+
+    def membersOf(self, team_id: str) -> list[str]:
+        """Pessoas com teamID = team_id (sem o gerente, se ele não for membro)."""
+        with self.__lock:
+            return sorted(self.__childIds("person", "teamID", team_id))
+
+    def personsUnder(self, group_type: str, group_id: str) -> list[str]:
+        """
+        Todas as pessoas da subárvore do grupo: as ligadas diretamente a ele e as
+        dos níveis abaixo (ex.: de um departamento, também os membros dos seus
+        times), mais diretores e gerentes dos grupos da subárvore.
+        """
+        with self.__lock:
+            if group_type == "Company":
+                departments = set(self.__childIds("department", "companyID", group_id))
+                persons = set(self.__childIds("person", "companyID", group_id))
+            elif group_type == "Department":
+                departments = {group_id}
+                persons = set()
+            elif group_type == "Team":
+                departments = set()
+                persons = set(self.__childIds("person", "teamID", group_id))
+                manager = self.__rows["team"].get(group_id, {}).get("managerID")
+                if manager:
+                    persons.add(manager)
+                return sorted(persons)
+            else:
+                raise ValueError(f"Tipo de grupo inválido: {group_type}")
+
+            for department_id in departments:
+                persons |= self.__childIds("person", "departmentID", department_id)
+                director = self.__rows["department"].get(department_id, {}).get("directorID")
+                if director:
+                    persons.add(director)
+                for team_id in self.__childIds("team", "departmentID", department_id):
+                    persons |= self.__childIds("person", "teamID", team_id)
+                    manager = self.__rows["team"][team_id]["managerID"]
+                    if manager:
+                        persons.add(manager)
+            return sorted(persons)
+
+    def ancestorsOf(self, table: str, row_id: str) -> Optional[dict]:
+        """
+        Cadeia de grupos acima de uma linha: {"company", "department", "team"}
+        (None nos níveis ausentes). Pessoas sobem pelo time; sem time (ou com
+        time sem departamento), usam o próprio departmentID / companyID.
+        """
+        with self.__lock:
+            row = self.__rows.get(table, {}).get(row_id)
+            if row is None:
+                return None
+            chain = {"company": None, "department": None, "team": None}
+            if table == "person":
+                chain["team"] = row["teamID"]
+            if table in ("person", "team"):
+                team = self.__rows["team"].get(chain["team"]) if table == "person" else row
+                chain["department"] = (team or {}).get("departmentID") or row.get("departmentID")
+            if table in ("person", "team", "department"):
+                department = self.__rows["department"].get(chain["department"]) if table != "department" else row
+                chain["company"] = (department or {}).get("companyID") or row.get("companyID")
+            return chain
+
+    def isUnder(self, table: str, row_id: str, group_type: str, group_id: str) -> bool:
+        """True se a linha está (direta ou indiretamente) sob o grupo."""
+        chain = self.ancestorsOf(table, row_id)
+        return chain is not None and chain.get(group_type.lower()) == group_id
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {table: len(rows) for table, rows in self.__rows.items()}
+
+
+class OrgIndexRefresher:
+    """
+    Thread que mantém o OrgIndex em dia com escritas de outras conexões.
+
+    A cada INTERVAL segundos lê o PRAGMA data_version da conexão de escrita
+    (sem esperar pelo lock: se o escritor está ocupado, tenta na próxima volta),
+    que só muda quando outra conexão faz commit. Nesse caso recarrega o índice
+    dentro de um bloco de escrita — assim nenhum commit deste processo fica
+    entre a leitura das tabelas e a troca do índice. Antes, chama onReload()
+    (o Database esvazia o cache de entidades).
+    """
+
+    # Intervalo (s) entre duas verificações
+    INTERVAL = 1.0
+
+    def __init__(self, pool, index: OrgIndex, onReload: Optional[Callable[[], None]] = None):
+        self.__pool = pool
+        self.__index = index
+        self.__onReload = onReload
+        with pool.writer() as conn:
+            self.__version = conn.execute("PRAGMA data_version").fetchone()[0]
+        self.__cond = threading.Condition()
+        self.__stopped = False
+        self.__thread = threading.Thread(target=self.__run, name="db-org-index", daemon=True)
+        self.__thread.start()
+
+    def __run(self):
+        while True:
+            with self.__cond:
+                self.__cond.wait(self.INTERVAL)
+                if self.__stopped:
+                    return
+            try:
+                self.check()
+            except sqlite3.Error as e:
+                logger.error("Falha ao recarregar o índice da hierarquia: %s", e)
+
+    def check(self) -> bool:
+        """Recarrega o índice se outra conexão fez commit. True se recarregou."""
+        version = self.__pool.dataVersion()
+        if version is None or version == self.__version:
+            return False
+        # onReload antes da troca: quem já vê o índice novo não acha mais o cache velho
+        if self.__onReload is not None:
+            self.__onReload()
+        with self.__pool.writer() as conn:
+            self.__version = conn.execute("PRAGMA data_version").fetchone()[0]
+            self.__index.load(conn)
+        logger.info("Escritas de outra conexão no banco: índice da hierarquia recarregado.")
+        return True
+
+    def stop(self) -> None:
+        with self.__cond:
+            self.__stopped = True
+            self.__cond.notify_all()
+        self.__thread.join()
@@ -0,0 +1,162 @@
+"""
+Tempo de cada comando SQL executado pelo pool, agregado por formato.
+
+Os cursores das conexões do pool (MeteredCursor) chamam QueryLog.record()
+com o tempo de cada comando: para SELECT, execução + leitura das linhas
+(fetchall/fetchmany) ou da primeira linha (fetchone). Cada formato
+normalizado (literais trocados por '?', listas IN compactadas) acumula
+chamadas, tempo total/máximo e linhas.
+
+Comandos acima do limite ('threshold_ms') são registrados no log com o SQL
+normalizado, os parâmetros, o número de linhas e o EXPLAIN QUERY PLAN, que é
+capturado uma única vez por formato (na primeira execução lenta).
+"""
+import functools
+import logging
+import re
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"IN \((?:\?, )*\?\)")
+
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+# Parâmetros de comandos que tocam estas colunas não vão para o log
+_SENSITIVE = ("password",)
+_REDACTED = "<omitidos>"
+
+
+@functools.lru_cache(maxsize=4096)
+def normalizeSql(sql: str) -> str:
+    """Troca literais por '?' e compacta espaços: um formato por consulta."""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip().rstrip(";")
+    return _IN_LIST.sub("IN (...)", sql)
+
+
+def _safeParams(shape: str, params) -> object:
+    if any(column in shape.lower() for column in _SENSITIVE):
+        return _REDACTED
+    if isinstance(params, dict):
+        return dict(params)
+    return list(params) if params is not None else []
+
+
+class _ShapeStats:
+    __slots__ = ("calls", "total", "max", "rows", "slow", "plan", "lastSlowParams")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.slow = 0
+        self.plan = None
+        self.lastSlowParams = None
+
+
+class QueryLog:
+    """
+    Estatísticas por formato de comando + log dos comandos lentos.
+
+        log = QueryLog(threshold_ms=200)
+        log.top(10)  # formatos com maior tempo total
+    """
+
+    # Formatos distintos acompanhados; os excedentes só entram em 'dropped'
+    MAX_SHAPES = 2000
+
+    def __init__(self, threshold_ms: float = 200, max_shapes: int = MAX_SHAPES):
+        self.__threshold = threshold_ms / 1000
+        self.__maxShapes = max_shapes
+        self.__shapes = {}
+        self.__dropped = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def thresholdMs(self) -> float:
+        return self.__threshold * 1000
+
+    def record(self, conn: sqlite3.Connection, sql: str, params, seconds: float, rows: int) -> None:
+        """Contabiliza um comando; se for lento, registra no log (e captura o plano)."""
+        shape = normalizeSql(sql)
+        slow = seconds >= self.__threshold
+        with self.__lock:
+            stats = self.__shapes.get(shape)
+            if stats is None:
+                if len(self.__shapes) >= self.__maxShapes:
+                    self.__dropped += 1
+                    return
+                stats = self.__shapes[shape] = _ShapeStats()
+            stats.calls += 1
+            stats.total += seconds
+            stats.rows += max(rows, 0)
+            if seconds > stats.max:
+                stats.max = seconds
+            if not slow:
+                return
+            stats.slow += 1
+            stats.lastSlowParams = _safeParams(shape, params)
+            capture = stats.plan is None
+
+        if capture:
+            # Fora do lock: o EXPLAIN roda na própria conexão (mesma thread)
+            plan = self.__explain(conn, sql, params)
+            with self.__lock:
+                if stats.plan is None:
+                    stats.plan = plan
+        logger.warning("Comando SQL lento (%.1f ms): %s", seconds * 1000, shape,
+                       extra={"duration_ms": round(seconds * 1000, 3), "rows": rows,
+                              "params": _safeParams(shape, params), "plan": stats.plan})
+
+    @staticmethod
+    def __explain(conn: sqlite3.Connection, sql: str, params) -> list[str]:
+        head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+        if head not in _EXPLAINABLE:
+            return []
+        try:
+            # Cursor base: o EXPLAIN não é medido nem passa de novo por aqui
+            cursor = sqlite3.Cursor(conn)
+            if params is None:
+                # executemany: o plano não depende dos valores, basta preencher os '?'
+                params = (None,) * sql.count("?")
+            return [row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        except sqlite3.Error as e:
+            return [f"<EXPLAIN falhou: {e}>"]
+
+    def top(self, limit: int = 20, order: str = "total") -> list[dict]:
+        """
+        Formatos ordenados por 'total' (tempo somado), 'max' (pior execução),
+        'mean' ou 'calls', do maior para o menor.
+        """
+        with self.__lock:
+            rows = [{
+                "sql": shape,
+                "calls": stats.calls,
+                "totalMs": round(stats.total * 1000, 3),
+                "meanMs": round(stats.total / stats.calls * 1000, 3),
+                "maxMs": round(stats.max * 1000, 3),
+                "rows": stats.rows,
+                "slowCalls": stats.slow,
+                "plan": stats.plan,
+                "lastSlowParams": stats.lastSlowParams,
+            } for shape, stats in self.__shapes.items()]
+        key = {"total": "totalMs", "max": "maxMs", "mean": "meanMs", "calls": "calls"}[order]
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return rows[:limit]
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {"shapes": len(self.__shapes), "dropped": self.__dropped, "thresholdMs": self.thresholdMs}
+
+    def reset(self) -> None:
+        """Zera as estatísticas (os planos já capturados são descartados junto)."""
+        with self.__lock:
+            self.__shapes.clear()
+            self.__dropped = 0
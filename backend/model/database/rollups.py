@@ -0,0 +1,257 @@
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Tipos de nó da hierarquia, do mais baixo para o mais alto
+NODE_TYPES = ("Objective", "RPE", "Team", "Department", "Company")
+
+# Pares (KR, nó) de todos os nós da hierarquia que contêm cada KR:
+# Objective → RPE → grupos ligados ao RPE → Department do Team → Company do Department.
+# Os UNIONs garantem que um KR conte uma única vez em cada nó.
+_KR_NODES = """
+    WITH krs AS (
+        SELECT id, objectiveID FROM kpi
+        WHERE goal IS NOT NULL AND objectiveID IS NOT NULL {filter}
+    ),
+    rpes AS (
+        SELECT krs.id AS krID, o.rpeID FROM krs
+        JOIN objective o ON o.id = krs.objectiveID
+        WHERE o.rpeID IS NOT NULL
+    ),
+    teams AS (
+        SELECT rpes.krID, j.teamID FROM rpes JOIN team_rpes j ON j.rpeID = rpes.rpeID
+    ),
+    departments AS (
+        SELECT rpes.krID, j.departmentID FROM rpes JOIN department_rpes j ON j.rpeID = rpes.rpeID
+        UNION
+        SELECT teams.krID, t.departmentID FROM teams JOIN team t ON t.id = teams.teamID
+        WHERE t.departmentID IS NOT NULL
+    ),
+    companies AS (
+        SELECT rpes.krID, j.companyID FROM rpes JOIN company_rpes j ON j.rpeID = rpes.rpeID
+        UNION
+        SELECT departments.krID, d.companyID FROM departments JOIN department d ON d.id = departments.departmentID
+        WHERE d.companyID IS NOT NULL
+    )
+    SELECT id AS krID, 'Objective' AS nodeType, objectiveID AS nodeID FROM krs
+    UNION ALL SELECT krID, 'RPE', rpeID FROM rpes
+    UNION ALL SELECT krID, 'Team', teamID FROM teams
+    UNION ALL SELECT krID, 'Department', departmentID FROM departments
+    UNION ALL SELECT krID, 'Company', companyID FROM companies
+"""
+
+# Meta e último valor de cada KR
+_KR_PROGRESS = """
+    SELECT k.id, k.goal, (
+        SELECT r.value FROM kpi_reading r WHERE r.kpiID = k.id
+        ORDER BY r.timestamp DESC, r.id DESC LIMIT 1
+    ) AS last
+    FROM kpi k
+    WHERE k.goal IS NOT NULL {filter}
+"""
+
+
+def attainment(last: Optional[float], goal: Optional[float]) -> float:
+    """Atingimento de um KR: último valor / meta, limitado a [0, 1]."""
+    if last is None or not goal:
+        return 0.0
+    return max(0.0, min(1.0, last / goal))
+
+
+class RollupEngine:
+    """
+    Mantém o atingimento médio dos KRs agregado por nó da hierarquia
+    (Objective → RPE → Team → Department → Company).
+
+    kr_attainment guarda o atingimento atual de cada KR, kr_node os nós que
+    contêm cada KR e kr_rollup, por nó, a soma e a quantidade de KRs: a nota
+    do nó é total / count, lida com uma única busca pela chave primária.
+
+    Novas leituras e mudanças de meta são aplicadas na hora, de forma
+    incremental: o KR tem o atingimento atualizado e cada nó que o contém
+    (kr_node) recebe a diferença (novo - antigo) na soma, sem reler os outros
+    KRs do nó. KRs novos entram em kr_pending por trigger e são somados aos
+    seus nós no próximo refresh(). Demais mudanças de estrutura (KRs
+    removidos, RPEs religados, times trocando de departamento...) marcam os
+    rollups como "sujos" por triggers no banco; a reconstrução roda em
+    segundo plano (RollupRefresher), nunca dentro de uma leitura, e também
+    descarta a deriva de ponto flutuante acumulada pelas diferenças.
+    """
+
+    # KRs novos por consulta em refresh() (limite de parâmetros do SQLite)
+    ADD_BATCH = 500
+
+    def isDirty(self, conn: sqlite3.Connection) -> bool:
+        row = conn.execute("SELECT value FROM rollup_meta WHERE key = 'dirty'").fetchone()
+        return bool(row and row[0])
+
+    def rebuild(self, conn: sqlite3.Connection) -> None:
+        """Recalcula todos os rollups do zero (deve rodar na conexão de escrita)."""
+        progress = conn.execute(_KR_PROGRESS.format(filter="")).fetchall()
+        conn.execute("DELETE FROM kr_attainment")
+        conn.executemany(
+            "INSERT INTO kr_attainment (krID, value) VALUES (?, ?)",
+            [(kr_id, attainment(last, goal)) for kr_id, goal, last in progress]
+        )
+        conn.execute("DELETE FROM kr_node")
+        conn.execute(f"""
+            INSERT INTO kr_node (nodeType, nodeID, krID)
+            SELECT nodeType, nodeID, krID FROM ({_KR_NODES.format(filter="")})
+        """)
+        conn.execute("DELETE FROM kr_pending")
+        conn.execute("DELETE FROM kr_rollup")
+        conn.execute("""
+            INSERT INTO kr_rollup (nodeType, nodeID, total, count)
+            SELECT n.nodeType, n.nodeID, SUM(a.value), COUNT(*)
+            FROM kr_node n
+            JOIN kr_attainment a ON a.krID = n.krID
+            GROUP BY n.nodeType, n.nodeID
+        """)
+        conn.execute("UPDATE rollup_meta SET value = 0 WHERE key = 'dirty'")
+
+    def hasPending(self, conn: sqlite3.Connection) -> bool:
+        """True se há KRs novos ainda fora dos rollups."""
+        return conn.execute("SELECT 1 FROM kr_pending LIMIT 1").fetchone() is not None
+
+    def refresh(self, conn: sqlite3.Connection, kr_ids: list[str]) -> None:
+        """
+        Soma aos rollups os KRs novos (kr_pending) e aplica a diferença de
+        atingimento dos KRs informados (após novas leituras ou mudança de meta)
+        aos nós que os contêm. IDs de KPIs são ignorados.
+        """
+        if self.isDirty(conn):
+            # Com os rollups sujos, a reconstrução pendente já cobre estes KRs
+            return
+
+        # KRs ainda sem atingimento (criados por outra conexão, por exemplo) entram como novos
+        added = {row[0] for row in conn.execute("SELECT krID FROM kr_pending")}
+        if kr_ids:
+            placeholders = ", ".join("?" for _ in kr_ids)
+            known = {row[0] for row in conn.execute(
+                f"SELECT krID FROM kr_attainment WHERE krID IN ({placeholders})", kr_ids
+            )}
+            added |= set(kr_ids) - known
+        added = sorted(added)
+        for start in range(0, len(added), self.ADD_BATCH):
+            self.__add(conn, added[start:start + self.ADD_BATCH])
+
+        kr_ids = [kr_id for kr_id in kr_ids or () if kr_id not in added]
+        if not kr_ids:
+            return
+        placeholders = ", ".join("?" for _ in kr_ids)
+        progress = conn.execute(
+            _KR_PROGRESS.format(filter=f"AND k.id IN ({placeholders})"), kr_ids
+        ).fetchall()
+        current = dict(conn.execute(
+            f"SELECT krID, value FROM kr_attainment WHERE krID IN ({placeholders})", kr_ids
+        ).fetchall())
+
+        changed = []
+        for kr_id, goal, last in progress:
+            value = attainment(last, goal)
+            if value != current[kr_id]:
+                changed.append((value, value - current[kr_id], kr_id))
+        if not changed:
+            return
+
+        conn.executemany("UPDATE kr_attainment SET value = ? WHERE krID = ?",
+                         [(value, kr_id) for value, _, kr_id in changed])
+        # Só a diferença, em cada nó do KR (a deriva é zerada pela próxima reconstrução)
+        conn.executemany("""
+            UPDATE kr_rollup SET total = total + ?
+            WHERE (nodeType, nodeID) IN (SELECT nodeType, nodeID FROM kr_node WHERE krID = ?)
+        """, [(delta, kr_id) for _, delta, kr_id in changed])
+
+    def __add(self, conn: sqlite3.Connection, kr_ids: list[str]) -> None:
+        """Insere KRs que ainda não estão nos rollups: atingimento, nós e soma/contagem de cada nó."""
+        placeholders = ", ".join("?" for _ in kr_ids)
+        progress = conn.execute(
+            _KR_PROGRESS.format(filter=f"AND k.id IN ({placeholders})"), kr_ids
+        ).fetchall()
+        values = {kr_id: attainment(last, goal) for kr_id, goal, last in progress}
+        conn.executemany("INSERT OR REPLACE INTO kr_attainment (krID, value) VALUES (?, ?)", values.items())
+
+        nodes = conn.execute(_KR_NODES.format(filter=f"AND id IN ({placeholders})"), kr_ids).fetchall()
+        for kr_id, node_type, node_id in nodes:
+            if kr_id not in values:
+                continue
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO kr_node (nodeType, nodeID, krID) VALUES (?, ?, ?)",
+                (node_type, node_id, kr_id)
+            ).rowcount
+            if inserted:
+                conn.execute("""
+                    INSERT INTO kr_rollup (nodeType, nodeID, total, count) VALUES (?, ?, ?, 1)
+                    ON CONFLICT (nodeType, nodeID) DO UPDATE SET total = total + excluded.total, count = count + 1
+                """, (node_type, node_id, values[kr_id]))
+        conn.execute(f"DELETE FROM kr_pending WHERE krID IN ({placeholders})", kr_ids)
+
+    def get(self, conn: sqlite3.Connection, node_type: str, node_id: str) -> dict:
+        """Atingimento agregado de um nó (None quando não há KRs abaixo dele)."""
+        row = conn.execute(
+            "SELECT total, count FROM kr_rollup WHERE nodeType = ? AND nodeID = ?", (node_type, node_id)
+        ).fetchone()
+        total, count = (row[0], row[1]) if row else (0.0, 0)
+        return {
+            "nodeType": node_type,
+            "nodeID": node_id,
+            "attainment": total / count if count else None,
+            "krCount": count,
+        }
+
+
+class RollupRefresher:
+    """
+    Thread que reconstrói os rollups sujos (e soma os KRs novos pendentes)
+    fora das leituras.
+
+    schedule() é chamado depois do commit de escritas que podem mudar a
+    estrutura da hierarquia e por quem lê os rollups sujos (ex.: depois de uma
+    importação feita por outro processo). Pedidos que chegam durante a espera
+    'delay' ou durante uma reconstrução são atendidos por uma só.
+    """
+
+    def __init__(self, pool, engine: RollupEngine, delay: float = 0.05):
+        self.__pool = pool
+        self.__engine = engine
+        self.__delay = delay
+        self.__cond = threading.Condition()
+        self.__pending = False
+        self.__stopped = False
+        self.__thread = threading.Thread(target=self.__run, name="db-rollups", daemon=True)
+        self.__thread.start()
+
+    def schedule(self) -> None:
+        with self.__cond:
+            self.__pending = True
+            self.__cond.notify_all()
+
+    def __run(self):
+        while True:
+            with self.__cond:
+                while not self.__pending and not self.__stopped:
+                    self.__cond.wait()
+                if self.__stopped:
+                    return
+            time.sleep(self.__delay)
+            with self.__cond:
+                self.__pending = False
+            try:
+                with self.__pool.writer() as conn:
+                    if self.__engine.isDirty(conn):
+                        self.__engine.rebuild(conn)
+                    elif self.__engine.hasPending(conn):
+                        self.__engine.refresh(conn, [])
+            except sqlite3.Error as e:
+                logger.error("Falha ao reconstruir os rollups: %s", e)
+
+    def stop(self) -> None:
+        """Encerra a thread (uma reconstrução pendente fica para o próximo início: a marca está no banco)."""
+        with self.__cond:
+            self.__stopped = True
+            self.__cond.notify_all()
+        self.__thread.join()
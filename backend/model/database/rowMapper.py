@@ -0,0 +1,50 @@
+import functools
+import keyword
+from typing import Callable, Sequence
+
+from ..entities.entity import Entity
+
+
+@functools.lru_cache(maxsize=256)
+def rowMapper(cls: type, columns: tuple[str, ...], skip: tuple[str, ...] = ()) -> Callable[..., Entity]:
+    """
+    Compila (uma vez por classe + formato da consulta) uma função que constrói
+    'cls' a partir de uma linha, lendo as colunas por posição:
+
+        build = rowMapper(Team, ("id", "name", "departmentID", "managerID"))
+        build(row)  # == Team(id=row[0], name=row[1], departmentID=row[2], managerID=row[3])
+
+    Evita montar um dict {coluna: valor} por linha. Colunas em 'skip' (ex.:
+    agregados tratados por quem chama) são ignoradas; argumentos extras de
+    build(row, **extra) são repassados ao construtor.
+    """
+    arguments = []
+    for index, column in enumerate(columns):
+        if column in skip:
+            continue
+        if not column.isidentifier() or keyword.iskeyword(column):
+            raise ValueError(f"Coluna inválida para mapeamento: {column!r}")
+        arguments.append(f"{column}=row[{index}]")
+
+    source = (
+        "def build(row, **extra):\n"
+        f"    return cls({', '.join(arguments + ['**extra'])})\n"
+    )
+    namespace = {"cls": cls}
+    exec(source, namespace)
+    build = namespace["build"]
+    build.__qualname__ = build.__name__ = f"build{cls.__name__}"
+    return build
+
+
+def columnsOf(cursor) -> tuple[str, ...]:
+    """Nomes das colunas do resultado de 'cursor' (formato da consulta)."""
+    return tuple(description[0] for description in cursor.description)
+
+
+def mapRows(cls: type, rows: Sequence, skip: tuple[str, ...] = ()) -> list:
+    """Constrói um 'cls' por linha (sqlite3.Row), com um único mapper para todas."""
+    if not rows:
+        return []
+    build = rowMapper(cls, tuple(rows[0].keys()), skip)
+    return [build(row) for row in rows]
@@ -7,6 +7,8 @@ if TYPE_CHECKING:
 
 class Company(Group):
 
+    __slots__ = ("__cnpj", "__departmentIds", "__directorIds")
+
     def __init__(self, name: str, cnpj: str, id: str = None, rpeIds: list[str] = None, departmentIds: list[str] = None, directorIds: list[str] = None):
         # Repassa id, name e rpeIds para o Group
         super().__init__(name,id, rpeIds)
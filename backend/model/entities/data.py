@@ -7,6 +7,8 @@ if TYPE_CHECKING:
     from ..database.database import Database
 
 class Data(Entity):
+
+    __slots__ = ("_description", "_responsibleID", "_date")
     
     def __init__(self, description: str, responsibleID: str, date: str, id:str = None):
         super().__init__(id)
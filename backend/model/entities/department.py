@@ -7,6 +7,8 @@ if TYPE_CHECKING:
 
 class Department(Group):
 
+    __slots__ = ("__teamIds", "__directorID", "__companyID")
+
     def __init__(self, name: str, directorID: str =None, companyID:str = None, id: str = None, rpeIds: list[str] = None, teamIds: list[str] = None):
         super().__init__(name, id, rpeIds)
         self.__teamIds = teamIds if teamIds is not None else []
@@ -1,3 +1,5 @@
+import logging
+
 from .person import Person
 from .department import Department
 from .team import Team
@@ -11,8 +13,12 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from ..database.database import Database
 
+logger = logging.getLogger(__name__)
+
 class Director(Person):
 
+    __slots__ = ("__responsibleIDs",)
+
     def __init__(self, responsibleIds: list[str], **kwargs):
         super().__init__(**kwargs)
         self.__responsibleIDs = responsibleIds
@@ -48,7 +54,7 @@ class Director(Person):
             db.addItem(rpe)
             db.addRpeToTeam(person.teamID,rpe.id)
         else:
-            print("Group level inválido.")
+            logger.warning("Group level inválido: %s.", groupLevel)
     
     def deleteRPE(self, rpe: RPE, db: 'Database'):
         db.deleteItemByObject(rpe)
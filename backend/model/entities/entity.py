@@ -1,10 +1,55 @@
 import uuid
 
+def _slotFields(cls) -> tuple[str, ...]:
+    """
+    Nomes (já com name mangling) dos slots de 'cls' e das classes base,
+    da base para a subclasse: a mesma ordem em que os __init__ os preenchem.
+    """
+    fields = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for name in slots:
+            if name.startswith("__") and not name.endswith("__"):
+                name = f"_{klass.__name__.lstrip('_')}{name}"
+            if name not in fields:
+                fields.append(name)
+    return tuple(fields)
+
+
 class Entity:
 
+    # Entidades usam __slots__ (sem __dict__ por instância): listagens grandes
+    # alocam bem menos. Toda subclasse deve declarar os próprios __slots__.
+    __slots__ = ("_id",)
+
+    # Atributos internos que não fazem parte da representação serializada
+    _transient = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = tuple(f for f in _slotFields(cls) if f not in cls._transient)
+
     def __init__(self, id=None):
         self._id = str(id) if id is not None else str(uuid.uuid4())
 
     @property
     def id(self):
-        return self._id
\ No newline at end of file
+        return self._id
+
+    def __iter__(self):
+        """
+        Permite dict(entidade), usado pelo FastAPI ao serializar as respostas:
+        os slots preenchidos, com as mesmas chaves do antigo vars() (ex.:
+        '_Team__managerID'), sem os atributos listados em _transient.
+        """
+        for key in self._fields:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                continue  # slot opcional ainda não preenchido (ex.: Team.employeeIDs)
+            yield key, value
+
+
+Entity._fields = _slotFields(Entity)
@@ -7,6 +7,8 @@ if TYPE_CHECKING:
 
 class Group(Entity):
 
+    __slots__ = ("_name", "_rpeIds")
+
     def __init__(self, name: str, id: str = None, rpeIds: list[str] = None):
         super().__init__(id)
         self._name = name
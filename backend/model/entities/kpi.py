@@ -8,21 +8,71 @@ if TYPE_CHECKING:
 
 class KPI(Data):
 
-    def __init__(self, description: str, responsibleID: str, date: str, objectiveID: str, id: str = None, data: list[float] = None):
+    __slots__ = ("_objectiveID", "_data", "_readingIds", "_source", "_addedData", "_removedData")
+
+    # Referência ao banco, ids das leituras e alterações ainda não persistidas não são serializados
+    _transient = ("_readingIds", "_source", "_addedData", "_removedData")
+
+    def __init__(self, description: str, responsibleID: str, date: str, objectiveID: str, id: str = None, data: list[float] = None, source: 'Database' = None, readingIds: list[int] = None):
         super().__init__(description, responsibleID, date, id)
         self._objectiveID = objectiveID
-        self._data = data if data is not None else []
+        # As leituras ficam na tabela kpi_reading: quando o KPI vem do banco ('source')
+        # sem dados, elas só são carregadas no primeiro acesso a 'data'.
+        self._data = data if data is not None else (None if source is not None else [])
+        # Id em kpi_reading de cada leitura gravada (o início de _data, na mesma ordem);
+        # None enquanto o KPI não foi gravado ou as leituras não foram carregadas
+        self._readingIds = readingIds
+        self._source = source
+        self._addedData = []
+        self._removedData = []
 
     def addData(self, data: float):
-        self._data.append(data)
+        # Não força o carregamento do histórico: a leitura é só anexada
+        if self._data is not None:
+            self._data.append(data)
+        self._addedData.append(data)
 
     def deleteData(self, data: float):
-        self._data.remove(data)
+        """Remove a primeira ocorrência de 'data' (ValueError se não houver)."""
+        values = self.data
+        index = values.index(data)
+        del values[index]
+        if self._readingIds is None:
+            # KPI ainda não gravado: todas as leituras estão só em memória
+            if data in self._addedData:
+                self._addedData.remove(data)
+        elif index < len(self._readingIds):
+            # Leitura já gravada: remove exatamente essa linha, pelo id
+            self._removedData.append(self._readingIds.pop(index))
+        else:
+            del self._addedData[index - len(self._readingIds)]
 
     def getLastData(self):
+        if self._addedData:
+            return self._addedData[-1]
+        if self._data is None:
+            return self._source.getLastReading(self.id)
         if not self._data:
             return None
         return self._data[-1]
+
+    def popPendingData(self) -> tuple[list[float], list[int]]:
+        """
+        Retorna (valores adicionados, ids das leituras removidas) desde a última
+        persistência e limpa as pendências. Usado pelo Database.updateItem.
+        """
+        added, removed = self._addedData, self._removedData
+        self._addedData, self._removedData = [], []
+        return added, removed
+
+    def reloadData(self, source: 'Database'):
+        """
+        Descarta as leituras em memória depois de gravadas: o próximo acesso a
+        'data' as recarrega de 'source', já com os ids das linhas novas.
+        """
+        self._source = source
+        self._data = None
+        self._readingIds = None
     
     @property
     def objectiveID(self):
@@ -37,7 +87,15 @@ class KPI(Data):
     
     @property
     def data(self):
+        if self._data is None:
+            rows = self._source.getReadingRows(self.id)
+            self._readingIds = [reading_id for reading_id, _ in rows]
+            self._data = [value for _, value in rows] + self._addedData
         return self._data
+
+    def __iter__(self):
+        self.data  # garante as leituras carregadas antes de serializar
+        return super().__iter__()
     
     def getData(self, db: 'Database') -> Dict[str, Any]:
         """Retorna os dados deste KPI em formato de dicionário."""
@@ -46,7 +104,7 @@ class KPI(Data):
         
         # 2. Adiciona os campos específicos do KPI
         data_dict.update({
-            "collectedData": self._data,
+            "collectedData": self.data,
             "lastValue": self.getLastData()
         })
         return data_dict
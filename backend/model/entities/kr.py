@@ -6,9 +6,11 @@ if TYPE_CHECKING:
     from ..database.database import Database
 
 class KR(KPI):
+
+    __slots__ = ("__goal",)
     
-    def __init__(self, description: str, responsibleID: str, date: str, objectiveID: str, id:str = None, data: list[float] = None, goal: float = None):
-        super().__init__(description, responsibleID, date, objectiveID, id, data)
+    def __init__(self, description: str, responsibleID: str, date: str, objectiveID: str, id:str = None, data: list[float] = None, goal: float = None, source: 'Database' = None, readingIds: list[int] = None):
+        super().__init__(description, responsibleID, date, objectiveID, id, data, source, readingIds)
         self.__goal = goal if goal is not None else 0
 
     @property
@@ -1,3 +1,5 @@
+import logging
+
 from .person import Person
 from .rpe import RPE
 from .objective import Objective
@@ -10,8 +12,12 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from ..database.database import Database
 
+logger = logging.getLogger(__name__)
+
 class Manager(Person):
 
+    __slots__ = ("__responsibleIDs",)
+
     def __init__(self, responsibleIds: list[str], **kwargs):
         super().__init__(**kwargs)
         self.__responsibleIDs = responsibleIds
@@ -27,44 +33,44 @@ class Manager(Person):
         if db.isRPETeamOrDepartmentLevel(obj.rpeID):
             db.addItem(obj)
         else:
-            print("Erro ao adicionar objetivo: nível de acesso inválido.")
+            logger.warning("Erro ao adicionar objetivo: nível de acesso inválido (Manager %s).", self.id)
 
     def deleteObjective(self, obj: Objective, db: 'Database'):
         if db.isRPETeamOrDepartmentLevel(obj.rpeID):
             db.deleteItemByObject(obj)
         else:
-            print("Erro ao deletar objetivo: nível de acesso inválido.")     
+            logger.warning("Erro ao deletar objetivo: nível de acesso inválido (Manager %s).", self.id)
     
     def createKPI(self, kpi: KPI, db: 'Database'):
         if db.isObjectiveTeamOrDepartmentLevel(kpi.objectiveID):
             db.addItem(kpi)
         else:
-            print("Erro ao adicionar KPI: nível de acesso inválido.")
+            logger.warning("Erro ao adicionar KPI: nível de acesso inválido (Manager %s).", self.id)
 
     def deleteKPI(self, kpi: KPI, db: 'Database'):
         if db.isObjectiveTeamOrDepartmentLevel(kpi.objectiveID):
             db.deleteItemByObject(kpi)
         else:
-            print("Erro ao deletar KPI: nível de acesso inválido.")
+            logger.warning("Erro ao deletar KPI: nível de acesso inválido (Manager %s).", self.id)
 
     def createKR(self, kr: KR, db: 'Database'):
         if db.isObjectiveTeamOrDepartmentLevel(kr.objectiveID):
             db.addItem(kr)
         else:
-            print("Erro ao adicionar KR: nível de acesso inválido.")
+            logger.warning("Erro ao adicionar KR: nível de acesso inválido (Manager %s).", self.id)
     
     def deleteKR(self, kr: KR, objectiveID: str, db: 'Database'):
         if db.isObjectiveTeamOrDepartmentLevel(objectiveID):
             db.deleteItemByObject(kr)
         else:
-            print("Erro ao deletar KR: nível de acesso inválido.")
+            logger.warning("Erro ao deletar KR: nível de acesso inválido (Manager %s).", self.id)
 
     def collectIndicator(self, kpi: KPI, novo_dado: float, db: 'Database'):
         if kpi.responsibleID == self.id:
             kpi.addData(novo_dado)
             db.updateItem(kpi)
         else:
-            print("Erro ao coletar dado: nível de acesso inválido.")
+            logger.warning("Erro ao coletar dado: nível de acesso inválido (Manager %s).", self.id)
 
     def addResponsibleRpeId(self, rpdID: str, db: 'Database') -> None:
         self.__responsibleIDs.append(rpdID)
@@ -79,11 +85,11 @@ class Manager(Person):
             person.teamID = teamID
             db.assignPersonToTeam(person.id,teamID)
         else:
-            print("Erro ao adicionar pessoa: nível de acesso inválido.")
+            logger.warning("Erro ao adicionar pessoa: nível de acesso inválido (Manager %s).", self.id)
     
     def removePersonFromTeam(self, person: Person, db: 'Database') -> None:
         if person.teamID == self.teamID:
             person.teamID = None
             db.unassignPersonToTeam(person.id)
         else:
-            print("Erro ao adicionar pessoa: nível de acesso inválido.")
\ No newline at end of file
+            logger.warning("Erro ao remover pessoa: nível de acesso inválido (Manager %s).", self.id)
\ No newline at end of file
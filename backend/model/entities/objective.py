@@ -7,6 +7,8 @@ if TYPE_CHECKING:
 
 class Objective(Data):
 
+    __slots__ = ("__rpeID",)
+
     def __init__(self, description: str, responsibleID: str,date: str, rpeID: str, id:str = None):
         super().__init__(description, responsibleID, date, id)
         self.__rpeID = rpeID
@@ -1,5 +1,6 @@
 import re
 from .entity import Entity
+from ..security.passwords import verifyPassword
 from typing import TYPE_CHECKING
 # Usado para type hinting
 if TYPE_CHECKING:
@@ -7,6 +8,11 @@ if TYPE_CHECKING:
 
 class Person(Entity):
 
+    __slots__ = ("_name", "_cpf", "_role", "_companyID", "_departmentID", "_teamID", "__email", "__password")
+
+    # O hash da senha nunca é serializado nas respostas
+    _transient = ("_Person__password",)
+
     def __init__(self, name, cpf, companyID, departmentID=None, role: str = "Employee", teamID=None, email="", password="", id=None):
         super().__init__(id)
         self._name = name
@@ -67,10 +73,8 @@ class Person(Entity):
         self._teamID = teamID
 
     def verifyPassword(self, password :str):
-        if password == self.__password:
-            return True
-        else:
-            return False
+        # Síncrono (scrypt leva dezenas de ms): na API use PasswordHasher.verify
+        return verifyPassword(password, self.__password)
     
     def getData(self, group_type: str, group_id: str, data_type: str, db: 'Database'):
         """
@@ -7,6 +7,8 @@ if TYPE_CHECKING:
 
 class RPE(Data):
 
+    __slots__ = ()
+
     def __init__(self, description: str, responsibleID: str, date :str, id:str = None):
         super().__init__(description, responsibleID, date, id)
 
@@ -7,6 +7,9 @@ if TYPE_CHECKING:
 
 class Team(Group):
 
+    # employeeIDs: preenchido pelo Database ao hidratar o time (ids dos membros)
+    __slots__ = ("__employeeIds", "__managerID", "__departmentID", "employeeIDs")
+
     def __init__(self, name: str, managerID: str=None, departmentID: str=None, id: str = None, rpeIds: list[str] = None, employeeIds: list[str] = None):
         super().__init__(name, id, rpeIds)
         self.__employeeIds = employeeIds if employeeIds is not None else []
@@ -0,0 +1,266 @@
+"""
+Métricas no formato texto do Prometheus (contadores e histogramas).
+
+Registrar um evento custa uma busca binária e um incremento sob um lock da
+própria série; o texto só é montado quando alguém lê /metrics (render()).
+Valores que já existem em outros objetos (cache de entidades, pool...) são
+expostos por callbacks, lidos apenas no momento da coleta.
+
+    CALLS = REGISTRY.histogram("db_method_duration_seconds", "Latência", ("method",))
+    CALLS.labels("getPersonByID").observe(0.0012)
+    text = REGISTRY.render()
+"""
+import functools
+import inspect
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+# Limites (s) dos buckets de latência: de 100 µs a 10 s
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labelText(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Série com esses valores de rótulo (guarde o retorno em caminhos quentes)."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: esperados os rótulos {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._newChild())
+        return child
+
+    def _newChild(self):
+        raise NotImplementedError
+
+    def _series(self) -> list:
+        with self._lock:
+            return sorted(self._children.items())
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Counter(_Metric):
+    """Contador monotônico (ex.: erros, linhas lidas)."""
+
+    kind = "counter"
+
+    def _newChild(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        """Atalho para contadores sem rótulos."""
+        self.labels().inc(amount)
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, child in self._series():
+            lines.append(f"{self.name}{_labelText(self.labelnames, key)} {_number(child.value)}")
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, bounds: tuple):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)   # último: acima do maior limite (+Inf)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> tuple[list[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class Histogram(_Metric):
+    """
+    Histograma de durações em segundos. O '_count' de cada série é também o
+    número de chamadas (não há um contador de chamadas separado).
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _newChild(self):
+        return _HistogramChild(self.buckets)
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, child in self._series():
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = _labelText(self.labelnames, key, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _labelText(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Callback(_Metric):
+    """Valores lidos de uma função no momento da coleta: número ou {rótulos: valor}."""
+
+    def __init__(self, name: str, kind: str, help: str, func: Callable, labelnames: tuple = ()):
+        super().__init__(name, help, labelnames)
+        self.kind = kind
+        self.__func = func
+
+    def render(self) -> list[str]:
+        values = self.__func()
+        if not isinstance(values, dict):
+            values = {(): values}
+        lines = self._header()
+        for key, value in sorted(values.items()):
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(f"{self.name}{_labelText(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas de um processo; render() gera o texto de /metrics."""
+
+    def __init__(self):
+        self.__metrics = {}
+        self.__lock = threading.Lock()
+
+    def __register(self, metric: _Metric) -> _Metric:
+        with self.__lock:
+            current = self.__metrics.get(metric.name)
+            if current is not None:
+                # Mesma métrica declarada de novo (ex.: módulo recarregado): reutiliza
+                if type(current) is not type(metric) or current.labelnames != metric.labelnames:
+                    raise ValueError(f"Métrica '{metric.name}' já registrada com outro formato")
+                return current
+            self.__metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        return self.__register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self.__register(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name: str, kind: str, help: str, func: Callable, labelnames: tuple = ()) -> None:
+        """
+        Métrica calculada na coleta ('gauge' ou 'counter'). 'func' devolve um
+        número ou um dict {valor do rótulo (ou tupla de valores): número}.
+        Substitui um callback anterior de mesmo nome.
+        """
+        with self.__lock:
+            self.__metrics[name] = _Callback(name, kind, help, func, labelnames)
+
+    def render(self) -> str:
+        with self.__lock:
+            metrics = list(self.__metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registro padrão do processo (lido por GET /metrics)
+REGISTRY = MetricsRegistry()
+
+
+def instrumentMethods(cls: type, seconds: Histogram, errors: Counter,
+                      names: Optional[Iterable[str]] = None) -> type:
+    """
+    Substitui os métodos públicos de 'cls' por versões que registram a latência
+    em 'seconds' e as exceções em 'errors' (rótulo: nome do método).
+    Geradores não são instrumentados: a duração dependeria de quem os consome.
+    """
+    if names is None:
+        names = [name for name, attr in vars(cls).items()
+                 if not name.startswith("_") and inspect.isfunction(attr)]
+    for name in names:
+        func = vars(cls)[name]
+        if inspect.isgeneratorfunction(func) or getattr(func, "__instrumented__", False):
+            continue
+        setattr(cls, name, _timed(func, seconds, errors, name))
+    return cls
+
+
+def _timed(func: Callable, seconds: Histogram, errors: Counter, label: str) -> Callable:
+    # A série só é criada na primeira chamada: métodos nunca usados não aparecem em /metrics
+    series = None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        nonlocal series
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            errors.labels(label).inc()
+            raise
+        finally:
+            if series is None:
+                series = seconds.labels(label)
+            series.observe(time.perf_counter() - started)
+
+    wrapper.__instrumented__ = True
+    return wrapper
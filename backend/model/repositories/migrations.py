@@ -0,0 +1,474 @@
+"""
+Migrações versionadas do schema, controladas por PRAGMA user_version.
+
+Cada Migration é aplicada uma única vez, em ordem. A inicialização do
+Database só faz uma leitura de user_version quando o schema já está
+atualizado (nenhum DDL é executado).
+
+Para adicionar uma mudança de schema, acrescente uma Migration ao final de
+MIGRATIONS com a próxima versão. Migrações com 'backfill' processam os dados
+em lotes (cada lote em sua própria transação curta), para que arquivos grandes
+sejam atualizados sem segurar o lock de escrita por muito tempo; por isso,
+'apply' e 'backfill' precisam ser idempotentes (podem ser reexecutados se o
+processo cair no meio da migração).
+"""
+import json
+import logging
+import random
+import sqlite3
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from ..database.indexes import ensureIndexes
+
+logger = logging.getLogger(__name__)
+
+# Linhas processadas por transação nos backfills
+BACKFILL_CHUNK_SIZE = 5000
+
+
+class Migration:
+
+    def __init__(self, version: int, description: str, script: str = "",
+                 apply: Optional[Callable[[sqlite3.Connection], None]] = None,
+                 backfill: Optional[Callable[[sqlite3.Connection, int], int]] = None):
+        """
+        version: valor de user_version após a migração.
+        script: comandos SQL executados em uma única transação.
+        apply: função extra executada na mesma transação do script.
+        backfill: função (conn, chunk_size) -> linhas processadas; é chamada
+                  repetidamente, um lote por transação, até retornar 0.
+        """
+        self.version = version
+        self.description = description
+        self.script = script
+        self.apply = apply
+        self.backfill = backfill
+
+
+BASE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS company (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        cnpj TEXT UNIQUE
+    );
+
+    CREATE TABLE IF NOT EXISTS department (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        companyID TEXT, 
+        directorID TEXT,
+        FOREIGN KEY(companyID) REFERENCES company(id) ON DELETE CASCADE,
+        FOREIGN KEY(directorID) REFERENCES person(id) ON DELETE SET NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS team (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        departmentID TEXT,
+        managerID TEXT,
+        FOREIGN KEY(departmentID) REFERENCES department(id) ON DELETE CASCADE,
+        FOREIGN KEY(managerID) REFERENCES person(id) ON DELETE SET NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS person (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        cpf TEXT UNIQUE,
+        companyID TEXT,
+        departmentID TEXT NULL,
+        teamID TEXT NULL,
+        role TEXT,
+        email TEXT,
+        password TEXT,
+        FOREIGN KEY(companyID) REFERENCES company(id) ON DELETE SET NULL,
+        FOREIGN KEY(departmentID) REFERENCES department(id) ON DELETE SET NULL,
+        FOREIGN KEY(teamID) REFERENCES team(id) ON DELETE SET NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS rpe (
+        id TEXT PRIMARY KEY,
+        description TEXT,
+        responsibleID TEXT,
+        date TEXT,
+        FOREIGN KEY(responsibleID) REFERENCES person(id) ON DELETE SET NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS objective (
+        id TEXT PRIMARY KEY,
+        description TEXT,
+        responsibleID TEXT,
+        rpeID TEXT,
+        date TEXT,
+        FOREIGN KEY(rpeID) REFERENCES rpe(id) ON DELETE CASCADE,
+        FOREIGN KEY(responsibleID) REFERENCES person(id) ON DELETE SET NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS kpi (
+        id TEXT PRIMARY KEY,
+        description TEXT,
+        responsibleID TEXT,
+        objectiveID TEXT,
+        date TEXT,
+        data TEXT,
+        goal FLOAT,
+        FOREIGN KEY(objectiveID) REFERENCES objective(id) ON DELETE CASCADE,
+        FOREIGN KEY(responsibleID) REFERENCES person(id) ON DELETE SET NULL
+    );
+
+    --- TABELAS DE JUNÇÃO (Muitos-para-Muitos) ---
+
+    CREATE TABLE IF NOT EXISTS person_responsibles (
+        personID TEXT NOT NULL,
+        responsibleID TEXT NOT NULL,
+        PRIMARY KEY (personID, responsibleID),
+        FOREIGN KEY(personID) REFERENCES person(id) ON DELETE CASCADE,
+        FOREIGN KEY(responsibleID) REFERENCES person(id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS company_directors (
+        companyID TEXT NOT NULL,
+        personID TEXT NOT NULL,
+        PRIMARY KEY (companyID, personID),
+        FOREIGN KEY(companyID) REFERENCES company(id) ON DELETE CASCADE,
+        FOREIGN KEY(personID) REFERENCES person(id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS company_rpes (
+        companyID TEXT NOT NULL,
+        rpeID TEXT NOT NULL,
+        PRIMARY KEY (companyID, rpeID),
+        FOREIGN KEY(companyID) REFERENCES company(id) ON DELETE CASCADE,
+        FOREIGN KEY(rpeID) REFERENCES rpe(id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS department_rpes (
+        departmentID TEXT NOT NULL,
+        rpeID TEXT NOT NULL,
+        PRIMARY KEY (departmentID, rpeID),
+        FOREIGN KEY(departmentID) REFERENCES department(id) ON DELETE CASCADE,
+        FOREIGN KEY(rpeID) REFERENCES rpe(id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS team_rpes (
+        teamID TEXT NOT NULL,
+        rpeID TEXT NOT NULL,
+        PRIMARY KEY (teamID, rpeID),
+        FOREIGN KEY(teamID) REFERENCES team(id) ON DELETE CASCADE,
+        FOREIGN KEY(rpeID) REFERENCES rpe(id) ON DELETE CASCADE
+    );
+'''
+
+READINGS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS kpi_reading (
+        id INTEGER PRIMARY KEY,
+        kpiID TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        value REAL NOT NULL,
+        FOREIGN KEY(kpiID) REFERENCES kpi(id) ON DELETE CASCADE
+    );
+'''
+
+
+def _backfillReadings(conn: sqlite3.Connection, chunk_size: int) -> int:
+    """
+    Move o vetor JSON da coluna kpi.data para linhas em kpi_reading.
+    As leituras antigas recebem o timestamp da data do KPI (não havia horário
+    por leitura). Cada KPI migrado tem 'data' zerado, o que torna o lote idempotente.
+    """
+    rows = conn.execute("SELECT id, date, data FROM kpi WHERE data IS NOT NULL LIMIT ?", (chunk_size,))
+
+    readings, migrated = [], []
+    for kpi_id, date, data in rows:
+        try:
+            timestamp = datetime.fromisoformat(date).timestamp()
+        except (TypeError, ValueError):
+            timestamp = time.time()
+        try:
+            values = json.loads(data) or []
+        except ValueError:
+            values = []
+        readings.extend((kpi_id, timestamp, float(value)) for value in values)
+        migrated.append(kpi_id)
+        if len(readings) >= chunk_size:
+            break
+    rows.close()
+
+    conn.executemany("INSERT INTO kpi_reading (kpiID, timestamp, value) VALUES (?, ?, ?)", readings)
+    conn.executemany("UPDATE kpi SET data = NULL WHERE id = ?", [(kpi_id,) for kpi_id in migrated])
+    return len(migrated)
+
+
+ROLLUP_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS kr_attainment (
+        krID TEXT PRIMARY KEY,
+        value REAL NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS kr_rollup (
+        nodeType TEXT NOT NULL,
+        nodeID TEXT NOT NULL,
+        total REAL NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (nodeType, nodeID)
+    );
+
+    CREATE TABLE IF NOT EXISTS rollup_meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+
+    -- Começa "sujo": a primeira leitura calcula os rollups a partir dos dados existentes
+    INSERT OR REPLACE INTO rollup_meta (key, value) VALUES ('dirty', 1);
+
+    -- Mudanças de estrutura da hierarquia invalidam os rollups (reconstrução preguiçosa)
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_kpi_insert AFTER INSERT ON kpi
+        WHEN NEW.goal IS NOT NULL
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_kpi_delete AFTER DELETE ON kpi
+        WHEN OLD.goal IS NOT NULL
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_kpi_move AFTER UPDATE OF objectiveID, goal ON kpi
+        WHEN OLD.objectiveID IS NOT NEW.objectiveID OR (OLD.goal IS NULL) <> (NEW.goal IS NULL)
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_objective_delete AFTER DELETE ON objective
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_objective_move AFTER UPDATE OF rpeID ON objective
+        WHEN OLD.rpeID IS NOT NEW.rpeID
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_rpe_delete AFTER DELETE ON rpe
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_company_rpes_insert AFTER INSERT ON company_rpes
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_company_rpes_delete AFTER DELETE ON company_rpes
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_department_rpes_insert AFTER INSERT ON department_rpes
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_department_rpes_delete AFTER DELETE ON department_rpes
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_team_rpes_insert AFTER INSERT ON team_rpes
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_team_rpes_delete AFTER DELETE ON team_rpes
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_team_delete AFTER DELETE ON team
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_team_move AFTER UPDATE OF departmentID ON team
+        WHEN OLD.departmentID IS NOT NEW.departmentID
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_department_delete AFTER DELETE ON department
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_rollup_department_move AFTER UPDATE OF companyID ON department
+        WHEN OLD.companyID IS NOT NEW.companyID
+    BEGIN
+        UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+    END;
+'''
+
+ROLLUP_NODES_SCHEMA = '''
+    -- Nós da hierarquia que contêm cada KR: a soma de um nó é refeita só com os seus KRs
+    CREATE TABLE IF NOT EXISTS kr_node (
+        nodeType TEXT NOT NULL,
+        nodeID TEXT NOT NULL,
+        krID TEXT NOT NULL,
+        PRIMARY KEY (nodeType, nodeID, krID)
+    );
+
+    -- Preenchida pela próxima reconstrução
+    UPDATE rollup_meta SET value = 1 WHERE key = 'dirty';
+'''
+
+
+ROLLUP_PENDING_SCHEMA = '''
+    -- KRs criados desde o último refresh: somados aos seus nós sem reconstruir tudo
+    CREATE TABLE IF NOT EXISTS kr_pending (
+        krID TEXT PRIMARY KEY
+    );
+
+    DROP TRIGGER IF EXISTS trg_rollup_kpi_insert;
+
+    CREATE TRIGGER trg_rollup_kpi_insert AFTER INSERT ON kpi
+        WHEN NEW.goal IS NOT NULL
+    BEGIN
+        INSERT OR IGNORE INTO kr_pending (krID) VALUES (NEW.id);
+    END;
+'''
+
+# Tabelas com versão de alteração em change_version (ETags; ver ChangeTracker)
+VERSIONED_TABLES = (
+    "company", "company_directors", "company_rpes", "department", "department_rpes",
+    "team", "team_rpes", "person", "person_responsibles", "rpe", "objective", "kpi", "kpi_reading",
+)
+
+
+def _changeVersions(conn: sqlite3.Connection) -> None:
+    """
+    Cria change_version e os triggers que incrementam a versão de cada tabela
+    a cada linha inserida, alterada ou removida. kpi_reading só tem triggers de
+    UPDATE/DELETE: um por leitura inserida dobraria o custo da ingestão, e o
+    maior id da tabela já muda a cada inserção.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS change_version (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    """)
+    # Identificador do arquivo: um banco recriado não repete as ETags do anterior
+    conn.execute("INSERT OR IGNORE INTO change_version (name, version) VALUES ('*', ?)",
+                 (random.getrandbits(62),))
+    for table in VERSIONED_TABLES:
+        conn.execute("INSERT OR IGNORE INTO change_version (name, version) VALUES (?, 0)", (table,))
+        events = ("UPDATE", "DELETE") if table == "kpi_reading" else ("INSERT", "UPDATE", "DELETE")
+        for event in events:
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_version_{table}_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE change_version SET version = version + 1 WHERE name = '{table}';
+                END
+            """)
+
+
+MIGRATIONS = [
+    Migration(1, "schema relacional inicial", script=BASE_SCHEMA),
+    Migration(2, "índices secundários gerenciados", apply=ensureIndexes),
+    Migration(3, "leituras de KPI/KR em tabela própria", script=READINGS_SCHEMA,
+              apply=ensureIndexes, backfill=_backfillReadings),
+    Migration(4, "rollups de atingimento dos KRs", script=ROLLUP_SCHEMA),
+    Migration(5, "índice (companyID, id) para paginação de pessoas", apply=ensureIndexes),
+    Migration(6, "nós de cada KR nos rollups (recálculo exato das somas)", script=ROLLUP_NODES_SCHEMA,
+              apply=ensureIndexes),
+    Migration(7, "versões de alteração por tabela no banco (ETags)", apply=_changeVersions),
+    Migration(8, "KRs novos entram nos rollups sem reconstrução", script=ROLLUP_PENDING_SCHEMA),
+]
+
+
+def _statements(script: str):
+    """Divide um script SQL em comandos completos (respeitando triggers e strings)."""
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statement = buffer.strip()
+            buffer = ""
+            if statement.rstrip(";").strip():
+                yield statement
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def _inTransaction(conn: sqlite3.Connection, work: Callable[[], object]):
+    """Executa 'work' dentro de BEGIN IMMEDIATE ... COMMIT (rollback em caso de erro)."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        result = work()
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    return result
+
+
+def _setVersion(conn: sqlite3.Connection, version: int) -> None:
+    conn.execute(f"PRAGMA user_version = {int(version)}")
+
+
+def schemaVersion(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def latestVersion() -> int:
+    return MIGRATIONS[-1].version
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Aplica as migrações pendentes e retorna a versão final do schema.
+    Caminho rápido: se user_version já é a última versão, nada mais é executado.
+    """
+    current = schemaVersion(conn)
+    if current >= latestVersion():
+        return current
+
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+
+        def applyMigration(migration=migration):
+            for statement in _statements(migration.script):
+                conn.execute(statement)
+            if migration.apply:
+                migration.apply(conn)
+            if not migration.backfill:
+                _setVersion(conn, migration.version)
+
+        _inTransaction(conn, applyMigration)
+
+        if migration.backfill:
+            # Um lote por transação, até o backfill não encontrar mais linhas
+            while _inTransaction(conn, lambda: migration.backfill(conn, BACKFILL_CHUNK_SIZE)):
+                pass
+            _inTransaction(conn, lambda: _setVersion(conn, migration.version))
+
+        current = migration.version
+        logger.info("Migração %s aplicada (%s).", migration.version, migration.description)
+
+    return current
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    path = sys.argv[1] if len(sys.argv) > 1 else "database.db"
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA foreign_keys = ON;")
+    before = schemaVersion(connection)
+    after = migrate(connection)
+    print(f"Schema de '{path}': versão {before} → {after} (última: {latestVersion()}).")
+    connection.close()
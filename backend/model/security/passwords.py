@@ -0,0 +1,154 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+# Parâmetros do scrypt (custo ~ 128 * N * R bytes de memória = 16 MiB por hash)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+KEY_BYTES = 32
+PREFIX = "scrypt"
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * n * r + 1024 * 1024, dklen=KEY_BYTES,
+    )
+
+
+def hashPassword(password: str) -> str:
+    """
+    Gera o hash armazenado de uma senha: "scrypt$N$r$p$sal$hash" (base64).
+    Os parâmetros ficam no próprio valor, então podem mudar sem invalidar
+    os hashes antigos (ver needsRehash).
+    """
+    salt = os.urandom(SALT_BYTES)
+    key = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"{PREFIX}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(key)}"
+
+
+def _parse(stored: str) -> Optional[tuple]:
+    parts = (stored or "").split("$")
+    if len(parts) != 6 or parts[0] != PREFIX:
+        return None
+    try:
+        return int(parts[1]), int(parts[2]), int(parts[3]), _unb64(parts[4]), _unb64(parts[5])
+    except ValueError:
+        return None
+
+
+def isHashed(stored: str) -> bool:
+    return _parse(stored) is not None
+
+
+def verifyPassword(password: str, stored: str) -> bool:
+    """
+    Confere uma senha com o valor armazenado. Valores que não são hashes
+    (senhas gravadas em texto puro antes desta mudança) são comparados
+    diretamente, em tempo constante, para que o login continue funcionando
+    até a migração (ver PasswordHasher.verify).
+    """
+    if password is None or not stored:
+        return False
+    parsed = _parse(stored)
+    if parsed is None:
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    n, r, p, salt, key = parsed
+    return hmac.compare_digest(_scrypt(password, salt, n, r, p), key)
+
+
+def needsRehash(stored: str) -> bool:
+    """True se o valor está em texto puro ou com parâmetros diferentes dos atuais."""
+    parsed = _parse(stored)
+    return parsed is None or parsed[:3] != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+# Hash de referência para logins de e-mails inexistentes: o tempo de resposta
+# não revela se o usuário existe.
+_DUMMY_HASH = f"{PREFIX}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(bytes(SALT_BYTES))}${_b64(bytes(KEY_BYTES))}"
+
+
+class PasswordHasher:
+    """
+    Executa hash/verificação de senhas em um pool de processos limitado,
+    fora do event loop (e fora do GIL): um pico de logins ocupa no máximo
+    'workers' núcleos e, além de 'max_pending' pedidos em andamento, os
+    próximos esperam a vez sem bloquear os demais endpoints.
+
+        PASSWORDS = PasswordHasher(workers=2)
+        ok, new_hash = await PASSWORDS.verify(senha, person.password)
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 64):
+        self.__workers = max(1, workers)
+        self.__maxPending = max(1, max_pending)
+        self.__executor = None
+        self.__pending = None
+
+    def start(self) -> None:
+        """Cria o pool (também feito sob demanda no primeiro uso)."""
+        if self.__executor is None:
+            # 'spawn': o processo pai tem threads (pool do banco, commit em grupo),
+            # e fork com threads ativas pode herdar locks travados
+            self.__executor = ProcessPoolExecutor(
+                max_workers=self.__workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    async def __run(self, func, *args):
+        if self.__pending is None:
+            self.__pending = asyncio.Semaphore(self.__maxPending)
+        self.start()
+        async with self.__pending:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.__executor, func, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self.__run(hashPassword, password)
+
+    def hashMany(self, passwords: list[str]) -> list[str]:
+        """
+        Hash de várias senhas, bloqueante: para código que já roda fora do event
+        loop (ex.: importação em lote). No máximo 'workers' hashes ficam na fila
+        do pool por vez, então logins que chegam no meio esperam um hash, não o lote.
+        """
+        self.start()
+        hashes = []
+        for start in range(0, len(passwords), self.__workers):
+            futures = [self.__executor.submit(hashPassword, password)
+                       for password in passwords[start:start + self.__workers]]
+            hashes.extend(future.result() for future in futures)
+        return hashes
+
+    async def verify(self, password: str, stored: Optional[str]) -> tuple[bool, Optional[str]]:
+        """
+        Confere a senha e devolve (ok, novo hash). O novo hash só vem preenchido
+        quando a senha confere e o valor armazenado precisa ser migrado (texto
+        puro ou parâmetros antigos): quem chama deve gravá-lo.
+        """
+        if not stored:
+            await self.__run(verifyPassword, password or "", _DUMMY_HASH)
+            return False, None
+        ok = await self.__run(verifyPassword, password, stored)
+        if ok and needsRehash(stored):
+            return True, await self.hash(password)
+        return ok, None
+
+    def shutdown(self) -> None:
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
@@ -0,0 +1,94 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Claims copiados da pessoa no momento do login
+CLAIMS = ("id", "role", "companyID", "departmentID", "teamID")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class TokenSigner:
+    """
+    Tokens de sessão sem estado: "<claims em base64url>.<HMAC-SHA256 em base64url>".
+
+    Quem tem a chave confere a assinatura sem consultar o banco. Os claims já
+    verificados ficam em um cache LRU (token → claims), de modo que requisições
+    seguidas do mesmo usuário não refazem o HMAC nem o parse do JSON; a
+    expiração ('exp') é conferida em todo acesso, inclusive pelo cache.
+
+        signer = TokenSigner(secret, ttl=3600)
+        token = signer.issue(person)
+        claims = signer.verify(token)  # None se inválido ou expirado
+    """
+
+    def __init__(self, secret: bytes, ttl: float = 3600, cache_size: int = 4096):
+        if not secret:
+            raise ValueError("A chave de assinatura dos tokens não pode ser vazia")
+        self.__secret = secret
+        self.__ttl = ttl
+        self.__cacheSize = cache_size
+        self.__cache = OrderedDict()  # token -> claims
+        self.__lock = threading.Lock()
+
+    @property
+    def ttl(self) -> float:
+        return self.__ttl
+
+    def __sign(self, payload: bytes) -> bytes:
+        return hmac.new(self.__secret, payload, hashlib.sha256).digest()
+
+    def issue(self, person) -> str:
+        """Emite um token para 'person' (qualquer objeto com os atributos de CLAIMS)."""
+        now = int(time.time())
+        claims = {name: getattr(person, name, None) for name in CLAIMS}
+        claims.update(iat=now, exp=now + int(self.__ttl))
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        return f"{payload}.{_b64encode(self.__sign(payload.encode('ascii')))}"
+
+    def verify(self, token: str) -> Optional[dict]:
+        """Claims do token, ou None se a assinatura não confere ou o token expirou."""
+        if not token:
+            return None
+        with self.__lock:
+            claims = self.__cache.get(token)
+            if claims is not None:
+                self.__cache.move_to_end(token)
+        if claims is None:
+            claims = self.__decode(token)
+            if claims is None:
+                return None
+            with self.__lock:
+                self.__cache[token] = claims
+                while len(self.__cache) > self.__cacheSize:
+                    self.__cache.popitem(last=False)
+
+        if claims["exp"] <= time.time():
+            with self.__lock:
+                self.__cache.pop(token, None)
+            return None
+        return dict(claims)
+
+    def __decode(self, token: str) -> Optional[dict]:
+        payload, _, signature = token.partition(".")
+        try:
+            expected = self.__sign(payload.encode("ascii"))
+            if not hmac.compare_digest(_b64decode(signature), expected):
+                return None
+            claims = json.loads(_b64decode(payload))
+        except (ValueError, UnicodeError):
+            return None
+        if not isinstance(claims, dict) or not isinstance(claims.get("exp"), (int, float)) or not claims.get("id"):
+            return None
+        return claims
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class ReadingAdd(BaseModel):
+    measure_id: str
+    value: float
+    timestamp: Optional[datetime] = None
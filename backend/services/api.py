@@ -1,7 +1,14 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
+from typing import List, Optional
 from datetime import datetime
+import json
+import logging
+import os
+import re
+import tempfile
 
 from model.entities.person import Person
 from model.entities.director import Director
@@ -14,6 +21,12 @@ from model.entities.kr import KR
 from model.entities.kpi import KPI
 from model.entities.objective import Objective
 from model.database.database import Database
+from model.database.asyncDatabase import AsyncDatabase
+from model.security.passwords import PasswordHasher
+from model.security.tokens import TokenSigner
+from model.monitoring.metrics import REGISTRY
+from config import settings
+from config.logger import setup_logging
 
 from .BaseModels.CompanyCreate import CompanyCreate
 from .BaseModels.DepartmentCreate import DepartmentCreate
@@ -26,8 +39,28 @@ from .BaseModels.ObjectiveCreate import ObjectiveCreate
 from .BaseModels.KRCreate import KRCreate
 from .BaseModels.DataAdd import DataAdd
 from .BaseModels.KRUpdate import KRUpdate
+from .BaseModels.ReadingAdd import ReadingAdd
+from .etag import conditional_get
+from .auth import current_user
+from .metrics import MetricsMiddleware, metrics_response, register_database
+from . import bulkImport
 
-app = FastAPI(title="Backend API")
+# Antes de abrir o banco, para que os eventos da inicialização já passem pela fila
+setup_logging(settings.LOG_LEVEL, settings.LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Encerramento explícito: grava o lote pendente do commit em grupo e fecha
+    # as conexões antes de o interpretador começar a desmontar os módulos
+    DB.close()
+    DB.database.close()
+    PASSWORDS.shutdown()
+
+
+app = FastAPI(title="Backend API", lifespan=lifespan)
 
 # Configurar CORS
 app.add_middleware(
@@ -36,15 +69,87 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
+)
+# Latência e status por rota (exposto em /metrics)
+app.add_middleware(MetricsMiddleware, registry=REGISTRY)
+
+DB = AsyncDatabase(Database(
+    settings.DATABASE_PATH,
+    settings.DB_POOL_SIZE,
+    settings.DB_BUSY_TIMEOUT_MS,
+    settings.DB_CACHE_SIZE,
+    settings.DB_CACHE_TTL_S,
+    settings.DB_GROUP_COMMIT_MS,
+    settings.DB_SLOW_QUERY_MS if settings.DB_SLOW_QUERY_MS >= 0 else None,
+))
+
+# scrypt roda em processos separados: logins simultâneos não travam o event loop
+PASSWORDS = PasswordHasher(settings.PASSWORD_WORKERS, settings.PASSWORD_MAX_PENDING)
+
+if not settings.TOKEN_SECRET:
+    logger.warning("TOKEN_SECRET não definido: usando uma chave aleatória (tokens não sobrevivem a reinícios).")
+TOKENS = TokenSigner(
+    settings.TOKEN_SECRET.encode("utf-8") or os.urandom(32),
+    settings.TOKEN_TTL_S,
+    settings.TOKEN_CACHE_SIZE,
 )
+# Identidade de quem chama (pelo token Bearer), sem ida ao banco
+CurrentUser = Depends(current_user(TOKENS, DB.org))
+
+# Cache de entidades, pool e hierarquia: lidos só quando /metrics é coletado
+register_database(REGISTRY, DB.database)
+
+# Tabelas lidas por cada GET com ETag (a resposta só muda quando uma delas muda)
+PEOPLE_TABLES = ("person", "person_responsibles")
+TEAM_TABLES = ("team", "team_rpes", "person")
+DEPARTMENT_TABLES = ("department", "department_rpes", "team")
+COMPANY_TABLES = ("company", "company_directors", "company_rpes", "department")
+ORG_TABLES = ("company", "department", "team", "person")
+OKR_TABLES = ("rpe", "objective", "kpi", "kpi_reading", "company_rpes", "department_rpes", "team_rpes")
+
+
+# Paginação por cursor dos endpoints de listagem
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
 
-DB = Database("database.db")
+
+def page_limit(after: Optional[str], limit: Optional[int]) -> Optional[int]:
+    """Tamanho da página: sem cursor nem limit, a listagem vem completa."""
+    if limit is None and after is not None:
+        return DEFAULT_PAGE_SIZE
+    return limit
+
+
+def etag(*tables: str):
+    return [Depends(conditional_get(DB.changes, *tables))]
 
 @app.get("/")
 async def read_root():
     return {"message": "Backend Python funcionando!"}
 
 
+@app.get("/stats/cache")
+async def get_cache_stats():
+    """Acertos/falhas do cache de entidades do Database (para dimensionar DB_CACHE_SIZE)."""
+    return {"data": await DB.getCacheStats()}
+
+
+@app.get("/stats/queries")
+async def get_query_stats(
+    limit: int = Query(20, ge=1, le=500),
+    order: str = Query("total", pattern="^(total|max|mean|calls)$"),
+):
+    """Formatos de SQL mais custosos, com o EXPLAIN QUERY PLAN das execuções lentas (DB_SLOW_QUERY_MS)."""
+    return {"data": await DB.getQueryStats(limit, order)}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Métricas do processo no formato do Prometheus (rotas, métodos do Database, SQLite)."""
+    return metrics_response(REGISTRY)
+
+
 # =====================
 #         USER
 # =====================
@@ -52,7 +157,7 @@ async def read_root():
 async def get_user_by_email(email: str):
     if not email:
         raise HTTPException(status_code=400, detail="Email é obrigatório")
-    user = DB.getPersonByEmail(email)
+    user = await DB.getPersonByEmail(email)
     if user is None:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     return {"data": user}
@@ -63,14 +168,24 @@ async def login(data: Login):
     if not data.email or not data.password:
         raise HTTPException(status_code=400, detail="Email e senha são obrigatórios")
 
-    user = DB.getPersonByEmail(data.email)
-    if user and user.verifyPassword(data.password):
-        return {"status": True, "message": user}
+    user = await DB.getPersonByEmail(data.email)
+    # Sem usuário, verifica contra um hash fictício: o tempo não revela se o email existe
+    ok, new_hash = await PASSWORDS.verify(data.password, user.password if user else None)
+    if ok:
+        if new_hash:
+            # Senha em texto puro (ou hash com parâmetros antigos): migra no login
+            await DB.setPassword(user.id, new_hash)
+        return {"status": True, "message": user, "token": TOKENS.issue(user), "expiresIn": TOKENS.ttl}
     return {"status": False, "message": "Email ou senha incorretos"}
    
+@app.get("/me")
+async def get_me(user: dict = CurrentUser):
+    """Identidade do portador do token (id, cargo, empresa, departamento, time)."""
+    return {"data": user}
+
 @app.get("/user_by_id/{id}")
 async def get_user_by_id(id : str):
-    user = DB.getPersonByID(id)
+    user = await DB.getPersonByID(id)
     if user == None:
         raise HTTPException(
             status_code=404, 
@@ -93,14 +208,14 @@ async def create_user(user: UserCreate):
     departmentID=user.departmentID,
     teamID=user.teamID,
     email=user.email,
-    password=user.password)
+    password=await PASSWORDS.hash(user.password))
 
-    DB.addItem(new_user)
+    await DB.addItem(new_user)
     return {"message": "Usuário criado com sucesso!"}
 
-@app.get("/getAllCompanies")
+@app.get("/getAllCompanies", dependencies=etag(*COMPANY_TABLES))
 async def getAllCompanies():
-    companies = DB.getCompanyByID("c972a771-0718-4c75-bddf-dfa605b7b93d")
+    companies = await DB.getCompanyByID("c972a771-0718-4c75-bddf-dfa605b7b93d")
     return {"data": companies}
 
 
@@ -108,7 +223,7 @@ async def getAllCompanies():
 async def change_role(id: str, role: str):
     if not id or not role:
         raise HTTPException(status_code=400, detail="ID e cargo são obrigatórios")
-    user = DB.getPersonByID(id)
+    user = await DB.getPersonByID(id)
     if user is None:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     user.role = role
@@ -120,13 +235,13 @@ async def change_role(id: str, role: str):
         )
     else:
         user.role = role
-        DB.updateItem(user)
+        await DB.updateItem(user)
         return {"message": "Cargo mudado com sucesso"}
 
 
 @app.put("/user_department/{id}/{idDepartment}")
 async def change_user_department(id: str, idDepartment: str):
-    DB.assignPersonToDepartment(id, idDepartment)
+    await DB.assignPersonToDepartment(id, idDepartment)
 
 # =====================
 #         RPE
@@ -138,7 +253,7 @@ async def create_RPE(rpe: RPECreate):
 
     date = datetime.now()
     new_rpe = RPE(rpe.description, rpe.responsibleID, date)
-    DB.addItem(new_rpe)
+    await DB.addItem(new_rpe)
     return {"message": "RPE criado com sucesso!", "id": new_rpe.id}
 
 
@@ -146,7 +261,7 @@ async def create_RPE(rpe: RPECreate):
 async def get_RPE(id: str):
     if not id:
         raise HTTPException(status_code=400, detail="ID é obrigatório")
-    rpe = DB.getRPEByID(id)
+    rpe = await DB.getRPEByID(id)
     if rpe is None:
         raise HTTPException(status_code=404, detail="RPE não encontrado")
     return {"data": rpe}
@@ -157,12 +272,12 @@ async def change_kr_goal(id: str, kr_data: KRUpdate):
     if not id or kr_data.goal is None:
         raise HTTPException(status_code=400, detail="ID e novo goal são obrigatórios")
 
-    kr = DB.getKRByID(id)
+    kr = await DB.getKRByID(id)
     if kr is None:
         raise HTTPException(status_code=404, detail="KR não encontrado")
 
     kr.goal = kr_data.goal
-    DB.updateItem(kr)
+    await DB.updateItem(kr)
     return {"message": "KR atualizado com sucesso"}
 
 
@@ -171,12 +286,13 @@ async def change_kr_data(id: str, kr_data: DataAdd):
     if not id or kr_data.data is None:
         raise HTTPException(status_code=400, detail="ID e dados são obrigatórios")
 
-    kr = DB.getKRByID(id)
+    kr = await DB.getKRByID(id)
     if kr is None:
         raise HTTPException(status_code=404, detail="KR não encontrado")
 
-    kr.addData(kr_data.data)
-    DB.updateItem(kr)
+    # Uma leitura nova é um único INSERT (não reescreve o histórico do KR)
+    if await DB.addReading(id, kr_data.data) != 0:
+        raise HTTPException(status_code=500, detail="Falha ao registrar dado do KR")
     return {"message": "KR atualizado com sucesso"}
 
 
@@ -189,7 +305,7 @@ async def create_company(company: CompanyCreate):
         raise HTTPException(status_code=400, detail="Nome e CNPJ são obrigatórios")
 
     new_company = Company(company.name, company.cnpj)
-    DB.addItem(new_company)
+    await DB.addItem(new_company)
     return {"message": "Empresa criada com sucesso!"}
 
 
@@ -197,46 +313,54 @@ async def create_company(company: CompanyCreate):
 async def get_company(cnpj: str):
     if not cnpj:
         raise HTTPException(status_code=400, detail="CNPJ é obrigatório")
-    company = DB.getCompanyByCnpj(cnpj)
+    company = await DB.getCompanyByCnpj(cnpj)
     if company is None:
         raise HTTPException(status_code=404, detail="Empresa não encontrada")
     return {"data": company}
 
 
-@app.get("/department_users/{id}")
+@app.get("/department_users/{id}", dependencies=etag(*DEPARTMENT_TABLES, *TEAM_TABLES, *PEOPLE_TABLES))
 async def get_department_users(id : str):
-    dep = DB.getDepartmentByID(id)
-
-    if dep == None:
+    org = DB.org
+    if not org.exists("department", id):
         raise HTTPException(status_code=404, detail="Departamento não encontrado")
-    usersIDS = []
-    usersIDS.append(dep.directorID())
-
-    for team_id in dep.teamIds:
-        team = DB.getTeamByID(team_id)
-        if team.managerID not in usersIDS:
-            usersIDS.append(team.managerID)
-        
-        for employee_id in team.employeeIds:
-            if employee_id not in usersIDS:
-                usersIDS.append(DB.getPersonByID(employee_id))
-    users = []
-    for user in users:
-        users.append(user)
+
+    # Diretor, gerentes e funcionários de todos os times (ids do índice em memória)
+    usersIDS = [org.get("department", id, "directorID")]
+    for team_id in org.teamsOf("Department", id):
+        usersIDS.append(org.get("team", team_id, "managerID"))
+        usersIDS.extend(org.membersOf(team_id))
+
+    users = await DB.getPersonsByIDs(usersIDS)
 
     return {"data" : users}
 
-@app.get("/company_departments/{id}")
-async def get_company_departments(id : str):
-    company = DB.getCompanyByID(id)
+@app.get("/export/company/{id}")
+async def export_company(id: str, readings: bool = False):
+    """
+    Exporta tudo o que pertence à empresa em NDJSON (uma linha por entidade):
+    {"type": "department" | "team" | "person" | "rpe" | "objective" | "kpi" | "kr" | "reading", "data": {...}}
+    A resposta é gerada em streaming, sem montar o export inteiro em memória.
+    """
+    if await DB.getCompanyByID(id) is None:
+        raise HTTPException(status_code=404, detail="Empresa não encontrada")
 
-    if company == None:
-        raise HTTPException(status_code=404, detail="Empresa não encontrado")
-    departmentsIDS = company.departmentIds
-    departments = []
+    lines = (
+        json.dumps({"type": entity_type, "data": data}, ensure_ascii=False) + "\n"
+        for entity_type, data in DB.database.exportCompany(id, readings)
+    )
+    return StreamingResponse(
+        lines,
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="company-{id}.ndjson"'},
+    )
 
-    for department_id in departmentsIDS:
-        departments.append(DB.getTeamByID(department_id))
+
+@app.get("/company_departments/{id}", dependencies=etag(*COMPANY_TABLES, *DEPARTMENT_TABLES))
+async def get_company_departments(id : str):
+    if not DB.org.exists("company", id):
+        raise HTTPException(status_code=404, detail="Empresa não encontrado")
+    departments = await DB.getDepartmentsByIDs(DB.org.departmentsOf(id))
 
     return {"data" : departments}
 
@@ -247,67 +371,51 @@ async def get_company_departments(id : str):
 async def create_department(department: DepartmentCreate):
     if not department.name or not department.companyID:
         raise HTTPException(status_code=400, detail="Nome e companyID são obrigatórios")
-    print(department.companyID)
     new_department = Department(department.name, department.directorID, department.companyID)
-    DB.addItem(new_department)
+    await DB.addItem(new_department)
     return {"message": "Departamento criado com sucesso!"}
 
-@app.get("/department/{id}")
+@app.get("/department/{id}", dependencies=etag(*DEPARTMENT_TABLES))
 async def get_department_by_id(id:str):
-    department = DB.getDepartmentByID(id)
-    print(department)
+    department = await DB.getDepartmentByID(id)
     if(department == None):
         raise HTTPException(status_code=404, detail="Departamento não encontrado")
     else: return({"data": department})
 
 
-@app.get("/department_users/{id}")
-async def get_department_users(id : str):
-    dep = DB.getDepartmentByID(id)
-
-    if dep == None:
-        raise HTTPException(status_code=404, detail="Departamento não encontrado")
-    usersIDS = []
-    usersIDS.append(dep.directorID())
-
-    for team_id in dep.teamIds:
-        team = DB.getTeamByID(team_id)
-        if team.managerID not in usersIDS:
-            usersIDS.append(team.managerID)
-        
-        for employee_id in team.employeeIds:
-            if employee_id not in usersIDS:
-                usersIDS.append(DB.getPersonByID(employee_id))
-    users = []
-    for user in users:
-        users.append(user)
-
-    return {"data" : users}
-
-@app.get("/getAllDepartments") 
+@app.get("/getAllDepartments", dependencies=etag(*DEPARTMENT_TABLES))
 async def getDepartmentsByCompanyID():
-    departaments = DB.getDepartmentsByCompanyID("c972a771-0718-4c75-bddf-dfa605b7b93d")
+    departaments = await DB.getDepartmentsByCompanyID("c972a771-0718-4c75-bddf-dfa605b7b93d")
     
     return {"data": departaments}
 
-@app.get("/getAllEmployees") 
-async def getPersonsByCompanyID():
-    users = DB.getPersonsByCompanyID("c972a771-0718-4c75-bddf-dfa605b7b93d")
-    
-    return {"data": users}
+@app.get("/getAllEmployees", dependencies=etag(*PEOPLE_TABLES))
+async def getPersonsByCompanyID(
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    role: Optional[str] = None,
+    department: Optional[str] = None,
+    team: Optional[str] = None,
+):
+    """
+    Pessoas da empresa, paginadas por cursor: passe o 'next' da resposta
+    anterior em 'after'. Sem 'after' nem 'limit', devolve todas (compatibilidade).
+    """
+    users, next_cursor = await DB.getPersonsPage(
+        "c972a771-0718-4c75-bddf-dfa605b7b93d",
+        after,
+        page_limit(after, limit),
+        role,
+        department,
+        team,
+    )
+    return {"data": users, "next": next_cursor}
     
-@app.get("/department_teams/{id}")
+@app.get("/department_teams/{id}", dependencies=etag(*DEPARTMENT_TABLES, *TEAM_TABLES))
 async def get_department_teams(id : str):
-    dep = DB.getDepartmentByID(id)
-
-    if dep == None:
+    if not DB.org.exists("department", id):
         raise HTTPException(status_code=404, detail="Departamento não encontrado")
-    teamsIDS = dep.teamIds
-    teams = []
-
-    for team_id in teamsIDS:
-        teams.append(DB.getTeamByID(team_id))
-    
+    teams = await DB.getTeamsByIDs(DB.org.teamsOf("Department", id))
 
     return {"data" : teams}
 
@@ -315,11 +423,18 @@ async def get_department_teams(id : str):
 # =====================
 #         TEAM
 # =====================
-@app.get("/getAllTeams")
-async def get_teams():
-    teams = DB.getTeams()
-    
-    return {"data": teams}
+@app.get("/getAllTeams", dependencies=etag(*TEAM_TABLES))
+async def get_teams(
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    department: Optional[str] = None,
+):
+    """
+    Times, paginados por cursor ('after' = 'next' da resposta anterior).
+    Sem 'after' nem 'limit', devolve todos (compatibilidade).
+    """
+    teams, next_cursor = await DB.getTeamsPage(None, after, page_limit(after, limit), department)
+    return {"data": teams, "next": next_cursor}
 
 @app.post("/team")
 async def create_team(team: TeamCreate):
@@ -327,21 +442,52 @@ async def create_team(team: TeamCreate):
         raise HTTPException(status_code=400, detail="Campos obrigatórios ausentes")
 
     new_team = Team(team.name, team.managerID, team.departmentID)
-    DB.addItem(new_team)
+    await DB.addItem(new_team)
     return {"message": "Time criado com sucesso!", "id": new_team.id}
 
 
-@app.get("/team_users/{id}")
+@app.get("/team_users/{id}", dependencies=etag(*TEAM_TABLES, *PEOPLE_TABLES))
 async def get_team_users(id : str):
-    team = DB.getTeamByID(id)
+    team = await DB.getTeamByID(id)
 
     if team == None:
         raise HTTPException(status_code=404, detail="Equipe não encontrado")
-    users = DB.getPersonsByTeamID(team.id)
+    users = await DB.getPersonsByTeamID(team.id)
 
 
     return {"data" : users}
 
+# =====================
+#    IMPORTAÇÃO EM LOTE
+# =====================
+# Corpo mantido em memória até este tamanho; acima disso vai para um arquivo temporário
+IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+@app.post("/import")
+async def bulk_import(request: Request, format: str = "csv", type: Optional[str] = None):
+    """
+    Importa companies / departments / teams / persons de um CSV ou NDJSON
+    enviado como corpo da requisição (ver services/bulkImport.py).
+    type: obrigatório para CSV; no NDJSON pode vir em cada linha ({"type", "data"}).
+    Responde com a contagem de inseridos / com erro e os erros por linha.
+    """
+    if format not in bulkImport.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format deve ser um de: {', '.join(bulkImport.FORMATS)}")
+    if format == "csv" and type not in bulkImport.IMPORT_TYPES:
+        raise HTTPException(status_code=400, detail=f"type deve ser um de: {', '.join(bulkImport.IMPORT_TYPES)}")
+
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as body:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        report = await DB.run(
+            bulkImport.import_records, DB.database, bulkImport.open_text(body), format, type,
+            hasher=PASSWORDS
+        )
+    return {"data": report}
+
+
 # =====================
 #      DELETE ENDPOINTS
 # =====================
@@ -349,86 +495,205 @@ async def get_team_users(id : str):
 @app.delete("/company/{id}")
 async def delete_company(id: str):
     """Deleta uma empresa pelo ID"""
-    company = DB.getCompanyByID(id)
+    company = await DB.getCompanyByID(id)
     if company is None:
         raise HTTPException(status_code=404, detail="Empresa não encontrada")
     
-    DB.deleteItemByObject(company)
+    await DB.deleteItemByObject(company)
     return {"message": "Empresa deletada com sucesso"}
 
 @app.delete("/department/{id}")
 async def delete_department(id: str):
     """Deleta um departamento pelo ID"""
-    department = DB.getDepartmentByID(id)
+    department = await DB.getDepartmentByID(id)
     if department is None:
         raise HTTPException(status_code=404, detail="Departamento não encontrado")
     
-    DB.deleteItemByObject(department)
+    await DB.deleteItemByObject(department)
     return {"message": "Departamento deletado com sucesso"}
 
 @app.delete("/team/{id}")
 async def delete_team(id: str):
     """Deleta um time pelo ID"""
-    team = DB.getTeamByID(id)
+    team = await DB.getTeamByID(id)
     if team is None:
         raise HTTPException(status_code=404, detail="Time não encontrado")
     
-    DB.deleteItemByObject(team)
+    await DB.deleteItemByObject(team)
     return {"message": "Time deletado com sucesso"}
 
 @app.delete("/user/{id}")
 async def delete_user(id: str):
     """Deleta um usuário pelo ID"""
-    user = DB.getPersonByID(id)
+    user = await DB.getPersonByID(id)
     if user is None:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
-    DB.deleteItemByObject(user)
+    await DB.deleteItemByObject(user)
     return {"message": "Usuário deletado com sucesso"}
 
 @app.delete("/rpe/{id}")
 async def delete_rpe(id: str):
     """Deleta um RPE pelo ID"""
-    rpe = DB.getRPEByID(id)
+    rpe = await DB.getRPEByID(id)
     if rpe is None:
         raise HTTPException(status_code=404, detail="RPE não encontrado")
     
-    DB.deleteItemByObject(rpe)
+    await DB.deleteItemByObject(rpe)
     return {"message": "RPE deletado com sucesso"}
 
 @app.delete("/objective/{id}")
 async def delete_objective(id: str):
     """Deleta um objetivo pelo ID"""
-    objective = DB.getObjectiveByID(id)
+    objective = await DB.getObjectiveByID(id)
     if objective is None:
         raise HTTPException(status_code=404, detail="Objetivo não encontrado")
     
-    DB.deleteItemByObject(objective)
+    await DB.deleteItemByObject(objective)
     return {"message": "Objetivo deletado com sucesso"}
 
 @app.delete("/kpi/{id}")
 async def delete_kpi(id: str):
     """Deleta um KPI pelo ID"""
-    kpi = DB.getKPIByID(id)
+    kpi = await DB.getKPIByID(id)
     if kpi is None:
         raise HTTPException(status_code=404, detail="KPI não encontrado")
     
-    DB.deleteItemByObject(kpi)
+    await DB.deleteItemByObject(kpi)
     return {"message": "KPI deletado com sucesso"}
 
 @app.delete("/kr/{id}")
 async def delete_kr(id: str):
     """Deleta um KR pelo ID"""
-    kr = DB.getKRByID(id)
+    kr = await DB.getKRByID(id)
     if kr is None:
         raise HTTPException(status_code=404, detail="KR não encontrado")
     
-    DB.deleteItemByObject(kr)
+    await DB.deleteItemByObject(kr)
     return {"message": "KR deletado com sucesso"}
 
 
+# Máximo de leituras por chamada de /measures/readings
+MAX_READINGS_BATCH = 10000
+
+
+@app.post("/measures/readings")
+async def add_readings(readings: List[ReadingAdd]):
+    """
+    Registra um lote de leituras de vários KPIs/KRs em uma única transação.
+    Corpo: [{"measure_id": ..., "value": ..., "timestamp": opcional}, ...]
+    Responde com o status de cada item, na mesma ordem do corpo.
+    """
+    if len(readings) > MAX_READINGS_BATCH:
+        raise HTTPException(status_code=413, detail=f"Máximo de {MAX_READINGS_BATCH} leituras por lote")
+
+    errors = await DB.addReadings([
+        (r.measure_id, r.value, r.timestamp.timestamp() if r.timestamp else None)
+        for r in readings
+    ])
+    results = [
+        {"measure_id": r.measure_id, "status": "error" if error else "ok", **({"detail": error} if error else {})}
+        for r, error in zip(readings, errors)
+    ]
+    failed = sum(1 for error in errors if error)
+    return {"data": results, "inserted": len(readings) - failed, "failed": failed}
+
+
+# Unidades aceitas em 'bucket' (ex.: "30s", "15m", "1h", "1d", "1w")
+BUCKET_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+SERIES_AGGREGATES = ("avg", "min", "max", "last", "count")
+
+
+def parse_bucket(bucket: str) -> float:
+    """Converte '15m', '1h', ... (ou um número de segundos) para segundos."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhdw]?)", bucket.strip())
+    if not match:
+        raise HTTPException(status_code=400, detail=f"bucket inválido: {bucket}")
+    seconds = float(match.group(1)) * BUCKET_UNITS.get(match.group(2) or "s")
+    if seconds <= 0:
+        raise HTTPException(status_code=400, detail="bucket deve ser maior que zero")
+    return seconds
+
+
+@app.get("/kpi/{id}/series", dependencies=etag("kpi", "kpi_reading"))
+async def get_kpi_series(
+    id: str,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    bucket: str = "1h",
+    agg: str = "avg",
+):
+    """
+    Série agregada das leituras de um KPI ou KR.
+    from/to: datas ISO 8601 ou epoch em segundos (intervalo [from, to)).
+    bucket: tamanho do intervalo ("30s", "15m", "1h", "1d", "1w").
+    agg: "avg" | "min" | "max" | "last" | "count".
+    """
+    if agg not in SERIES_AGGREGATES:
+        raise HTTPException(status_code=400, detail=f"agg deve ser um de: {', '.join(SERIES_AGGREGATES)}")
+    seconds = parse_bucket(bucket)
+
+    measure = await DB.getMeasureByID(id)
+    if measure is None:
+        raise HTTPException(status_code=404, detail="KPI/KR não encontrado")
+
+    series = await DB.getReadingSeries(
+        id,
+        start.timestamp() if start else None,
+        end.timestamp() if end else None,
+        seconds,
+        agg,
+    )
+    return {"data": series, "bucket": seconds, "agg": agg}
+
+
+@app.get("/hierarchy/{group_type}/{group_id}", dependencies=etag(*ORG_TABLES))
+async def get_hierarchy(group_type: str, group_id: str):
+    """
+    Ids da subárvore de um grupo (departamentos, times e pessoas abaixo dele),
+    respondido pelo índice da hierarquia em memória, sem consultas ao banco.
+    group_type: "company" | "department" | "team"
+    """
+    org = DB.org
+    group_type = group_type.lower()
+    if group_type not in ("company", "department", "team"):
+        raise HTTPException(status_code=400, detail="Tipo de grupo inválido")
+    if not org.exists(group_type, group_id):
+        raise HTTPException(status_code=404, detail="Grupo não encontrado")
+
+    kind = group_type.capitalize()
+    return {"data": {
+        "departments": org.departmentsOf(group_id) if kind == "Company" else [],
+        "teams": org.teamsOf(kind, group_id) if kind != "Team" else [],
+        "persons": org.personsUnder(kind, group_id),
+    }}
+
+
+@app.get("/hierarchy/{kind}/{id}/ancestors", dependencies=etag(*ORG_TABLES))
+async def get_ancestors(kind: str, id: str):
+    """Empresa, departamento e time acima de uma pessoa, time ou departamento."""
+    chain = DB.org.ancestorsOf(kind.lower(), id) if kind.lower() != "company" else None
+    if chain is None:
+        raise HTTPException(status_code=404, detail="Item não encontrado")
+    return {"data": chain}
+
+
+@app.get("/rollup/{group_type}/{group_id}")
+async def get_rollup(group_type: str, group_id: str):
+    """
+    Atingimento médio (0 a 1) dos KRs abaixo de um grupo ou dado da hierarquia.
+    group_type: "company" | "department" | "team" | "rpe" | "objective"
+    "stale": true indica uma mudança de estrutura ainda sendo aplicada em segundo plano.
+    """
+    node_type = {"rpe": "RPE"}.get(group_type.lower(), group_type.capitalize())
+    try:
+        rollup = await DB.getRollup(node_type, group_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"data": rollup}
+
 
-@app.get("/data/{group_type}/{group_id}/{data_type}")
+@app.get("/data/{group_type}/{group_id}/{data_type}", dependencies=etag(*OKR_TABLES))
 async def get_data_by_entity(group_type: str, group_id: str, data_type: str):
     """
     Retorna RPE / Objective / KPI / KR filtrado por Company, Department ou Team.
@@ -444,7 +709,7 @@ async def get_data_by_entity(group_type: str, group_id: str, data_type: str):
     data_type_normalized = data_type.upper()
 
     try:
-        result = DB.getDataByEntity(
+        result = await DB.getDataByEntity(
             group_type_normalized,
             group_id,
             data_type_normalized
@@ -456,5 +721,5 @@ async def get_data_by_entity(group_type: str, group_id: str, data_type: str):
 
 @app.put("/user_team/{userID}/{teamID}")
 async def assign_user_to_team(userID: str, teamID: str):
-    DB.assignPersonToTeam(userID, teamID)
+    await DB.assignPersonToTeam(userID, teamID)
     return {"message": f"Usuário {userID} adicionado à equipe {teamID} com sucesso"}
@@ -0,0 +1,43 @@
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+from model.database.orgIndex import OrgIndex
+from model.security.tokens import CLAIMS, TokenSigner
+
+
+def bearer_token(request: Request) -> Optional[str]:
+    """Token do cabeçalho 'Authorization: Bearer <token>' (None se ausente)."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token.strip()
+
+
+def current_user(signer: TokenSigner, org: OrgIndex):
+    """
+    Dependência FastAPI que identifica quem fez a requisição, sem consultar o banco.
+
+    O token (emitido no /login) prova a identidade; cargo, empresa, departamento
+    e time vêm do índice da hierarquia em memória, de modo que uma mudança de
+    cargo ou de time vale na hora, sem esperar o token expirar. Responde 401 se
+    o token falta, é inválido/expirado ou a pessoa foi removida.
+
+        @app.get("/me")
+        async def me(user: dict = Depends(current_user(TOKENS, DB.org))): ...
+    """
+    def dependency(request: Request) -> dict:
+        claims = signer.verify(bearer_token(request))
+        if claims is None or not org.exists("person", claims["id"]):
+            raise HTTPException(
+                status_code=401,
+                detail="Token ausente, inválido ou expirado",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        person_id = claims["id"]
+        user = {name: org.get("person", person_id, name) for name in CLAIMS if name != "id"}
+        user["id"] = person_id
+        user["exp"] = claims["exp"]
+        return user
+
+    return dependency
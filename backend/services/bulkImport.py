@@ -0,0 +1,259 @@
+"""
+Importação em lote de entidades de organização (company, department, team, person).
+
+Lê CSV (uma entidade por linha, tipo informado em 'entity_type') ou NDJSON
+(um objeto por linha: os campos da entidade, ou {"type": ..., "data": {...}}
+no mesmo formato do export de /export/company/{id}). Cada registro é validado
+com os BaseModels da API e as entidades válidas são inseridas em blocos de
+'chunk_size' linhas, cada bloco em uma transação com Database.addItems.
+
+Um export pode ser reimportado em um banco vazio:
+  - só as entidades de organização são importadas (rpe, kpi, reading... são
+    contados como ignorados);
+  - o export não leva senhas: pessoas sem 'password' são criadas sem senha e
+    só conseguem entrar depois que uma for definida (as senhas informadas são
+    gravadas com hash, calculado por bloco no pool de processos de senhas);
+  - diretores, gerentes e responsáveis (directorID, managerID, responsibleIds)
+    costumam aparecer antes das pessoas a que se referem: são gravados no
+    final, depois de todas as entidades (Database.addReferences).
+
+Uso (a partir de backend/):
+    python -m services.bulkImport pessoas.csv --type person --db database.db
+    python -m services.bulkImport export.ndjson --format ndjson
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import sys
+from typing import Iterable, Iterator, Optional
+
+from pydantic import ValidationError, field_validator
+
+from config.logger import setup_logging
+from model.database.database import Database
+from model.security.passwords import PasswordHasher, hashPassword, isHashed
+from model.entities.company import Company
+from model.entities.department import Department
+from model.entities.person import Person
+from model.entities.team import Team
+
+from .BaseModels.CompanyCreate import CompanyCreate
+from .BaseModels.DepartmentCreate import DepartmentCreate
+from .BaseModels.TeamCreate import TeamCreate
+from .BaseModels.UserCreate import UserCreate
+
+logger = logging.getLogger(__name__)
+
+# Linhas validadas por transação
+CHUNK_SIZE = 5000
+# Máximo de erros detalhados no relatório (o total é sempre contado)
+MAX_REPORTED_ERRORS = 1000
+FORMATS = ("csv", "ndjson")
+
+
+# Modelos de importação: os mesmos campos da API, mais o id opcional
+# (para preservar ids de outro sistema) e as referências que podem
+# ser preenchidas depois (diretor / gerente ainda não importados).
+class CompanyImport(CompanyCreate):
+    id: Optional[str] = None
+
+
+class DepartmentImport(DepartmentCreate):
+    id: Optional[str] = None
+    directorID: Optional[str] = None
+
+
+class TeamImport(TeamCreate):
+    id: Optional[str] = None
+    managerID: Optional[str] = None
+
+
+class UserImport(UserCreate):
+    id: Optional[str] = None
+    role: str = "Employee"
+    # Ausente no export: a pessoa é criada sem senha (não entra até definir uma)
+    password: Optional[str] = None
+    # Pessoas pelas quais esta é responsável (no CSV, ids separados por vírgula)
+    responsibleIds: Optional[list[str]] = None
+
+    @field_validator("responsibleIds", mode="before")
+    @classmethod
+    def split_ids(cls, value):
+        if isinstance(value, str):
+            return [part.strip() for part in value.split(",") if part.strip()]
+        return value
+
+
+# tipo → (modelo, construtor da entidade sem as referências adiadas,
+#         referências adiadas [(tipo da referência, id alvo), ...])
+IMPORT_TYPES = {
+    "company": (CompanyImport, lambda m: Company(m.name, m.cnpj, id=m.id),
+                lambda m: []),
+    "department": (DepartmentImport, lambda m: Department(m.name, None, m.companyID, id=m.id),
+                   lambda m: [("director", m.directorID)] if m.directorID else []),
+    "team": (TeamImport, lambda m: Team(m.name, None, m.departmentID, id=m.id),
+             lambda m: [("manager", m.managerID)] if m.managerID else []),
+    "person": (UserImport, lambda m: Person(m.name, m.cpf, m.companyID, m.departmentID, m.role,
+                                            m.teamID, m.email, m.password, id=m.id),
+               lambda m: [("responsible", target) for target in m.responsibleIds or ()]),
+}
+
+
+def read_records(lines: Iterable[str], fmt: str, entity_type: Optional[str]) -> Iterator[tuple[int, str, dict]]:
+    """Gera (número da linha, tipo, campos) para cada registro do arquivo."""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            # Células vazias viram None (campos opcionais)
+            yield reader.line_num, entity_type, {k: (v if v != "" else None) for k, v in record.items()}
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, {"_error": f"JSON inválido: {e}"}
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, {"_error": "Cada linha deve ser um objeto JSON"}
+        elif "type" in record and isinstance(record.get("data"), dict):
+            yield line_number, record["type"], record["data"]
+        else:
+            yield line_number, entity_type, record
+
+
+def hash_passwords(records: list, hasher: Optional[PasswordHasher] = None) -> None:
+    """
+    Troca as senhas em texto puro dos registros de pessoa pelo hash, em lote:
+    pelo pool de processos de 'hasher' ou, sem ele, uma a uma nesta thread.
+    """
+    pending = [record for record in records
+               if isinstance(record, UserImport) and record.password and not isHashed(record.password)]
+    if not pending:
+        return
+    passwords = [record.password for record in pending]
+    hashes = hasher.hashMany(passwords) if hasher else [hashPassword(password) for password in passwords]
+    for record, password_hash in zip(pending, hashes):
+        record.password = password_hash
+
+
+def import_records(db: Database, lines: Iterable[str], fmt: str = "csv",
+                   entity_type: Optional[str] = None, chunk_size: int = CHUNK_SIZE,
+                   hasher: Optional[PasswordHasher] = None) -> dict:
+    """
+    Valida e insere os registros de 'lines'. Tipos fora de IMPORT_TYPES
+    (ex.: linhas de rpe/kpi de um export) são contados como ignorados.
+    As referências adiadas (diretor, gerente, responsáveis) são gravadas no
+    final; se uma falhar, a entidade continua inserida sem ela, e a linha
+    passa a contar como erro.
+    As senhas são gravadas com hash (ver hash_passwords); 'hasher' é o pool
+    de processos a usar (o do servidor, na API).
+    Retorna {"imported", "failed", "skipped", "errors": [{"line", "error"}, ...]}.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconhecido: {fmt}")
+    if fmt == "csv" and entity_type not in IMPORT_TYPES:
+        raise ValueError(f"CSV exige o tipo da entidade: {', '.join(IMPORT_TYPES)}")
+
+    report = {"imported": 0, "failed": 0, "skipped": 0, "errors": []}
+
+    def fail(line_number: int, error: str):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line_number, "error": error})
+
+    references = []  # [(linha, (tipo, id da entidade, id alvo))], das entidades inseridas
+
+    def flush(chunk: list):
+        hash_passwords([record for _, _, record in chunk], hasher)
+        built = []
+        for line_number, record_type, record in chunk:
+            _, build, deferred = IMPORT_TYPES[record_type]
+            try:
+                built.append((line_number, build(record), deferred(record)))
+            except (TypeError, ValueError) as e:
+                fail(line_number, str(e))
+        errors = db.addItems([item for _, item, _ in built])
+        for (line_number, item, links), error in zip(built, errors):
+            if error:
+                fail(line_number, error)
+            else:
+                report["imported"] += 1
+                references.extend((line_number, (kind, item.id, target)) for kind, target in links)
+
+    chunk = []
+    for line_number, record_type, fields in read_records(lines, fmt, entity_type):
+        if "_error" in fields:
+            fail(line_number, fields["_error"])
+            continue
+        if record_type not in IMPORT_TYPES:
+            report["skipped"] += 1
+            continue
+
+        model = IMPORT_TYPES[record_type][0]
+        try:
+            record = model(**fields)
+        except (ValidationError, TypeError, ValueError) as e:
+            fail(line_number, str(e))
+            continue
+
+        # As entidades são montadas no flush, depois do hash das senhas do bloco
+        chunk.append((line_number, record_type, record))
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+
+    # Referências por último: a pessoa referenciada pode estar em qualquer bloco
+    failedLines = set()
+    for start in range(0, len(references), chunk_size):
+        batch = references[start:start + chunk_size]
+        for (line_number, (kind, _, target)), error in zip(batch, db.addReferences([ref for _, ref in batch])):
+            if error and line_number not in failedLines:
+                failedLines.add(line_number)
+                report["imported"] -= 1
+                fail(line_number, f"{kind} {target} não gravado (a entidade foi inserida sem ele): {error}")
+
+    logger.info("Importação concluída: %s inseridos, %s com erro, %s ignorados.",
+                report["imported"], report["failed"], report["skipped"])
+    return report
+
+
+def open_text(binary) -> io.TextIOWrapper:
+    """Abre um arquivo binário como texto UTF-8 (aceita BOM do Excel)."""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Importa entidades de organização de um CSV/NDJSON.")
+    parser.add_argument("path", help="arquivo a importar")
+    parser.add_argument("--format", choices=FORMATS, help="padrão: pela extensão do arquivo")
+    parser.add_argument("--type", choices=list(IMPORT_TYPES), help="tipo das entidades (obrigatório para CSV)")
+    parser.add_argument("--db", default="database.db", help="arquivo SQLite de destino")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    setup_logging("INFO")
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    db = Database(args.db)
+    hasher = PasswordHasher(os.cpu_count() or 1)
+    try:
+        with open(args.path, "rb") as binary:
+            report = import_records(db, open_text(binary), fmt, args.type, args.chunk_size, hasher)
+    finally:
+        hasher.shutdown()
+        db.close()
+
+    for error in report["errors"]:
+        print(f"[ERRO] linha {error['line']}: {error['error']}")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
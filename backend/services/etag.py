@@ -0,0 +1,35 @@
+from fastapi import HTTPException, Request, Response
+
+from model.database.changeTracker import ChangeTracker
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Compara o cabeçalho If-None-Match (lista de ETags ou '*') com a ETag atual."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match usa comparação fraca: W/"x" equivale a "x"
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
+
+
+def conditional_get(tracker: ChangeTracker, *tables: str):
+    """
+    Dependência FastAPI para GETs condicionais.
+
+    Calcula a ETag a partir das versões de alteração das tabelas lidas pelo
+    endpoint (uma consulta por chave primária em change_version). Se o cliente
+    já tem essa versão (If-None-Match), responde 304 antes de o endpoint rodar;
+    senão, anexa a ETag à resposta.
+
+        @app.get("/getAllTeams", dependencies=[Depends(conditional_get(DB.changes, "team", "person"))])
+    """
+    def dependency(request: Request, response: Response):
+        # A ETag é calculada antes da consulta: uma escrita concorrente gera,
+        # no pior caso, uma revalidação a mais (nunca um 304 com dados velhos).
+        etag = tracker.etag(*tables)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+
+    return dependency
@@ -0,0 +1,69 @@
+import time
+
+from fastapi import Response
+
+from model.monitoring.metrics import CONTENT_TYPE, MetricsRegistry
+
+# Rótulo das requisições que não casaram com nenhuma rota (evita um rótulo por URL)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede cada requisição HTTP: histograma de duração por
+    rota e método, e contagem de respostas por status.
+
+    A rota é o template do FastAPI ("/team/{id}"), lido de scope["route"]
+    depois do roteamento, para que a cardinalidade não cresça com os ids.
+    Sem a sobrecarga do BaseHTTPMiddleware (nada de corpo em memória).
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.seconds = registry.histogram(
+            "http_request_duration_seconds", "Duração das requisições HTTP", ("method", "route"))
+        self.responses = registry.counter(
+            "http_requests_total", "Requisições HTTP por status", ("method", "route", "status"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # se a aplicação falhar antes de responder
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", UNMATCHED_ROUTE)
+            self.seconds.labels(scope["method"], path).observe(time.perf_counter() - started)
+            self.responses.labels(scope["method"], path, status).inc()
+
+
+def register_database(registry: MetricsRegistry, db) -> None:
+    """Métricas lidas do Database só na coleta (cache de entidades, pool, hierarquia)."""
+    registry.callback("db_entity_cache_hits_total", "counter", "Acertos do cache de entidades",
+                      lambda: db.getCacheStats()["hits"])
+    registry.callback("db_entity_cache_misses_total", "counter", "Falhas do cache de entidades",
+                      lambda: db.getCacheStats()["misses"])
+    registry.callback("db_entity_cache_evictions_total", "counter", "Entidades removidas do cache por capacidade",
+                      lambda: db.getCacheStats()["evictions"])
+    registry.callback("db_entity_cache_entries", "gauge", "Entidades no cache",
+                      lambda: db.getCacheStats()["size"])
+    registry.callback("db_pool_readers", "gauge", "Conexões de leitura do pool",
+                      lambda: db.poolSize)
+    registry.callback("db_org_index_rows", "gauge", "Linhas no índice da hierarquia em memória",
+                      lambda: db.org.stats(), ("table",))
+
+
+def metrics_response(registry: MetricsRegistry) -> Response:
+    """Resposta de GET /metrics no formato texto do Prometheus."""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
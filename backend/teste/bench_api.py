@@ -0,0 +1,267 @@
+"""
+Benchmark da API (services/api.py) em processo, sem servidor HTTP.
+
+Os requests vão direto para o app FastAPI por um httpx.ASGITransport, contra
+uma cópia de um banco já povoado (--db) ou, sem ele, contra um banco gerado
+na hora por teste/synthetic_data.py (--preset, padrão small). Cada endpoint roda com N requisições e C clientes
+concorrentes; o resultado (vazão e latências p50/p95/p99 por endpoint) é
+impresso e gravado em JSON, para comparar execuções entre commits.
+
+Uso (a partir de backend/):
+    python teste/bench_api.py
+    python teste/bench_api.py --preset medium
+    python teste/bench_api.py --db grande.db --email x@y --password z -c 32 -n 2000
+    python teste/bench_api.py --only login,data --out antes.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from synthetic_data import DEFAULT_PASSWORD, PRESETS, generate  # noqa: E402
+
+# Grupos de endpoints (--only)
+SCENARIOS = ("login", "org", "data", "writes")
+
+
+# =====================
+#   BANCO DE TESTE
+# =====================
+def copy_database(source: str, directory: str) -> str:
+    """Copia o banco (e o WAL, se houver) para não alterar o original com as escritas."""
+    target = os.path.join(directory, "bench.db")
+    shutil.copyfile(source, target)
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(source + suffix):
+            shutil.copyfile(source + suffix, target + suffix)
+    return target
+
+
+def sample_ids(path: str, rng: random.Random, size: int = 200) -> dict:
+    """Ids sorteados de cada tabela, para variar os alvos das requisições."""
+    queries = {
+        "company": "SELECT id FROM company",
+        "department": "SELECT id FROM department",
+        "team": "SELECT id FROM team",
+        "kpi": "SELECT id FROM kpi WHERE goal IS NULL",
+        "kr": "SELECT id FROM kpi WHERE goal IS NOT NULL",
+    }
+    conn = sqlite3.connect(path)
+    try:
+        ids = {}
+        for table, query in queries.items():
+            rows = [row[0] for row in conn.execute(query)]
+            ids[table] = rng.sample(rows, min(size, len(rows)))
+        ids["counts"] = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                         for table in ("company", "department", "team", "person", "rpe", "objective", "kpi", "kpi_reading")}
+        return ids
+    finally:
+        conn.close()
+
+
+# =====================
+#     ENDPOINTS
+# =====================
+def build_endpoints(ids: dict, rng: random.Random, email: str, password: str, token_box: dict) -> dict:
+    """{cenário: [(nome, função que devolve (método, url, corpo, cabeçalhos))]}"""
+    def pick(table):
+        return rng.choice(ids[table])
+
+    def auth():
+        return {"Authorization": f"Bearer {token_box['token']}"}
+
+    def readings_batch():
+        return [{"measure_id": pick("kpi"), "value": rng.uniform(0, 100)} for _ in range(50)]
+
+    return {
+        "login": [
+            ("POST /login", lambda: ("POST", "/login", {"email": email, "password": password}, None)),
+            ("GET /me", lambda: ("GET", "/me", None, auth())),
+        ],
+        "org": [
+            ("GET /company_departments/{id}", lambda: ("GET", f"/company_departments/{pick('company')}", None, None)),
+            ("GET /department_teams/{id}", lambda: ("GET", f"/department_teams/{pick('department')}", None, None)),
+            ("GET /department_users/{id}", lambda: ("GET", f"/department_users/{pick('department')}", None, None)),
+            ("GET /team_users/{id}", lambda: ("GET", f"/team_users/{pick('team')}", None, None)),
+            ("GET /hierarchy/company/{id}", lambda: ("GET", f"/hierarchy/company/{pick('company')}", None, None)),
+            ("GET /getAllTeams?limit=100", lambda: ("GET", "/getAllTeams?limit=100", None, None)),
+        ],
+        "data": [
+            (f"GET /data/{group}/{{id}}/{data_type}",
+             (lambda group=group, data_type=data_type:
+              ("GET", f"/data/{group}/{pick(group)}/{data_type}", None, None)))
+            for group in ("company", "department", "team")
+            for data_type in ("rpe", "objective", "kpi", "kr")
+        ] + [
+            ("GET /kpi/{id}/series", lambda: ("GET", f"/kpi/{pick('kpi')}/series?bucket=1d", None, None)),
+            ("GET /rollup/company/{id}", lambda: ("GET", f"/rollup/company/{pick('company')}", None, None)),
+        ],
+        "writes": [
+            ("PUT /kr_data/{id}", lambda: ("PUT", f"/kr_data/{pick('kr')}", {"data": rng.uniform(0, 100)}, None)),
+            ("POST /measures/readings (50)", lambda: ("POST", "/measures/readings", readings_batch(), None)),
+        ],
+    }
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    """Percentil por posição mais próxima (lista já ordenada)."""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+async def run_endpoint(client, build, total: int, concurrency: int, warmup: int) -> dict:
+    """Dispara 'total' requisições com 'concurrency' clientes e mede cada uma."""
+    async def send():
+        method, url, body, headers = build()
+        started = time.perf_counter()
+        response = await client.request(method, url, json=body, headers=headers)
+        return time.perf_counter() - started, response.status_code
+
+    for _ in range(warmup):
+        await send()
+
+    latencies, statuses = [], {}
+    remaining = iter(range(total))  # compartilhado pelos clientes (um só event loop)
+
+    async def worker():
+        for _ in remaining:
+            elapsed, status = await send()
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if status >= 400)
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "seconds": round(seconds, 4),
+        "throughput": round(total / seconds, 2) if seconds else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+async def run_benchmark(args, ids: dict, rng: random.Random) -> dict:
+    import httpx
+    from services import api
+
+    token_box = {}
+    transport = httpx.ASGITransport(app=api.app)
+    # O ASGITransport não roda o lifespan do app: entra nele aqui, para que o banco
+    # (conexões, executor, threads) e o pool de senhas sejam fechados no final,
+    # antes de o diretório temporário com o banco ser apagado
+    async with api.app.router.lifespan_context(api.app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        response = await client.post("/login", json={"email": args.email, "password": args.password})
+        token_box["token"] = response.json().get("token")
+        if not token_box["token"]:
+            print(f"❌ Login de {args.email} falhou: os cenários autenticados vão responder 401")
+
+        endpoints = build_endpoints(ids, rng, args.email, args.password, token_box)
+        results = {}
+        for scenario in args.only:
+            for name, build in endpoints[scenario]:
+                total = args.login_requests if name == "POST /login" else args.requests
+                result = await run_endpoint(client, build, total, args.concurrency, args.warmup)
+                results[name] = result
+                print(f"{name:<40} {result['throughput']:>9.1f} req/s   p50 {result['p50_ms']:>8.2f} ms"
+                      f"   p95 {result['p95_ms']:>8.2f} ms   p99 {result['p99_ms']:>8.2f} ms"
+                      f"   erros {result['errors']}")
+    return results
+
+
+def git_revision() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BACKEND_DIR,
+                                    capture_output=True, text=True).stdout.strip())
+        return {"commit": commit or None, "dirty": dirty}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark em processo da API (httpx + ASGITransport).")
+    parser.add_argument("--db", help="banco já povoado (é copiado; sem ele, um banco sintético é gerado)")
+    parser.add_argument("--preset", choices=list(PRESETS), default="small", help="tamanho do banco gerado")
+    parser.add_argument("--email", help="usuário para /login e /me (padrão no banco gerado: o do gerador)")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="clientes simultâneos")
+    parser.add_argument("-n", "--requests", type=int, default=500, help="requisições medidas por endpoint")
+    parser.add_argument("--login-requests", type=int, default=100, help="requisições de POST /login (scrypt)")
+    parser.add_argument("--warmup", type=int, default=10, help="requisições descartadas antes de medir")
+    parser.add_argument("--only", default=",".join(SCENARIOS), help=f"cenários: {', '.join(SCENARIOS)}")
+    parser.add_argument("--seed", type=int, default=42, help="semente dos sorteios (e do banco gerado)")
+    parser.add_argument("--out", default="bench_results.json", help="arquivo JSON de saída")
+    args = parser.parse_args(argv)
+    args.only = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(args.only) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"cenários desconhecidos: {', '.join(sorted(unknown))}")
+    if args.db and not args.email:
+        parser.error("--email é obrigatório com --db")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="bench_api_") as directory:
+        if args.db:
+            path = copy_database(args.db, directory)
+        else:
+            path = os.path.join(directory, "bench.db")
+            print(f"🔧 Gerando banco de teste (preset {args.preset})...")
+            summary = generate(path, args.preset, args.seed, args.password, log=lambda message: None)
+            args.email = args.email or summary["login"]["email"]
+        ids = sample_ids(path, rng)
+
+        # Configuração lida por config.settings na importação de services.api
+        os.environ["DATABASE_PATH"] = path
+        os.environ.setdefault("TOKEN_SECRET", "bench")
+
+        print(f"📊 {args.requests} requisições por endpoint, {args.concurrency} clientes\n")
+        started_at = datetime.now(timezone.utc).isoformat()
+        results = asyncio.run(run_benchmark(args, ids, rng))
+
+    report = {
+        **git_revision(),
+        "startedAt": started_at,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key != "password"},
+        "dataset": ids["counts"],
+        "endpoints": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as out:
+        json.dump(report, out, indent=2, ensure_ascii=False)
+    print(f"\n✅ Resultados gravados em {args.out}")
+    return 1 if any(result["errors"] for result in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Fixtures dos testes automatizados (pytest, a partir de backend/):
+
+    python -m pytest -q teste
+
+Cada teste recebe um banco SQLite novo em um diretório temporário.
+"""
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from model.database.database import Database  # noqa: E402
+from model.entities.company import Company  # noqa: E402
+from model.entities.department import Department  # noqa: E402
+from model.entities.kr import KR  # noqa: E402
+from model.entities.objective import Objective  # noqa: E402
+from model.entities.person import Person  # noqa: E402
+from model.entities.rpe import RPE  # noqa: E402
+from model.entities.team import Team  # noqa: E402
+
+# Roteiro manual contra um servidor rodando (não é um teste do pytest)
+collect_ignore = ["test_api.py"]
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    return str(tmp_path / "teste.db")
+
+
+@pytest.fixture
+def db(db_path):
+    database = Database(db_path, pool_size=2)
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def org(db) -> dict:
+    """Empresa → departamento → time → pessoa, com um RPE do time, um objetivo e um KR (meta 100)."""
+    company = Company("Empresa", "00000000000100")
+    assert db.addItem(company) == 0
+    department = Department("Departamento", companyID=company.id)
+    assert db.addItem(department) == 0
+    team = Team("Time", departmentID=department.id)
+    assert db.addItem(team) == 0
+    person = Person("Pessoa", "00000000001", company.id, department.id, "Employee", team.id,
+                    "pessoa@example.com", "hash")
+    assert db.addItem(person) == 0
+
+    rpe = RPE("RPE do time", person.id, "2025-01-01")
+    assert db.addItem(rpe) == 0
+    assert db.addRpeToTeam(team.id, rpe.id)
+    objective = Objective("Objetivo", person.id, "2025-01-01", rpe.id)
+    assert db.addItem(objective) == 0
+    kr = KR("KR", person.id, "2025-01-01", objective.id, goal=100.0)
+    assert db.addItem(kr) == 0
+    return {"company": company, "department": department, "team": team, "person": person,
+            "rpe": rpe, "objective": objective, "kr": kr}
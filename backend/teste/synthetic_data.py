@@ -0,0 +1,268 @@
+"""
+Gerador determinístico de bancos sintéticos (organização + OKRs) para testes de carga.
+
+Cria o schema pelas migrações do Database e insere tudo direto no SQLite com
+executemany, em uma transação por tabela, sem os índices secundários (que
+são recriados por ensureIndexes no final). A mesma semente e o mesmo preset
+geram sempre o mesmo banco (ids inclusive).
+
+Para cada empresa → departamentos → times → pessoas:
+  - cada time tem um gerente (Manager) e cada departamento um diretor
+    (Director, também em company_directors);
+  - gerentes e diretores ficam responsáveis (person_responsibles) pelas
+    pessoas abaixo deles;
+  - cada grupo tem RPEs (company_rpes / department_rpes / team_rpes), cada RPE
+    tem objetivos e cada objetivo tem KPIs e KRs com um histórico de leituras
+    diárias em kpi_reading.
+
+Todas as pessoas usam a mesma senha (um único hash scrypt).
+
+Uso (a partir de backend/):
+    python teste/synthetic_data.py carga.db --preset medium
+    python teste/synthetic_data.py carga.db --preset small --seed 7 --readings 500 --force
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from model.database.database import Database  # noqa: E402
+from model.database.indexes import ensureIndexes  # noqa: E402
+from model.security.passwords import hashPassword  # noqa: E402
+
+DEFAULT_PASSWORD = "senha123"
+
+# Tamanhos por nível: empresas, departamentos por empresa, times por departamento,
+# pessoas por time, RPEs por grupo, objetivos por RPE, KPIs e KRs por objetivo,
+# leituras por KPI/KR
+PRESETS = {
+    # ~1 mil pessoas, ~20 mil leituras
+    "small": dict(companies=2, departments=4, teams=4, persons=10, rpes=1, objectives=2,
+                  kpis=2, krs=2, readings=50),
+    # ~11 mil pessoas, ~1 milhão de leituras
+    "medium": dict(companies=20, departments=8, teams=6, persons=12, rpes=1, objectives=2,
+                   kpis=2, krs=2, readings=110),
+    # ~120 mil pessoas, ~10 milhões de leituras
+    "huge": dict(companies=100, departments=10, teams=8, persons=15, rpes=1, objectives=2,
+                 kpis=2, krs=2, readings=140),
+}
+
+# Data da última leitura (fixa, para o banco não depender do dia em que foi gerado)
+LAST_READING = datetime(2025, 6, 30, tzinfo=timezone.utc)
+READING_INTERVAL = timedelta(days=1)
+
+# Linhas por chamada de executemany
+CHUNK_SIZE = 50000
+
+
+class Generator:
+    """Gera as linhas de cada tabela a partir de uma semente."""
+
+    def __init__(self, seed: int, sizes: dict, password_hash: str):
+        self.rng = random.Random(seed)
+        self.sizes = sizes
+        self.password = password_hash
+        self.rows = {table: [] for table in (
+            "company", "department", "team", "person", "person_responsibles", "company_directors",
+            "rpe", "objective", "kpi", "company_rpes", "department_rpes", "team_rpes",
+        )}
+        self.measures = []  # (id, meta); meta None = KPI
+        self.login = None
+
+    def newId(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def date(self) -> str:
+        return (LAST_READING - timedelta(days=self.rng.randrange(365))).date().isoformat()
+
+    def person(self, company_id: str, department_id: str, team_id, role: str) -> str:
+        n = len(self.rows["person"])
+        person_id = self.newId()
+        email = f"pessoa{n}@example.com"
+        self.rows["person"].append((person_id, f"Pessoa {n}", f"{n:011d}", company_id, department_id,
+                                    team_id, role, email, self.password))
+        if self.login is None and role == "Employee":
+            self.login = email
+        return person_id
+
+    def organization(self) -> None:
+        s = self.sizes
+        for c in range(s["companies"]):
+            company_id = self.newId()
+            self.rows["company"].append((company_id, f"Empresa {c}", f"{c:014d}"))
+            self.okr("company_rpes", company_id)
+
+            for d in range(s["departments"]):
+                department_id = self.newId()
+                director_id = self.person(company_id, department_id, None, "Director")
+                self.rows["department"].append((department_id, f"Departamento {c}.{d}", company_id, director_id))
+                self.rows["company_directors"].append((company_id, director_id))
+                self.okr("department_rpes", department_id, director_id)
+
+                for t in range(s["teams"]):
+                    team_id = self.newId()
+                    manager_id = self.person(company_id, department_id, team_id, "Manager")
+                    self.rows["team"].append((team_id, f"Time {c}.{d}.{t}", department_id, manager_id))
+                    self.rows["person_responsibles"].append((director_id, manager_id))
+                    for _ in range(s["persons"] - 1):
+                        member_id = self.person(company_id, department_id, team_id, "Employee")
+                        self.rows["person_responsibles"].append((manager_id, member_id))
+                    self.okr("team_rpes", team_id, manager_id)
+
+    def okr(self, relation: str, group_id: str, responsible_id: str = None) -> None:
+        s = self.sizes
+        for r in range(s["rpes"]):
+            rpe_id = self.newId()
+            self.rows["rpe"].append((rpe_id, f"RPE {r} de {group_id[:8]}", responsible_id, self.date()))
+            self.rows[relation].append((group_id, rpe_id))
+            for o in range(s["objectives"]):
+                objective_id = self.newId()
+                self.rows["objective"].append((objective_id, f"Objetivo {o} do RPE {rpe_id[:8]}",
+                                               responsible_id, rpe_id, self.date()))
+                for k in range(s["kpis"] + s["krs"]):
+                    measure_id = self.newId()
+                    is_kr = k >= s["kpis"]
+                    goal = float(self.rng.choice((50, 100, 200, 1000))) if is_kr else None
+                    kind = "KR" if is_kr else "KPI"
+                    self.rows["kpi"].append((measure_id, f"{kind} {k} do objetivo {objective_id[:8]}",
+                                             responsible_id, objective_id, self.date(), None, goal))
+                    self.measures.append((measure_id, goal))
+
+    def readings(self):
+        """Leituras diárias de cada KPI/KR: um passeio aleatório terminando em LAST_READING."""
+        count = self.sizes["readings"]
+        last = LAST_READING.timestamp()
+        step = READING_INTERVAL.total_seconds()
+        rng = self.rng
+        for measure_id, goal in self.measures:
+            scale = goal or 100.0
+            value = rng.uniform(0, scale * 0.5)
+            for i in range(count):
+                value = max(0.0, value + rng.gauss(scale * 0.005, scale * 0.02))
+                yield (measure_id, last - (count - 1 - i) * step, round(value, 4))
+
+
+INSERTS = {
+    "company": "INSERT INTO company (id, name, cnpj) VALUES (?, ?, ?)",
+    "person": """INSERT INTO person (id, name, cpf, companyID, departmentID, teamID, role, email, password)
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+    "department": "INSERT INTO department (id, name, companyID, directorID) VALUES (?, ?, ?, ?)",
+    "team": "INSERT INTO team (id, name, departmentID, managerID) VALUES (?, ?, ?, ?)",
+    "person_responsibles": "INSERT INTO person_responsibles (personID, responsibleID) VALUES (?, ?)",
+    "company_directors": "INSERT INTO company_directors (companyID, personID) VALUES (?, ?)",
+    "rpe": "INSERT INTO rpe (id, description, responsibleID, date) VALUES (?, ?, ?, ?)",
+    "objective": "INSERT INTO objective (id, description, responsibleID, rpeID, date) VALUES (?, ?, ?, ?, ?)",
+    "kpi": "INSERT INTO kpi (id, description, responsibleID, objectiveID, date, data, goal) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "company_rpes": "INSERT INTO company_rpes (companyID, rpeID) VALUES (?, ?)",
+    "department_rpes": "INSERT INTO department_rpes (departmentID, rpeID) VALUES (?, ?)",
+    "team_rpes": "INSERT INTO team_rpes (teamID, rpeID) VALUES (?, ?)",
+    "kpi_reading": "INSERT INTO kpi_reading (kpiID, timestamp, value) VALUES (?, ?, ?)",
+}
+
+
+def _chunks(rows, size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate(path: str, preset: str = "small", seed: int = 42, password: str = DEFAULT_PASSWORD,
+             overrides: dict = None, log=print) -> dict:
+    """
+    Cria o banco 'path' (que não pode existir) e devolve um resumo:
+    {"counts": {tabela: linhas}, "seconds": ..., "login": {"email", "password"}}.
+    """
+    if os.path.exists(path):
+        raise FileExistsError(path)
+    sizes = {**PRESETS[preset], **(overrides or {})}
+    started = time.perf_counter()
+
+    # Schema pelas migrações (mesmo caminho do servidor)
+    Database(path, pool_size=0).close()
+
+    generator = Generator(seed, sizes, hashPassword(password))
+    generator.organization()
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        # Carga única de um arquivo novo: sem fsync e sem os índices durante as inserções
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA cache_size = -262144")
+        conn.execute("PRAGMA foreign_keys = OFF")
+        ensureIndexes(conn, {})
+
+        counts = {}
+        tables = [table for table in INSERTS if table != "kpi_reading"]
+        sources = [(table, generator.rows[table]) for table in tables] + [("kpi_reading", generator.readings())]
+        for table, rows in sources:
+            inserted = 0
+            conn.execute("BEGIN")
+            for chunk in _chunks(rows, CHUNK_SIZE):
+                conn.executemany(INSERTS[table], chunk)
+                inserted += len(chunk)
+            conn.execute("COMMIT")
+            counts[table] = inserted
+            log(f"   {table:<20} {inserted:>10} linhas   ({time.perf_counter() - started:6.1f} s)")
+
+        log("   índices...")
+        conn.execute("BEGIN")
+        ensureIndexes(conn)
+        conn.execute("COMMIT")
+
+        violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+        if violations:
+            raise RuntimeError(f"{len(violations)} violações de chave estrangeira no banco gerado")
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    return {
+        "preset": preset,
+        "seed": seed,
+        "sizes": sizes,
+        "counts": counts,
+        "seconds": round(time.perf_counter() - started, 2),
+        "login": {"email": generator.login, "password": password},
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Gera um banco sintético (organização + OKRs) para testes de carga.")
+    parser.add_argument("path", help="arquivo SQLite a criar")
+    parser.add_argument("--preset", choices=list(PRESETS), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="senha de todas as pessoas")
+    parser.add_argument("--force", action="store_true", help="sobrescreve o arquivo se já existir")
+    for name in PRESETS["small"]:
+        parser.add_argument(f"--{name}", type=int, help=f"sobrescreve '{name}' do preset")
+    args = parser.parse_args(argv)
+
+    if args.force:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.path + suffix):
+                os.remove(args.path + suffix)
+    elif os.path.exists(args.path):
+        parser.error(f"{args.path} já existe (use --force para sobrescrever)")
+
+    overrides = {name: getattr(args, name) for name in PRESETS["small"] if getattr(args, name) is not None}
+    print(f"🔧 Gerando '{args.path}' (preset {args.preset}, semente {args.seed})")
+    summary = generate(args.path, args.preset, args.seed, args.password, overrides)
+    print(f"\n✅ {sum(summary['counts'].values())} linhas em {summary['seconds']} s")
+    print(f"   login: {summary['login']['email']} / {summary['login']['password']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Importação em lote (services/bulkImport.py)."""
+import json
+
+from model.database.database import Database
+from model.entities.person import Person
+from model.security.passwords import PasswordHasher, isHashed, verifyPassword
+from services import bulkImport
+
+COMPANY_ID = "c0000000-0000-0000-0000-000000000001"
+
+
+def company_line() -> str:
+    return json.dumps({"type": "company", "data": {"id": COMPANY_ID, "name": "Empresa", "cnpj": "00000000000100"}})
+
+
+def person_csv(rows: list[tuple[str, str, str]]) -> list[str]:
+    lines = ["name,cpf,companyID,email,password\n"]
+    lines += [f"{name},{cpf},{COMPANY_ID},{email},segredo\n" for name, cpf, email in rows]
+    return lines
+
+
+def test_read_records_csv_and_ndjson():
+    csv_records = list(bulkImport.read_records(
+        ["name,cpf,companyID,teamID\n", "Ana,1,c1,\n", "Bia,2,c1,t1\n"], "csv", "person"
+    ))
+    assert csv_records == [
+        (2, "person", {"name": "Ana", "cpf": "1", "companyID": "c1", "teamID": None}),
+        (3, "person", {"name": "Bia", "cpf": "2", "companyID": "c1", "teamID": "t1"}),
+    ]
+
+    ndjson_records = list(bulkImport.read_records([
+        '{"type": "team", "data": {"name": "Time"}}\n',
+        "\n",
+        '{"name": "Solto"}\n',
+        "{quebrado\n",
+        "[1, 2]\n",
+    ], "ndjson", "company"))
+    assert ndjson_records[0] == (1, "team", {"name": "Time"})
+    assert ndjson_records[1] == (3, "company", {"name": "Solto"})
+    assert ndjson_records[2][0] == 4 and ndjson_records[2][2]["_error"].startswith("JSON inválido")
+    assert ndjson_records[3] == (5, None, {"_error": "Cada linha deve ser um objeto JSON"})
+
+
+def test_import_valid_chunk(db):
+    assert bulkImport.import_records(db, [company_line()], "ndjson")["imported"] == 1
+    report = bulkImport.import_records(db, person_csv([
+        ("Ana", "00000000001", "ana@example.com"),
+        ("Bia", "00000000002", "bia@example.com"),
+        ("Caio", "00000000003", "caio@example.com"),
+    ]), "csv", "person", chunk_size=10)
+
+    assert report == {"imported": 3, "failed": 0, "skipped": 0, "errors": []}
+    assert {p.email for p in db.getPersonsByCompanyID(COMPANY_ID)} == {
+        "ana@example.com", "bia@example.com", "caio@example.com"}
+    assert len(db.org.personsUnder("Company", COMPANY_ID)) == 3
+
+
+def test_imported_passwords_are_hashed(db):
+    bulkImport.import_records(db, [company_line()], "ndjson")
+    hasher = PasswordHasher(2)
+    try:
+        bulkImport.import_records(db, person_csv([
+            ("Ana", "00000000001", "ana@example.com"),
+            ("Bia", "00000000002", "bia@example.com"),
+            ("Caio", "00000000003", "caio@example.com"),
+        ]), "csv", "person", chunk_size=2, hasher=hasher)
+    finally:
+        hasher.shutdown()
+    # Sem pool, o hash é feito na própria thread
+    bulkImport.import_records(db, person_csv([("Davi", "00000000004", "davi@example.com")]), "csv", "person")
+
+    for person in db.getPersonsByCompanyID(COMPANY_ID):
+        assert isHashed(person.password)
+        assert verifyPassword("segredo", person.password)
+
+
+def test_add_items_never_stores_plaintext(db):
+    bulkImport.import_records(db, [company_line()], "ndjson")
+    person = Person("Ana", "00000000001", COMPANY_ID, email="ana@example.com", password="segredo")
+    assert db.addItems([person]) == [None]
+    stored = db.getPersonByEmail("ana@example.com").password
+    assert isHashed(stored) and verifyPassword("segredo", stored)
+
+
+def test_bad_row_does_not_abort_chunk(db):
+    bulkImport.import_records(db, [company_line()], "ndjson")
+    lines = person_csv([
+        ("Ana", "00000000001", "ana@example.com"),
+        ("Bia", "00000000001", "bia@example.com"),  # CPF repetido: UNIQUE
+        ("Caio", "00000000003", "caio@example.com"),
+    ])
+    lines.append(f"Sem email,00000000004,{COMPANY_ID},,\n")  # email vazio: validação
+
+    report = bulkImport.import_records(db, lines, "csv", "person", chunk_size=10)
+
+    assert report["imported"] == 2
+    assert report["failed"] == 2
+    assert [error["line"] for error in report["errors"]] == [5, 3]
+    assert "UNIQUE" in report["errors"][1]["error"]
+    assert {p.email for p in db.getPersonsByCompanyID(COMPANY_ID)} == {"ana@example.com", "caio@example.com"}
+
+
+def test_export_import_round_trip(db, org, tmp_path):
+    person = org["person"]
+    leader = Person("Líder", "00000000009", org["company"].id, org["department"].id, "Manager", org["team"].id,
+                    "lider@example.com", "hash")
+    assert db.addItem(leader) == 0
+    assert db.changeTeamManager(org["team"].id, leader.id) == 0
+    assert db.changeDepartmentDirector(org["department"].id, leader.id) == 0
+    assert db.addReferences([("responsible", leader.id, person.id)]) == [None]
+
+    lines = [json.dumps({"type": kind, "data": data}) + "\n"
+             for kind, data in db.exportCompany(org["company"].id, readings=True)]
+
+    target = Database(str(tmp_path / "destino.db"), pool_size=1)
+    try:
+        # Blocos pequenos: as pessoas ficam em blocos depois dos departamentos e times
+        report = bulkImport.import_records(target, lines, "ndjson", chunk_size=2)
+        assert report["failed"] == 0, report["errors"]
+        assert report["imported"] == 5  # company, department, team e 2 pessoas
+        assert report["skipped"] == 3   # rpe, objective e kr do fixture (sem leituras)
+
+        assert target.getTeamByID(org["team"].id).managerID == leader.id
+        assert target.getDepartmentByID(org["department"].id).directorID == leader.id
+        assert target.getResponsibleIDs(leader.id) == [person.id]
+        assert target.org.get("team", org["team"].id, "managerID") == leader.id
+        # Sem senha no export: a pessoa existe, mas não tem senha
+        assert target.getPersonByID(person.id).password is None
+    finally:
+        target.close()
+
+
+def test_unresolved_reference_is_reported(db):
+    lines = [
+        company_line(),
+        json.dumps({"type": "department", "data": {
+            "id": "d1", "name": "Depto", "companyID": COMPANY_ID, "directorID": "nao-existe"}}),
+    ]
+    report = bulkImport.import_records(db, lines, "ndjson")
+
+    assert report["imported"] == 1 and report["failed"] == 1
+    assert report["errors"][0]["line"] == 2
+    # O departamento fica, sem diretor
+    assert db.getDepartmentByID("d1").directorID is None
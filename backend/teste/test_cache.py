@@ -0,0 +1,45 @@
+"""Cache de entidades do Database: nenhuma leitura devolve a versão anterior a uma escrita."""
+from model.entities.company import Company
+from model.entities.person import Person
+from model.entities.team import Team
+
+
+def test_update_item_invalidates_cached_entities(db, org):
+    person, team, company = org["person"], org["team"], org["company"]
+    assert db.getPersonByID(person.id).role == "Employee"
+    assert db.getTeamByID(team.id).name == "Time"
+    assert db.getCompanyByID(company.id).name == "Empresa"
+
+    cached = db.getPersonByID(person.id)
+    cached.role = "Manager"
+    assert db.updateItem(cached) == 0
+    assert db.updateItem(Team("Time Renomeado", departmentID=org["department"].id, id=team.id)) == 0
+    assert db.updateItem(Company("Empresa Renomeada", company.cnpj, id=company.id)) == 0
+
+    assert db.getPersonByID(person.id).role == "Manager"
+    assert db.getTeamByID(team.id).name == "Time Renomeado"
+    assert db.getCompanyByID(company.id).name == "Empresa Renomeada"
+
+
+def test_relationship_changes_invalidate_cached_entities(db, org):
+    team, department = org["team"], org["department"]
+    manager = Person("Gerente", "00000000002", org["company"].id, department.id, "Manager", team.id,
+                     "gerente@example.com", "hash")
+    assert db.addItem(manager) == 0
+    assert db.getTeamByID(team.id).managerID is None
+    assert db.getDepartmentByID(department.id).directorID is None
+
+    db.changeTeamManager(team.id, manager.id)
+    db.changeDepartmentDirector(department.id, manager.id)
+    assert db.getTeamByID(team.id).managerID == manager.id
+    assert db.getDepartmentByID(department.id).directorID == manager.id
+
+    db.changeTeamManager(team.id, None)
+    assert db.getTeamByID(team.id).managerID is None
+
+
+def test_delete_invalidates_cached_entity(db, org):
+    person = org["person"]
+    assert db.getPersonByID(person.id) is not None
+    assert db.deleteItemByObject(db.getPersonByID(person.id)) == 0
+    assert db.getPersonByID(person.id) is None
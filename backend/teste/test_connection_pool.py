@@ -0,0 +1,167 @@
+"""Pool de conexões (model/database/connectionPool.py) sobre um arquivo SQLite temporário."""
+import sqlite3
+import threading
+
+import pytest
+
+from model.database.connectionPool import ConnectionPool
+
+
+@pytest.fixture
+def pool(db_path):
+    pool = ConnectionPool(db_path, pool_size=2)
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+    yield pool
+    pool.close()
+
+
+def committed_names(db_path: str) -> set:
+    """O que está no arquivo, visto por uma conexão de fora do pool."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[0] for row in conn.execute("SELECT name FROM item")}
+    finally:
+        conn.close()
+
+
+def write_concurrently(pool: ConnectionPool, threads: int, per_thread: int) -> list:
+    errors = []
+    start = threading.Barrier(threads)
+
+    def work(t: int):
+        start.wait()
+        try:
+            for i in range(per_thread):
+                with pool.writer() as conn:
+                    conn.execute("INSERT INTO item (name) VALUES (?)", (f"{t}-{i}",))
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return errors
+
+
+def test_concurrent_writers_all_commit(pool, db_path):
+    assert write_concurrently(pool, threads=8, per_thread=25) == []
+    assert committed_names(db_path) == {f"{t}-{i}" for t in range(8) for i in range(25)}
+    with pool.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM item").fetchone()[0] == 200
+
+
+def test_failed_nested_block_rolls_back_whole_transaction(pool, db_path):
+    ran = []
+    with pytest.raises(sqlite3.IntegrityError):
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO item (name) VALUES ('fora')")
+            pool.afterCommit(lambda: ran.append("commit"))
+            with pool.writer() as inner:
+                assert inner is conn
+                inner.execute("INSERT INTO item (name) VALUES ('fora')")
+
+    # O bloco aninhado faz parte da mesma transação: nada foi gravado
+    assert committed_names(db_path) == set()
+    assert ran == []
+    assert not pool.inTransaction
+
+    # O escritor continua utilizável depois do rollback
+    with pool.writer() as conn:
+        conn.execute("INSERT INTO item (name) VALUES ('depois')")
+    assert committed_names(db_path) == {"depois"}
+
+
+def test_reader_inside_writer_sees_uncommitted_rows(pool, db_path):
+    with pool.writer() as conn:
+        conn.execute("INSERT INTO item (name) VALUES ('pendente')")
+        with pool.reader() as reader:
+            assert reader.execute("SELECT name FROM item").fetchall()[0][0] == "pendente"
+        assert committed_names(db_path) == set()
+    assert committed_names(db_path) == {"pendente"}
+
+
+# --- COMMIT EM GRUPO ---
+
+@pytest.fixture
+def group_pool(pool):
+    pool.startGroupCommit(20)
+    return pool
+
+
+def test_group_commit_concurrent_writers_are_durable_on_return(group_pool, db_path):
+    assert group_pool.groupCommit
+    assert write_concurrently(group_pool, threads=8, per_thread=10) == []
+    # writer() só retorna depois do commit do lote: tudo já está no arquivo
+    assert committed_names(db_path) == {f"{t}-{i}" for t in range(8) for i in range(10)}
+
+
+def test_group_commit_failed_block_keeps_other_writes(group_pool, db_path):
+    with group_pool.writer() as conn:
+        conn.execute("INSERT INTO item (name) VALUES ('existente')")
+
+    done = threading.Event()
+    ran = []
+
+    def other():
+        with group_pool.writer() as conn:
+            conn.execute("INSERT INTO item (name) VALUES ('outro')")
+        done.set()
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    # Erro comum (abort do comando): só o savepoint deste bloco é desfeito
+    with pytest.raises(sqlite3.IntegrityError):
+        with group_pool.writer() as conn:
+            conn.execute("INSERT INTO item (name) VALUES ('meu')")
+            group_pool.afterCommit(lambda: ran.append("commit"))
+            conn.execute("INSERT INTO item (name) VALUES ('existente')")
+    thread.join()
+
+    assert done.is_set()
+    assert ran == []
+    assert committed_names(db_path) == {"existente", "outro"}
+
+
+def test_group_commit_aborted_transaction_fails_whole_batch(db_path):
+    pool = ConnectionPool(db_path, pool_size=1)
+    try:
+        with pool.writer() as conn:
+            conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+            conn.execute("INSERT INTO item (name) VALUES ('existente')")
+        # Janela longa: a escrita da outra thread fica no lote aberto
+        pool.startGroupCommit(500)
+
+        waiting = threading.Event()
+        outcome = []
+
+        def other():
+            try:
+                with pool.writer() as conn:
+                    conn.execute("INSERT INTO item (name) VALUES ('outro')")
+                    waiting.set()
+                outcome.append("ok")
+            except sqlite3.OperationalError as e:
+                outcome.append(e)
+
+        thread = threading.Thread(target=other)
+        thread.start()
+        waiting.wait()
+        # OR ROLLBACK: o SQLite desfaz a transação inteira, com o lote junto
+        with pytest.raises(sqlite3.IntegrityError):
+            with pool.writer() as conn:
+                conn.execute("INSERT OR ROLLBACK INTO item (name) VALUES ('existente')")
+        thread.join()
+
+        assert len(outcome) == 1 and isinstance(outcome[0], sqlite3.OperationalError)
+        assert "Commit em grupo falhou" in str(outcome[0])
+        assert committed_names(db_path) == {"existente"}
+
+        # O próximo lote é gravado normalmente
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO item (name) VALUES ('depois')")
+        assert committed_names(db_path) == {"existente", "depois"}
+    finally:
+        pool.close()
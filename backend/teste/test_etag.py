@@ -0,0 +1,44 @@
+"""ETags a partir das versões de alteração guardadas no banco."""
+import sqlite3
+
+from model.database.database import Database
+from model.entities.company import Company
+
+
+def test_etag_sees_writes_from_other_instances(db, db_path):
+    before = db.changes.etag("company")
+    assert db.changes.etag("company") == before
+
+    other = Database(db_path, pool_size=1)
+    try:
+        assert other.addItem(Company("Outra empresa", "00000000000200")) == 0
+    finally:
+        other.close()
+    after = db.changes.etag("company")
+    assert after != before
+
+    # Escrita sem passar por nenhum Database (ex.: script de carga)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("UPDATE company SET name = 'Renomeada'")
+    conn.close()
+    assert db.changes.etag("company") != after
+
+
+def test_etag_depends_only_on_its_tables(db, org):
+    teams = db.changes.etag("team", "team_rpes")
+    readings = db.changes.etag("kpi_reading")
+
+    assert db.addReadings([(org["kr"].id, 10.0, 1.0)]) == [None]
+    assert db.changes.etag("team", "team_rpes") == teams
+    assert db.changes.etag("kpi_reading") != readings
+
+
+def test_etag_changes_after_reading_removal(db, org):
+    assert db.addReadings([(org["kr"].id, 10.0, 1.0), (org["kr"].id, 20.0, 2.0)]) == [None, None]
+    before = db.changes.etag("kpi_reading")
+
+    kr = db.getKRByID(org["kr"].id)
+    kr.deleteData(10.0)
+    assert db.updateItem(kr) == 0
+    assert db.changes.etag("kpi_reading") != before
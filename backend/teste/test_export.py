@@ -0,0 +1,26 @@
+"""Exportação em streaming (Database.exportCompany)."""
+from model.database.database import Database
+from model.entities.department import Department
+
+
+def test_stalled_exports_do_not_take_pool_readers(db_path, org):
+    db = Database(db_path, pool_size=1)
+    try:
+        company_id = org["company"].id
+        # Mais exportações abertas (e paradas) do que leitores no pool
+        exports = [db.exportCompany(company_id, batch_size=1) for _ in range(3)]
+        for export in exports:
+            assert next(export) == ("company", {"id": company_id, "name": "Empresa", "cnpj": "00000000000100"})
+
+        persons, _ = db.getPersonsPage(company_id, limit=10)
+        assert [p.id for p in persons] == [org["person"].id]
+
+        # Cada exportação continua no seu snapshot: não vê o que foi gravado depois
+        added = Department("Depois", companyID=company_id)
+        assert db.addItem(added) == 0
+        departments = [data["id"] for kind, data in exports[0] if kind == "department"]
+        assert departments == [org["department"].id]
+        for export in exports[1:]:
+            export.close()
+    finally:
+        db.close()
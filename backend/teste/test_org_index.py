@@ -0,0 +1,71 @@
+"""Índice da hierarquia em memória (OrgIndex) com escritas de outras conexões."""
+import sqlite3
+import time
+
+import pytest
+
+from model.database.database import Database
+from model.database.orgIndex import OrgIndexRefresher
+from model.entities.department import Department
+from model.entities.team import Team
+
+
+@pytest.fixture(autouse=True)
+def fast_refresh(monkeypatch):
+    monkeypatch.setattr(OrgIndexRefresher, "INTERVAL", 0.02)
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_lookups_never_touch_the_database(db, org):
+    statements = []
+    db.traceStatements(statements.append)
+    try:
+        assert not db.org.exists("department", "nao-existe")
+        assert db.org.get("team", "nao-existe", "managerID") is None
+        assert db.org.ancestorsOf("person", "nao-existe") is None
+        assert db.org.personsUnder("Company", org["company"].id) == [org["person"].id]
+    finally:
+        db.traceStatements(None)
+    assert statements == []
+
+
+def test_rows_written_by_another_instance_are_found(db, db_path, org):
+    other = Database(db_path, pool_size=1)
+    try:
+        department = Department("Novo", companyID=org["company"].id)
+        assert other.addItem(department) == 0
+        team = Team("Time novo", departmentID=department.id)
+        assert other.addItem(team) == 0
+    finally:
+        other.close()
+
+    # Recarregado em segundo plano, sem consulta nas leituras
+    assert wait_until(lambda: db.org.teamsOf("Department", department.id) == [team.id])
+    assert db.org.exists("department", department.id)
+    assert db.org.ancestorsOf("team", team.id)["company"] == org["company"].id
+
+
+def test_external_changes_reload_index(db, db_path, org):
+    team = org["team"]
+    moved = Department("Outro", companyID=org["company"].id)
+    assert db.addItem(moved) == 0
+    assert db.org.teamsOf("Department", org["department"].id) == [team.id]
+    assert db.getTeamByID(team.id).departmentID == org["department"].id
+
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("UPDATE team SET departmentID = ? WHERE id = ?", (moved.id, team.id))
+    conn.close()
+
+    assert wait_until(lambda: db.org.teamsOf("Department", moved.id) == [team.id])
+    assert db.org.teamsOf("Department", org["department"].id) == []
+    # O cache de entidades também é descartado
+    assert db.getTeamByID(team.id).departmentID == moved.id
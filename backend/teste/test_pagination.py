@@ -0,0 +1,63 @@
+"""Paginação por cursor (keyset) de pessoas e times: cada linha aparece uma vez, sem saltos."""
+from model.entities.person import Person
+from model.entities.team import Team
+
+
+def all_pages(fetch, limit: int) -> list[list]:
+    pages, cursor = [], None
+    while True:
+        page, cursor = fetch(after=cursor, limit=limit)
+        pages.append(page)
+        if cursor is None:
+            return pages
+
+
+def test_persons_pages_with_equal_names_and_roles(db, org):
+    company, department, team = org["company"], org["department"], org["team"]
+    # Mesmo nome e mesmo cargo: só o id distingue as linhas
+    for n in range(10):
+        assert db.addItem(Person("Homônimo", f"{n + 10:011d}", company.id, department.id, "Employee",
+                                 team.id, f"h{n}@example.com", "hash")) == 0
+    expected = sorted(p.id for p in db.getPersonsByCompanyID(company.id))
+    assert len(expected) == 11
+
+    for limit in (1, 3, 4, 11, 50):
+        pages = all_pages(lambda **page: db.getPersonsPage(company.id, **page), limit)
+        ids = [p.id for page in pages for p in page]
+        assert ids == expected
+        assert all(len(page) <= limit for page in pages)
+        assert len(pages) == max(1, -(-len(expected) // limit))
+
+    # Os filtros continuam valendo em todas as páginas
+    pages = all_pages(lambda **page: db.getPersonsPage(company.id, role="Employee", team_id=team.id, **page), 4)
+    assert [p.id for page in pages for p in page] == expected
+
+
+def test_persons_pages_are_stable_under_concurrent_inserts(db, org):
+    company = org["company"]
+    for n in range(6):
+        assert db.addItem(Person(f"Pessoa {n}", f"{n + 10:011d}", company.id, email=f"p{n}@example.com")) == 0
+
+    first, cursor = db.getPersonsPage(company.id, limit=3)
+    # Inserções entre páginas não repetem nem pulam as linhas que já existiam
+    for n in range(4):
+        assert db.addItem(Person(f"Nova {n}", f"{n + 20:011d}", company.id, email=f"n{n}@example.com")) == 0
+    rest = [p.id for page in all_pages(
+        lambda after, limit: db.getPersonsPage(company.id, after=after or cursor, limit=limit), 3) for p in page]
+
+    seen = [p.id for p in first] + rest
+    assert len(seen) == len(set(seen))
+    assert seen == sorted(seen)
+    assert set(seen) >= {p.id for p in db.getPersonsByCompanyID(company.id) if p.id > cursor}
+
+
+def test_teams_pages(db, org):
+    department = org["department"]
+    for n in range(7):
+        assert db.addItem(Team("Time", departmentID=department.id)) == 0
+    expected = sorted(t.id for t in db.getTeamsByDepartmentID(department.id))
+    assert len(expected) == 8
+
+    pages = all_pages(lambda **page: db.getTeamsPage(org["company"].id, **page), 3)
+    assert [t.id for page in pages for t in page] == expected
+    assert [len(page) for page in pages] == [3, 3, 2]
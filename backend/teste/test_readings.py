@@ -0,0 +1,47 @@
+"""Leituras de KPI/KR (tabela kpi_reading)."""
+import pytest
+
+from model.entities.kr import KR
+
+
+def test_remove_reading_by_id(db, org):
+    kr = KR("KR com leituras repetidas", org["person"].id, "2025-01-01", org["objective"].id,
+            data=[5.0, 7.0, 5.0], goal=10.0)
+    assert db.addItem(kr) == 0
+
+    loaded = db.getKRByID(kr.id)
+    loaded.deleteData(5.0)
+    assert db.updateItem(loaded) == 0
+
+    # Sai a primeira ocorrência (a mesma tirada da lista), não a última
+    assert db.getReadings(kr.id) == [7.0, 5.0]
+    assert db.getLastReading(kr.id) == 5.0
+
+
+def test_last_value_after_removing_latest_reading(db, org):
+    kr = org["kr"]
+    db.rebuildRollups()
+    assert db.addReadings([(kr.id, 30.0, 1.0), (kr.id, 90.0, 2.0)]) == [None, None]
+
+    loaded = db.getKRByID(kr.id)
+    loaded.deleteData(90.0)
+    assert db.updateItem(loaded) == 0
+
+    assert db.getLastReading(kr.id) == 30.0
+    assert db.getKRByID(kr.id).getLastData() == 30.0
+    assert db.getRollup("Objective", org["objective"].id)["attainment"] == pytest.approx(0.3)
+
+
+def test_remove_reading_added_in_same_session(db, org):
+    kr = org["kr"]
+    loaded = db.getKRByID(kr.id)
+    loaded.addData(1.0)
+    loaded.addData(2.0)
+    assert db.updateItem(loaded) == 0
+
+    # Depois de gravadas, as leituras novas também são removidas pelo id
+    loaded.deleteData(1.0)
+    loaded.addData(3.0)
+    loaded.deleteData(3.0)
+    assert db.updateItem(loaded) == 0
+    assert db.getReadings(kr.id) == [2.0]
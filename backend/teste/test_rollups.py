@@ -0,0 +1,94 @@
+"""Rollups de atingimento dos KRs (kr_attainment / kr_node / kr_rollup)."""
+import random
+import sqlite3
+import time
+
+import pytest
+
+from model.entities.kr import KR
+
+
+def wait_fresh(db, node_type: str, node_id: str, timeout: float = 5.0) -> dict:
+    """Espera a reconstrução em segundo plano terminar."""
+    deadline = time.monotonic() + timeout
+    while True:
+        rollup = db.getRollup(node_type, node_id)
+        if not rollup["stale"] or time.monotonic() > deadline:
+            return rollup
+        time.sleep(0.01)
+
+
+def test_rollup_after_goal_change(db, org):
+    kr = org["kr"]
+    db.rebuildRollups()
+    assert db.addReadings([(kr.id, 50.0, 1.0)]) == [None]
+    for node_type, node in (("Objective", "objective"), ("Team", "team"), ("Company", "company")):
+        assert db.getRollup(node_type, org[node].id)["attainment"] == 0.5
+
+    loaded = db.getKRByID(kr.id)
+    loaded.goal = 200.0
+    assert db.updateItem(loaded) == 0
+
+    # Mudança de meta é aplicada na hora, sem esperar reconstrução
+    rollup = db.getRollup("Department", org["department"].id)
+    assert rollup == {"nodeType": "Department", "nodeID": org["department"].id,
+                      "attainment": 0.25, "krCount": 1, "stale": False}
+
+
+def test_new_kr_is_added_without_rebuild(db, org):
+    db.rebuildRollups()
+    other = KR("Outro KR", org["person"].id, "2025-01-01", org["objective"].id, data=[100.0], goal=100.0)
+    assert db.addItem(other) == 0
+
+    # Entra direto nos nós que o contêm: os rollups não ficam sujos
+    rollup = db.getRollup("Company", org["company"].id)
+    assert rollup["stale"] is False
+    assert rollup["krCount"] == 2
+    assert rollup["attainment"] == 0.5
+
+
+def test_kr_inserted_by_another_connection_is_added(db, db_path, org):
+    db.rebuildRollups()
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("INSERT INTO kpi (id, description, objectiveID, date, goal) VALUES (?, ?, ?, ?, ?)",
+                     ("kr-externo", "KR externo", org["objective"].id, "2025-01-01", 10.0))
+    conn.close()
+
+    # Fica em kr_pending até o próximo refresh (aqui, o de uma leitura)
+    assert db.addReadings([(org["kr"].id, 100.0, 1.0)]) == [None]
+    rollup = db.getRollup("Team", org["team"].id)
+    assert rollup["stale"] is False
+    assert rollup["krCount"] == 2
+    assert rollup["attainment"] == 0.5
+
+
+def test_structural_change_is_rebuilt_in_background(db, org):
+    db.rebuildRollups()
+    assert db.addReadings([(org["kr"].id, 100.0, 1.0)]) == [None]
+    assert db.deleteItemByObject(db.getKRByID(org["kr"].id)) == 0
+
+    rollup = wait_fresh(db, "Company", org["company"].id)
+    assert rollup["stale"] is False
+    assert rollup["krCount"] == 0
+    assert rollup["attainment"] is None
+
+
+def test_incremental_updates_match_rebuild(db, org):
+    rng = random.Random(7)
+    krs = [org["kr"]]
+    for i in range(5):
+        kr = KR(f"KR {i}", org["person"].id, "2025-01-01", org["objective"].id, goal=rng.choice((3.0, 7.0, 10.0)))
+        assert db.addItem(kr) == 0
+        krs.append(kr)
+    db.rebuildRollups()
+
+    for step in range(300):
+        kr = rng.choice(krs)
+        assert db.addReadings([(kr.id, rng.uniform(0, 10), float(step))]) == [None]
+    incremental = db.getRollup("Company", org["company"].id)
+
+    db.rebuildRollups()
+    rebuilt = db.getRollup("Company", org["company"].id)
+    assert incremental["krCount"] == rebuilt["krCount"] == 6
+    assert incremental["attainment"] == pytest.approx(rebuilt["attainment"], rel=1e-12)